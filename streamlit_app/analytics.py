@@ -0,0 +1,220 @@
+"""Pipeline (funnel) analytics over an opening's candidates.
+
+``PipelineAnalytics`` keeps one row per candidate plus running aggregates
+(candidates per stage, source mix, weekly applications, stage transitions).
+``update`` diffs incoming candidates against the stored rows by a per-row
+signature and only subtracts/adds the groupby counts of the rows that
+changed, so a new page or an incremental sync does not recompute the
+aggregates over the whole opening.
+"""
+
+from __future__ import annotations
+
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+UNKNOWN = "N/A"
+AGE_BUCKETS = (0, 7, 14, 30, 60, 90, 180, np.inf)
+AGE_LABELS = ("< 7 ngày", "7–14 ngày", "14–30 ngày", "30–60 ngày", "60–90 ngày", "90–180 ngày", "> 180 ngày")
+
+_STAGE_KEYS = ("stage_name", "new_stage_name", "to_stage_name", "new_stage", "to_stage", "stage")
+_FROM_STAGE_KEYS = ("old_stage_name", "from_stage_name", "old_stage", "from_stage")
+
+
+def _as_seconds(value: Any) -> Optional[int]:
+    try:
+        seconds = int(float(value))
+    except (TypeError, ValueError):
+        return None
+    return seconds if seconds > 0 else None
+
+
+def _first(entry: Dict[str, Any], keys: Sequence[str]) -> Optional[str]:
+    for key in keys:
+        value = entry.get(key)
+        if isinstance(value, dict):
+            value = value.get("name") or value.get("id")
+        if value not in (None, ""):
+            return str(value)
+    return None
+
+
+def changelog_transitions(candidate: Dict[str, Any]) -> List[tuple]:
+    """``(from_stage, to_stage, since)`` tuples derived from a candidate's ``changelogs``.
+
+    Entries carrying an explicit old/new stage are used as-is; otherwise
+    consecutive stage values (ordered by ``since``) form a transition.
+    """
+    entries = []
+    for entry in candidate.get("changelogs") or []:
+        if not isinstance(entry, dict):
+            continue
+        to_stage = _first(entry, _STAGE_KEYS)
+        if to_stage is None:
+            continue
+        entries.append((_as_seconds(entry.get("since")) or 0, _first(entry, _FROM_STAGE_KEYS), to_stage))
+    entries.sort(key=lambda item: item[0])
+
+    transitions = []
+    previous = None
+    for since, from_stage, to_stage in entries:
+        from_stage = from_stage or previous
+        if from_stage is not None and from_stage != to_stage:
+            transitions.append((from_stage, to_stage, since))
+        previous = to_stage
+    return transitions
+
+
+def _candidate_columns(candidates: Iterable[Dict[str, Any]]) -> tuple:
+    ids, stages, sources, applied, digests = [], [], [], [], []
+    t_ids, t_from, t_to, t_since = [], [], [], []
+    for candidate in candidates:
+        if not isinstance(candidate, dict) or candidate.get("id") is None:
+            continue
+        candidate_id = str(candidate["id"])
+        stage = candidate.get("stage_name") or UNKNOWN
+        source = candidate.get("source") or UNKNOWN
+        time_apply = _as_seconds(candidate.get("time_apply"))
+        transitions = changelog_transitions(candidate)
+        ids.append(candidate_id)
+        stages.append(stage)
+        sources.append(source)
+        applied.append(time_apply)
+        digests.append(zlib.crc32(repr((stage, source, time_apply, transitions)).encode("utf-8")))
+        for from_stage, to_stage, since in transitions:
+            t_ids.append(candidate_id)
+            t_from.append(from_stage)
+            t_to.append(to_stage)
+            t_since.append(since)
+
+    rows = pd.DataFrame(
+        {
+            "stage": stages,
+            "source": sources,
+            "time_apply": pd.to_datetime(np.asarray(applied, dtype="float64"), unit="s"),
+            "digest": np.asarray(digests, dtype=np.int64),
+        },
+        index=pd.Index(ids, name="id"),
+    )
+    rows = rows[~rows.index.duplicated(keep="last")]
+    transitions = pd.DataFrame({"id": t_ids, "from_stage": t_from, "to_stage": t_to, "since": t_since})
+    return rows, transitions
+
+
+def _week_start(times: pd.Series) -> pd.Series:
+    times = times.dropna()
+    return (times - pd.to_timedelta(times.dt.dayofweek, unit="D")).dt.normalize()
+
+
+def _counts(rows: pd.DataFrame) -> Dict[str, pd.Series]:
+    return {
+        "stage": rows.groupby("stage", sort=False).size(),
+        "source": rows.groupby("source", sort=False).size(),
+        "week": _week_start(rows["time_apply"]).value_counts(sort=False),
+    }
+
+
+def _add(total: pd.Series, delta: pd.Series, sign: int) -> pd.Series:
+    if delta.empty:
+        return total
+    combined = sign * delta if total.empty else total.add(sign * delta, fill_value=0)
+    return combined[combined > 0].astype(np.int64)
+
+
+class PipelineAnalytics:
+    """Incrementally maintained funnel aggregates for one opening."""
+
+    def __init__(self) -> None:
+        self._rows, self._transitions = _candidate_columns([])
+        empty = pd.Series(dtype=np.int64)
+        self._totals: Dict[str, pd.Series] = {"stage": empty, "source": empty, "week": empty}
+        self._transition_counts = pd.Series(dtype=np.int64)
+        self.source_fingerprint: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _apply(self, rows: pd.DataFrame, transitions: pd.DataFrame, sign: int) -> None:
+        if rows.empty:
+            return
+        for name, delta in _counts(rows).items():
+            self._totals[name] = _add(self._totals[name], delta, sign)
+        if not transitions.empty:
+            delta = transitions.groupby(["from_stage", "to_stage"], sort=False).size()
+            self._transition_counts = _add(self._transition_counts, delta, sign)
+
+    def update(self, candidates: Iterable[Dict[str, Any]], complete: bool = False) -> int:
+        """Merge candidates and return how many rows changed.
+
+        With ``complete=True`` the candidates are the whole opening and rows
+        missing from them are removed.
+        """
+        rows, transitions = _candidate_columns(candidates)
+        existing = self._rows.reindex(rows.index)
+        changed_mask = existing["digest"].ne(rows["digest"]).to_numpy()
+        changed_ids = rows.index[changed_mask]
+        removed_ids = self._rows.index.difference(rows.index) if complete else pd.Index([])
+
+        stale_ids = changed_ids.intersection(self._rows.index).union(removed_ids)
+        if len(stale_ids):
+            stale_transitions = self._transitions[self._transitions["id"].isin(stale_ids)]
+            self._apply(self._rows.loc[stale_ids], stale_transitions, -1)
+            self._rows = self._rows.drop(stale_ids)
+            self._transitions = self._transitions[~self._transitions["id"].isin(stale_ids)]
+
+        if len(changed_ids):
+            new_rows = rows.loc[changed_ids]
+            new_transitions = transitions[transitions["id"].isin(changed_ids)]
+            self._apply(new_rows, new_transitions, 1)
+            self._rows = pd.concat([self._rows, new_rows])
+            self._transitions = pd.concat([self._transitions, new_transitions], ignore_index=True)
+        return len(changed_ids) + len(removed_ids)
+
+    def stage_counts(self, stage_order: Optional[Sequence[str]] = None) -> pd.Series:
+        """Candidates per stage, in ``stage_order`` (the opening's pipeline order) when given."""
+        counts = self._totals["stage"]
+        if stage_order:
+            ordered = [stage for stage in stage_order if stage in counts.index]
+            rest = [stage for stage in counts.index if stage not in set(stage_order)]
+            return counts.reindex(ordered + rest)
+        return counts.sort_values(ascending=False)
+
+    def source_mix(self) -> pd.DataFrame:
+        counts = self._totals["source"].sort_values(ascending=False)
+        total = counts.sum()
+        share = counts / total if total else counts.astype(float)
+        return pd.DataFrame({"Số ứng viên": counts, "Tỷ lệ": share.round(4)})
+
+    def weekly_applications(self) -> pd.Series:
+        weeks = self._totals["week"].sort_index()
+        if weeks.empty:
+            return weeks
+        full_range = pd.date_range(weeks.index.min(), weeks.index.max(), freq="7D")
+        return weeks.reindex(full_range, fill_value=0)
+
+    def application_age(self, now: Optional[pd.Timestamp] = None) -> pd.Series:
+        """Histogram of days since ``time_apply``, bucketed by AGE_BUCKETS."""
+        applied = self._rows["time_apply"].dropna()
+        # time_apply is decoded as naive UTC, so compare against naive UTC "now"
+        now = now if now is not None else pd.Timestamp.now(tz="UTC").tz_localize(None)
+        days = (now - applied).dt.total_seconds().to_numpy() / 86400.0
+        counts, _ = np.histogram(days, bins=np.asarray(AGE_BUCKETS, dtype=float))
+        return pd.Series(counts, index=list(AGE_LABELS), dtype=np.int64)
+
+    def stage_transitions(self, limit: Optional[int] = None) -> pd.DataFrame:
+        columns = ["Từ stage", "Sang stage", "Số lượt"]
+        if self._transition_counts.empty:
+            return pd.DataFrame(columns=columns)
+        counts = self._transition_counts.sort_values(ascending=False)
+        if limit is not None:
+            counts = counts.head(limit)
+        frame = counts.reset_index()
+        frame.columns = columns
+        return frame
+
+
+__all__ = ["PipelineAnalytics", "changelog_transitions"]
@@ -1,8 +1,26 @@
 # api_client.py
 
-import requests
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlencode
 
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from rate_limiter import RetryPolicy, get_rate_limiter, parse_retry_after
+from response_cache import ResponseCache, make_cache_key
+from single_flight import AsyncSingleFlight, SingleFlight
+
+try:
+    import httpx
+except ImportError:  # httpx chỉ cần cho HTTP/2 và AsyncBaseClient
+    httpx = None
+
 API_URL = "https://hiring.base.vn/publicapi/v2/candidate/list"
 OPENING_LIST_URL = "https://hiring.base.vn/publicapi/v2/opening/list"
 OPENING_GET_URL = "https://hiring.base.vn/publicapi/v2/opening/get"
@@ -19,10 +37,559 @@ FIXED_HEADERS = {
     "Connection": "keep-alive"
 }
 
-def fetch_candidates(access_token, opening_id, page, num_per_page, stage):
+# Giá trị mặc định cho connection pool và timeout (ghi đè được qua biến môi trường)
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 16
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+
+# Địa chỉ mặc định của proxy FastAPI (web_api.py)
+DEFAULT_PROXY_URL = "http://127.0.0.1:8000"
+# Khóa của dòng lỗi cuối cùng trong luồng NDJSON /candidates/stream
+STREAM_ERROR_KEY = "stream_error"
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_bool(name, default=False):
+    raw_value = os.environ.get(name)
+    if raw_value is None:
+        return default
+    return raw_value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _observe_response(rate_limiter, response):
+    """
+    Cập nhật rate limiter theo status của response (429 giảm tốc, thành công tăng dần).
+    Trả về số giây trong header Retry-After (nếu có).
+    """
+    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+    if rate_limiter is not None:
+        if response.status_code == 429:
+            rate_limiter.penalize(retry_after)
+        elif response.status_code < 500:
+            rate_limiter.reward()
+    return retry_after
+
+
+def _response_from_cache(entry, url):
+    """Dựng lại requests.Response từ một CacheEntry."""
+    response = requests.Response()
+    response.status_code = entry.status_code
+    response._content = entry.content
+    response.headers = CaseInsensitiveDict(entry.headers)
+    response.url = url
+    response.encoding = "utf-8"
+    return response
+
+
+def _httpx_response_from_cache(entry, url):
+    """Dựng lại httpx.Response từ một CacheEntry (client HTTP/2 và AsyncBaseClient)."""
+    return httpx.Response(
+        entry.status_code,
+        headers=entry.headers,
+        content=entry.content,
+        request=httpx.Request("POST", url),
+    )
+
+
+class BaseClient:
+    """
+    Client HTTP dùng chung cho Base.vn, giữ kết nối keep-alive trong connection pool.
+
+    - ``pool_connections``: số host được giữ pool riêng.
+    - ``pool_maxsize``: số kết nối tối đa tới mỗi host; khi ``pool_block=True``
+      các luồng vượt giới hạn sẽ chờ thay vì mở thêm kết nối.
+    - ``connect_timeout``/``read_timeout``: timeout (giây) cho mỗi request.
+    - ``http2``: dùng httpx với HTTP/2 (cần cài ``httpx[http2]``).
+    - ``cache``: ResponseCache đặt trước các endpoint; ``None`` để tắt cache.
+      Mục đã hết hạn nhưng còn trong ``stale_ttl`` được trả ngay, đồng thời
+      được kiểm tra lại (If-None-Match/If-Modified-Since) ở luồng nền.
+    - ``rate_limiter``: TokenBucket dùng chung để giới hạn tốc độ gọi API.
+    - ``retry_policy``: RetryPolicy cho lỗi kết nối, 429 và 5xx (backoff có jitter,
+      tôn trọng Retry-After); ``None`` để không thử lại.
+
+    Các request giống hệt nhau (cùng endpoint, tham số và token) đang chạy
+    đồng thời được gộp thành một lần gọi upstream (single-flight).
+
+    Session được khởi tạo lười và an toàn luồng, có thể dùng chung giữa các
+    worker của Streamlit.
+    """
+
+    def __init__(
+        self,
+        pool_connections=DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize=DEFAULT_POOL_MAXSIZE,
+        connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+        read_timeout=DEFAULT_READ_TIMEOUT,
+        http2=False,
+        pool_block=True,
+        cache=None,
+        rate_limiter=None,
+        retry_policy=None,
+    ):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.http2 = http2
+        self.pool_block = pool_block
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.single_flight = SingleFlight()
+        self._session = None
+        self._lock = threading.Lock()
+        self._revalidator = None
+        self._revalidating = set()
+
+    @classmethod
+    def from_env(cls):
+        """Tạo client với cấu hình đọc từ biến môi trường ``BASE_HTTP_*``."""
+        return cls(
+            pool_connections=_env_int("BASE_HTTP_POOL_CONNECTIONS", DEFAULT_POOL_CONNECTIONS),
+            pool_maxsize=_env_int("BASE_HTTP_POOL_MAXSIZE", DEFAULT_POOL_MAXSIZE),
+            connect_timeout=_env_float("BASE_HTTP_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT),
+            read_timeout=_env_float("BASE_HTTP_READ_TIMEOUT", DEFAULT_READ_TIMEOUT),
+            http2=_env_bool("BASE_HTTP2"),
+            cache=ResponseCache.from_env() if _env_bool("BASE_CACHE_ENABLED", True) else None,
+            rate_limiter=get_rate_limiter(),
+            retry_policy=RetryPolicy(max_retries=_env_int("BASE_HTTP_MAX_RETRIES", 3)),
+        )
+
+    @property
+    def timeout(self):
+        return (self.connect_timeout, self.read_timeout)
+
+    def _build_session(self):
+        if self.http2:
+            if httpx is None:
+                raise RuntimeError("HTTP/2 yêu cầu cài đặt 'httpx[http2]'")
+            return httpx.Client(
+                http2=True,
+                headers=FIXED_HEADERS,
+                limits=httpx.Limits(
+                    max_connections=self.pool_maxsize,
+                    max_keepalive_connections=self.pool_maxsize,
+                ),
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+            )
+
+        session = requests.Session()
+        session.headers.update(FIXED_HEADERS)
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._build_session()
+        return self._session
+
+    def post(self, url, payload_params, description, use_cache=True):
+        """
+        Gửi POST form-encoded tới ``url`` qua connection pool.
+        Trả về đối tượng Response (``httpx.Response`` khi bật HTTP/2, kể cả khi
+        lấy từ cache), nên nơi gọi chỉ nên dùng các thuộc tính chung của hai kiểu
+        (``status_code``, ``headers``, ``content``, ``text``, ``json()``,
+        ``raise_for_status()``); lỗi kết nối được chuyển thành ConnectionError.
+        ``description`` là tên endpoint (vd. "candidate/get"), dùng làm khóa cache.
+        ``use_cache=False`` bỏ qua cache khi đọc (luôn gọi upstream) nhưng vẫn
+        ghi response mới vào cache.
+        """
+        if self.cache is not None and use_cache:
+            entry = self.cache.lookup(description, payload_params)
+            if entry is not None:
+                if not entry.is_fresh(self.cache.clock()):
+                    self._schedule_revalidation(url, payload_params, description, entry)
+                return self._response_from_cache(entry, url)
+
+        def _fetch():
+            response = self._send(url, payload_params, description)
+            self._store(description, payload_params, response)
+            return response
+
+        return self.single_flight.do(make_cache_key(description, payload_params), _fetch)
+
+    def _response_from_cache(self, entry, url):
+        # Cùng kiểu với response trả về từ mạng của session đang dùng
+        if self.http2:
+            return _httpx_response_from_cache(entry, url)
+        return _response_from_cache(entry, url)
+
+    def _store(self, description, payload_params, response):
+        if self.cache is not None and response.status_code == 200:
+            self.cache.set(description, payload_params, response.status_code, response.content, response.headers)
+
+    def _schedule_revalidation(self, url, payload_params, description, entry):
+        key = make_cache_key(description, payload_params)
+        with self._lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+            if self._revalidator is None:
+                self._revalidator = ThreadPoolExecutor(max_workers=2, thread_name_prefix="base-revalidate")
+            revalidator = self._revalidator
+        revalidator.submit(self._revalidate, key, url, dict(payload_params), description, entry)
+
+    def _revalidate(self, key, url, payload_params, description, entry):
+        try:
+            response = self._send(url, payload_params, description, headers=entry.conditional_headers())
+            if response.status_code == 304:
+                self.cache.touch(description, payload_params)
+            else:
+                self._store(description, payload_params, response)
+        except ConnectionError:
+            # Giữ bản cũ trong cache; lần gọi sau sẽ thử kiểm tra lại
+            pass
+        finally:
+            with self._lock:
+                self._revalidating.discard(key)
+
+    def _send(self, url, payload_params, description, headers=None):
+        """Gửi request qua rate limiter, thử lại theo retry_policy."""
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                response = self._send_once(url, payload_params, description, headers)
+            except ConnectionError:
+                if self.retry_policy is None or not self.retry_policy.should_retry(attempt):
+                    raise
+                time.sleep(self.retry_policy.delay(attempt))
+                attempt += 1
+                continue
+
+            retry_after = _observe_response(self.rate_limiter, response)
+            if self.retry_policy is None or not self.retry_policy.should_retry(attempt, response.status_code):
+                return response
+            time.sleep(self.retry_policy.delay(attempt, retry_after))
+            attempt += 1
+
+    def _send_once(self, url, payload_params, description, headers=None):
+        payload = urlencode(payload_params)
+
+        if self.http2:
+            try:
+                return self.session.post(url, content=payload, headers=headers)
+            except httpx.HTTPError as e:
+                raise ConnectionError(f"Lỗi kết nối API ({description}): {e}")
+
+        try:
+            return self.session.post(url, data=payload, headers=headers, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            # Xử lý các lỗi kết nối/yêu cầu cơ bản
+            raise ConnectionError(f"Lỗi kết nối API ({description}): {e}")
+
+    def close(self):
+        with self._lock:
+            if self._revalidator is not None:
+                self._revalidator.shutdown(wait=False)
+                self._revalidator = None
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AsyncBaseClient:
+    """
+    Phiên bản bất đồng bộ của BaseClient dựa trên một ``httpx.AsyncClient`` dùng chung.
+
+    Mỗi hàm ``fetch_*`` của module có một coroutine tương ứng trả về
+    ``httpx.Response``. Mục cache đã hết hạn (còn trong ``stale_ttl``) được trả
+    ngay và được kiểm tra lại trong một task nền; đọc/ghi backend SQLite của
+    cache chạy qua ``asyncio.to_thread`` để không chặn event loop. Dùng ``gather_candidate_details``/``gather_candidate_messages``
+    để lấy dữ liệu nhiều ứng viên song song với số request đồng thời giới hạn.
+    """
+
+    def __init__(
+        self,
+        max_connections=DEFAULT_POOL_MAXSIZE,
+        connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+        read_timeout=DEFAULT_READ_TIMEOUT,
+        http2=False,
+        cache=None,
+        rate_limiter=None,
+        retry_policy=None,
+    ):
+        if httpx is None:
+            raise RuntimeError("AsyncBaseClient yêu cầu cài đặt 'httpx'")
+        self.max_connections = max_connections
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.http2 = http2
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.single_flight = AsyncSingleFlight()
+        self._client = None
+        self._background = set()
+
+    @classmethod
+    def from_env(cls):
+        """
+        Tạo client với cấu hình đọc từ biến môi trường ``BASE_HTTP_*``.
+        Dùng chung response cache và rate limiter với BaseClient của tiến trình.
+        """
+        return cls(
+            max_connections=_env_int("BASE_HTTP_POOL_MAXSIZE", DEFAULT_POOL_MAXSIZE),
+            connect_timeout=_env_float("BASE_HTTP_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT),
+            read_timeout=_env_float("BASE_HTTP_READ_TIMEOUT", DEFAULT_READ_TIMEOUT),
+            http2=_env_bool("BASE_HTTP2"),
+            cache=get_client().cache,
+            rate_limiter=get_rate_limiter(),
+            retry_policy=RetryPolicy(max_retries=_env_int("BASE_HTTP_MAX_RETRIES", 3)),
+        )
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                headers=FIXED_HEADERS,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+            )
+        return self._client
+
+    async def post(self, url, payload_params, description):
+        """
+        Gửi POST form-encoded bất đồng bộ; lỗi kết nối được chuyển thành ConnectionError.
+        Các coroutine gọi cùng request đồng thời dùng chung một lần gọi upstream.
+        """
+        entry = None
+        if self.cache is not None:
+            entry = await self._cache_call(self.cache.lookup, description, payload_params)
+        if entry is not None:
+            if not entry.is_fresh(self.cache.clock()):
+                self._schedule_revalidation(url, payload_params, description, entry)
+            return self._response_from_cache(entry, url)
+
+        return await self.single_flight.do(
+            make_cache_key(description, payload_params),
+            lambda: self._fetch(url, payload_params, description),
+        )
+
+    async def _fetch(self, url, payload_params, description):
+        response = await self._send(url, payload_params, description)
+        await self._store(description, payload_params, response)
+        return response
+
+    async def _cache_call(self, method, *args):
+        # Chỉ backend SQLite gây I/O chặn; cache thuần bộ nhớ được gọi trực tiếp
+        if self.cache.backend is not None:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def _store(self, description, payload_params, response):
+        if self.cache is not None and response.status_code == 200:
+            await self._cache_call(
+                self.cache.set, description, payload_params, response.status_code, response.content, response.headers
+            )
+
+    def _schedule_revalidation(self, url, payload_params, description, entry):
+        """Kiểm tra lại mục cũ trong task nền; các lần kiểm tra trùng khóa được gộp qua single-flight."""
+        key = ("revalidate", make_cache_key(description, payload_params))
+        task = asyncio.create_task(
+            self.single_flight.do(key, lambda: self._revalidate(url, dict(payload_params), description, entry))
+        )
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _revalidate(self, url, payload_params, description, entry):
+        try:
+            response = await self._send(url, payload_params, description, headers=entry.conditional_headers())
+        except ConnectionError:
+            # Giữ bản cũ trong cache; lần gọi sau sẽ thử kiểm tra lại
+            return
+        if response.status_code == 304:
+            await self._cache_call(self.cache.touch, description, payload_params)
+        else:
+            await self._store(description, payload_params, response)
+
+    async def _send(self, url, payload_params, description, headers=None):
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                wait = self.rate_limiter.reserve()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            try:
+                response = await self.client.post(url, content=urlencode(payload_params), headers=headers)
+            except httpx.HTTPError as e:
+                if self.retry_policy is None or not self.retry_policy.should_retry(attempt):
+                    raise ConnectionError(f"Lỗi kết nối API ({description}): {e}")
+                await asyncio.sleep(self.retry_policy.delay(attempt))
+                attempt += 1
+                continue
+
+            retry_after = _observe_response(self.rate_limiter, response)
+            if self.retry_policy is None or not self.retry_policy.should_retry(attempt, response.status_code):
+                return response
+            await asyncio.sleep(self.retry_policy.delay(attempt, retry_after))
+            attempt += 1
+
+    @staticmethod
+    def _response_from_cache(entry, url):
+        return _httpx_response_from_cache(entry, url)
+
+    async def fetch_candidates(self, access_token, opening_id, page, num_per_page, stage):
+        payload_params = {
+            "access_token": access_token,
+            "opening_id": opening_id,
+            "page": page,
+            "num_per_page": num_per_page,
+            "stage": stage
+        }
+        return await self.post(API_URL, payload_params, "candidate/list")
+
+    async def fetch_openings_list(self, access_token, page=1, num_per_page=50, order_by="starred"):
+        payload_params = {
+            "access_token": access_token,
+            "page": page,
+            "num_per_page": num_per_page,
+            "order_by": order_by
+        }
+        return await self.post(OPENING_LIST_URL, payload_params, "opening/list")
+
+    async def fetch_opening(self, access_token, opening_id):
+        payload_params = {"access_token": access_token, "id": opening_id}
+        return await self.post(OPENING_GET_URL, payload_params, "opening/get")
+
+    async def fetch_candidate_detail(self, access_token, candidate_id):
+        payload_params = {"access_token": access_token, "id": candidate_id}
+        return await self.post(CANDIDATE_GET_URL, payload_params, "candidate/get")
+
+    async def fetch_candidate_messages(self, access_token, candidate_id):
+        payload_params = {"access_token": access_token, "id": candidate_id}
+        return await self.post(CANDIDATE_MESSAGES_URL, payload_params, "candidate/messages")
+
+    async def _gather(self, fetch, access_token, candidate_ids, concurrency, return_exceptions):
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def _fetch_one(candidate_id):
+            async with semaphore:
+                return await fetch(access_token, candidate_id)
+
+        return await asyncio.gather(
+            *(_fetch_one(candidate_id) for candidate_id in candidate_ids),
+            return_exceptions=return_exceptions,
+        )
+
+    async def gather_candidate_details(self, access_token, candidate_ids, concurrency=8, return_exceptions=True):
+        """
+        Lấy chi tiết nhiều ứng viên song song, tối đa ``concurrency`` request cùng lúc.
+        Kết quả giữ đúng thứ tự ``candidate_ids``; với ``return_exceptions=True``
+        request lỗi trả về đối tượng exception tại vị trí tương ứng.
+        """
+        return await self._gather(
+            self.fetch_candidate_detail, access_token, candidate_ids, concurrency, return_exceptions
+        )
+
+    async def gather_candidate_messages(self, access_token, candidate_ids, concurrency=8, return_exceptions=True):
+        """Như ``gather_candidate_details`` nhưng cho endpoint /candidate/messages."""
+        return await self._gather(
+            self.fetch_candidate_messages, access_token, candidate_ids, concurrency, return_exceptions
+        )
+
+    async def aclose(self):
+        for task in list(self._background):
+            task.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_client():
+    """Trả về BaseClient dùng chung của tiến trình (tạo lười từ biến môi trường)."""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = BaseClient.from_env()
+    return _default_client
+
+
+def configure_client(**kwargs):
+    """
+    Thay client dùng chung bằng một BaseClient mới với cấu hình ``kwargs``.
+    Cache, rate limiter và retry policy không được truyền sẽ được giữ từ client cũ.
+    """
+    global _default_client
+    current = get_client()
+    for name in ("cache", "rate_limiter", "retry_policy"):
+        kwargs.setdefault(name, getattr(current, name))
+    new_client = BaseClient(**kwargs)
+    with _default_client_lock:
+        old_client, _default_client = _default_client, new_client
+    if old_client is not None:
+        old_client.close()
+    return new_client
+
+
+def invalidate_cache(endpoint=None, access_token=None, **params):
+    """
+    Xóa các response đã cache của client dùng chung, lọc theo endpoint,
+    access token và tham số (vd. ``invalidate_cache("candidate/get", token, id=123)``).
+    Gọi không tham số để xóa toàn bộ. Trả về số mục đã xóa.
+    """
+    cache = get_client().cache
+    if cache is None:
+        return 0
+    return cache.invalidate(endpoint, access_token, **params)
+
+
+def cache_stats():
+    """Trả về bộ đếm hit/miss và kích thước hiện tại của cache dùng chung."""
+    cache = get_client().cache
+    return cache.snapshot() if cache is not None else {}
+
+
+def fetch_candidates(access_token, opening_id, page, num_per_page, stage, use_cache=True):
     """
     Thực hiện cuộc gọi API POST đến Base.vn để lấy danh sách ứng viên.
-    Trả về đối tượng Response của requests.
+    Trả về ``requests.Response``, hoặc ``httpx.Response`` khi client bật HTTP/2.
+    ``use_cache=False`` luôn lấy dữ liệu mới từ Base.vn (vd. khi đồng bộ).
     """
     # Chuẩn bị tham số payload
     payload_params = {
@@ -32,27 +599,13 @@ def fetch_candidates(access_token, opening_id, page, num_per_page, stage):
         "num_per_page": num_per_page,
         "stage": stage
     }
-    
-    # Mã hóa payload
-    payload = urlencode(payload_params)
-
-    try:
-        response = requests.request(
-            "POST", 
-            API_URL, 
-            data=payload, 
-            headers=FIXED_HEADERS
-        )
-        return response
-    except requests.exceptions.RequestException as e:
-        # Xử lý các lỗi kết nối/yêu cầu cơ bản
-        raise ConnectionError(f"Lỗi kết nối API: {e}")
+    return get_client().post(API_URL, payload_params, "candidate/list", use_cache=use_cache)
 
 
 def fetch_openings_list(access_token, page=1, num_per_page=50, order_by="starred"):
     """
     Gọi endpoint /opening/list của Base.vn (dùng POST form-encoded)
-    Trả về đối tượng Response của requests.
+    Trả về ``requests.Response``, hoặc ``httpx.Response`` khi client bật HTTP/2.
     """
     payload_params = {
         "access_token": access_token,
@@ -60,78 +613,75 @@ def fetch_openings_list(access_token, page=1, num_per_page=50, order_by="starred
         "num_per_page": num_per_page,
         "order_by": order_by
     }
-
-    payload = urlencode(payload_params)
-
-    try:
-        response = requests.request(
-            "POST",
-            OPENING_LIST_URL,
-            data=payload,
-            headers=FIXED_HEADERS
-        )
-        return response
-    except requests.exceptions.RequestException as e:
-        raise ConnectionError(f"Lỗi kết nối API (opening/list): {e}")
+    return get_client().post(OPENING_LIST_URL, payload_params, "opening/list")
 
 
 def fetch_opening(access_token, opening_id):
     """
     Gọi endpoint /opening/get để lấy chi tiết opening theo id.
+    Trả về ``requests.Response``, hoặc ``httpx.Response`` khi client bật HTTP/2.
     """
     payload_params = {
         "access_token": access_token,
         "id": opening_id
     }
-    payload = urlencode(payload_params)
-
-    try:
-        response = requests.request(
-            "POST",
-            OPENING_GET_URL,
-            data=payload,
-            headers=FIXED_HEADERS
-        )
-        return response
-    except requests.exceptions.RequestException as e:
-        raise ConnectionError(f"Lỗi kết nối API (opening/get): {e}")
+    return get_client().post(OPENING_GET_URL, payload_params, "opening/get")
 
 
 def fetch_candidate_detail(access_token, candidate_id):
-    """Gọi endpoint /candidate/get để lấy chi tiết ứng viên."""
+    """
+    Gọi endpoint /candidate/get để lấy chi tiết ứng viên.
+    Trả về ``requests.Response``, hoặc ``httpx.Response`` khi client bật HTTP/2.
+    """
     payload_params = {
         "access_token": access_token,
         "id": candidate_id
     }
-    payload = urlencode(payload_params)
-
-    try:
-        response = requests.request(
-            "POST",
-            CANDIDATE_GET_URL,
-            data=payload,
-            headers=FIXED_HEADERS
-        )
-        return response
-    except requests.exceptions.RequestException as e:
-        raise ConnectionError(f"Lỗi kết nối API (candidate/get): {e}")
+    return get_client().post(CANDIDATE_GET_URL, payload_params, "candidate/get")
 
 
 def fetch_candidate_messages(access_token, candidate_id):
-    """Gọi endpoint /candidate/messages để lấy lịch sử tin nhắn/notes của ứng viên."""
+    """
+    Gọi endpoint /candidate/messages để lấy lịch sử tin nhắn/notes của ứng viên.
+    Trả về ``requests.Response``, hoặc ``httpx.Response`` khi client bật HTTP/2.
+    """
     payload_params = {
         "access_token": access_token,
         "id": candidate_id
     }
-    payload = urlencode(payload_params)
+    return get_client().post(CANDIDATE_MESSAGES_URL, payload_params, "candidate/messages")
+
 
+def stream_candidates(access_token, opening_id, stage="", num_per_page=100, proxy_url=None, read_timeout=300):
+    """
+    Generator đọc ``POST /candidates/stream`` của proxy (web_api.py) và trả về
+    từng ứng viên (dict) ngay khi dòng NDJSON tương ứng tới, không đệm cả opening.
+    Lỗi upstream giữa chừng được ném lại thành ConnectionError.
+    """
+    base_url = (proxy_url or os.environ.get("API_PROXY_URL") or DEFAULT_PROXY_URL).rstrip("/")
+    body = {
+        "access_token": access_token,
+        "opening_id": opening_id,
+        "stage": stage,
+        "num_per_page": num_per_page,
+    }
     try:
-        response = requests.request(
-            "POST",
-            CANDIDATE_MESSAGES_URL,
-            data=payload,
-            headers=FIXED_HEADERS
+        response = requests.post(
+            f"{base_url}/candidates/stream",
+            json=body,
+            stream=True,
+            timeout=(DEFAULT_CONNECT_TIMEOUT, read_timeout),
         )
-        return response
     except requests.exceptions.RequestException as e:
-        raise ConnectionError(f"Lỗi kết nối API (candidate/messages): {e}")
+        raise ConnectionError(f"Lỗi kết nối proxy (candidates/stream): {e}")
+
+    with response:
+        if response.status_code >= 400:
+            raise ConnectionError(f"Proxy lỗi {response.status_code} (candidates/stream): {response.text[:500]}")
+        for line in response.iter_lines():
+            if not line:
+                continue
+            item = json.loads(line)
+            if STREAM_ERROR_KEY in item:
+                raise ConnectionError(f"Lỗi khi stream ứng viên: {item[STREAM_ERROR_KEY]}")
+            yield item
@@ -1,5 +1,32 @@
 # api_server.py
 """
 FastAPI Server - Web API hoàn chỉnh cho việc truy vấn Base.vn Candidate API
+
+Điểm khởi chạy proxy trong web_api.py:
+
+    python api_server.py [--host 0.0.0.0] [--port 8000]
+
+Mặc định đọc ``API_HOST``/``API_PORT`` từ .env. Chỉ chạy một worker để mọi
+phiên dùng chung connection pool, cache và single-flight.
 """
-# ...existing code...
+
+import argparse
+
+from config_manager import load_env_values
+from web_api import app, run
+
+
+def main():
+    load_env_values()
+    parser = argparse.ArgumentParser(description="Base.vn Candidate API proxy")
+    parser.add_argument("--host", default=None, help="Địa chỉ lắng nghe (mặc định API_HOST)")
+    parser.add_argument("--port", type=int, default=None, help="Cổng lắng nghe (mặc định API_PORT)")
+    args = parser.parse_args()
+    run(host=args.host, port=args.port)
+
+
+__all__ = ["app", "main"]
+
+
+if __name__ == "__main__":
+    main()
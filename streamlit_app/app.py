@@ -2,18 +2,22 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
-import os
-from typing import Any, Dict, Mapping, Optional, ContextManager, cast
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Mapping, Optional
 
 import requests
 import streamlit as st
 
+from analytics import PipelineAnalytics
 from api_client import (
+    cache_stats,
     fetch_candidate_detail as _fetch_candidate_detail_raw,
     fetch_candidate_messages as _fetch_candidate_messages_raw,
     fetch_candidates as _fetch_candidates_raw,
-    fetch_openings_list as _fetch_openings_list_raw,
+    invalidate_cache,
 )
 from config_manager import (
     ENV_PATH,
@@ -21,12 +25,22 @@ from config_manager import (
     load_env_values,
     save_env_values,
 )
-from data_processor import process_candidate_data
+from data_processor import CandidateFrameBuilder, process_candidate_data
+from exporter import EXPORT_EXTENSIONS, EXPORT_MEDIA_TYPES, available_formats, export_candidates
+from messages_model import MessageThread, normalize_messages
+from openings_model import EMPTY_OPENINGS, OpeningsModel, openings_fingerprint
+from pagination import DEFAULT_FANOUT_CONCURRENCY, iter_openings, load_all_candidates
+from prefetch import DEFAULT_PREFETCH_CANDIDATES, DEFAULT_PREFETCH_WORKERS, Prefetcher, candidate_prefetch_tasks
+from search_index import CandidateSearchIndex, build_search_index
+from snapshot_store import SnapshotStore
 from ui.components import (
+    inject_styles,
     render_candidate_detail_view,
     render_candidate_list,
     render_candidate_messages_view,
     render_metrics,
+    render_pipeline_analytics,
+    reset_candidate_selection,
 )
 
 
@@ -42,10 +56,41 @@ def _handle_api_response(response: requests.Response) -> Dict[str, Any]:
         return {"success": False, "error": f"Unexpected error: {str(e)}"}
 
 
-def fetch_openings_list(access_token: str) -> Dict[str, Any]:
-    """Wrapper for fetch_openings_list that returns dict."""
-    response = _fetch_openings_list_raw(access_token)
-    return _handle_api_response(response)
+def _call_as_dict(func: Any, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+    """Run a data-returning call and wrap its result/error like _handle_api_response."""
+    try:
+        return {"success": True, "data": func(*args, **kwargs)}
+    except (requests.RequestException, ConnectionError) as e:
+        return {"success": False, "error": str(e)}
+    except Exception as e:
+        return {"success": False, "error": f"Unexpected error: {str(e)}"}
+
+
+def fetch_all_openings(access_token: str) -> Dict[str, Any]:
+    """Walk every opening/list page and return dict with success/error keys."""
+    return _call_as_dict(lambda: list(iter_openings(access_token)))
+
+
+def fetch_all_candidates(access_token: str, filters: Dict[str, Any]) -> Dict[str, Any]:
+    """Fetch every candidate/list page in parallel and return the merged payload as dict.
+
+    The DataFrame is built page by page while the pages arrive and is kept
+    under ``processed``, so the results view does not process the merged
+    payload again.
+    """
+    builder = CandidateFrameBuilder()
+    response = _call_as_dict(
+        load_all_candidates,
+        access_token,
+        filters.get("opening_id", ""),
+        filters.get("stage", ""),
+        filters.get("num_per_page", 10),
+        concurrency=DEFAULT_FANOUT_CONCURRENCY,
+        on_page=builder.append,
+    )
+    if response["success"]:
+        response["processed"] = builder.result(response["data"])
+    return response
 
 
 def fetch_candidates(access_token: str, filters: Dict[str, Any]) -> Dict[str, Any]:
@@ -71,13 +116,64 @@ def fetch_candidate_messages(access_token: str, candidate_id: str) -> Dict[str,
     response = _fetch_candidate_messages_raw(access_token, candidate_id)
     return _handle_api_response(response)
 
+
+def fetch_message_thread(access_token: str, candidate_id: str) -> Dict[str, Any]:
+    """Fetch messages and return them as a compact MessageThread (the raw payload is dropped)."""
+    response = fetch_candidate_messages(access_token, candidate_id)
+    if response.get("success"):
+        response["data"] = normalize_messages(response.get("data", {}))
+    return response
+
 st.set_page_config(page_title="Base.vn Candidate Explorer", page_icon="📊", layout="wide")
 
+# Shared deadline for the concurrent detail + messages fetch in the candidate modal.
+MODAL_FETCH_DEADLINE_SECONDS = 20.0
+# Compact message threads kept per session, and how long one is reused before refetching.
+MESSAGE_THREADS_PER_SESSION = 8
+MESSAGE_THREAD_MAX_AGE_SECONDS = 120.0
+
 
-def _as_context_manager(obj: object) -> ContextManager[Any]:
-    if not (hasattr(obj, "__enter__") and hasattr(obj, "__exit__")):
-        raise TypeError(f"Object {obj!r} is not a context manager")
-    return cast(ContextManager[Any], obj)
+@st.cache_resource
+def _get_fetch_executor() -> ThreadPoolExecutor:
+    """Process-wide worker pool for concurrent Base.vn calls (survives reruns)."""
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="base-fetch")
+
+
+@st.cache_resource
+def _get_prefetch_executor() -> ThreadPoolExecutor:
+    """Small pool for background prefetch, separate so it never delays foreground fetches."""
+    return ThreadPoolExecutor(max_workers=DEFAULT_PREFETCH_WORKERS, thread_name_prefix="base-prefetch")
+
+
+def get_prefetcher() -> Prefetcher:
+    if st.session_state.get("prefetcher") is None:
+        st.session_state.prefetcher = Prefetcher(_get_prefetch_executor())
+    return st.session_state.prefetcher
+
+
+@st.cache_resource
+def _get_snapshot_store() -> SnapshotStore:
+    """Local SQLite mirror of openings/candidates shared by every session."""
+    return SnapshotStore.from_env()
+
+
+def fetch_candidates_from_snapshot(
+    access_token: str, filters: Dict[str, Any], force_sync: bool = False
+) -> Dict[str, Any]:
+    """Incrementally sync the opening, then answer the query from the local store."""
+    store = _get_snapshot_store()
+    sync_response = _call_as_dict(store.sync_opening, access_token, filters.get("opening_id", ""), force=force_sync)
+    if not sync_response.get("success"):
+        return sync_response
+    response = _call_as_dict(
+        store.candidate_page,
+        filters.get("opening_id", ""),
+        filters.get("stage", ""),
+        filters.get("page", 1),
+        filters.get("num_per_page", 10),
+    )
+    response["sync"] = sync_response["data"]
+    return response
 
 
 def ensure_session_defaults() -> None:
@@ -85,12 +181,20 @@ def ensure_session_defaults() -> None:
         st.session_state.active_tab = "filters"
     if "openings_raw" not in st.session_state:
         st.session_state.openings_raw = []
+    if "openings_model" not in st.session_state:
+        st.session_state.openings_model = None
     if "candidate_results" not in st.session_state:
         st.session_state.candidate_results = None
+    if "candidate_results_hash" not in st.session_state:
+        st.session_state.candidate_results_hash = None
     if "latest_candidate_filters" not in st.session_state:
         st.session_state.latest_candidate_filters = {}
     if "selected_candidate_id" not in st.session_state:
         st.session_state.selected_candidate_id = None
+    if "pipeline_analytics" not in st.session_state:
+        st.session_state.pipeline_analytics = {}
+    if "message_threads" not in st.session_state:
+        st.session_state.message_threads = {}
 
 
 def render_page_header() -> None:
@@ -134,12 +238,33 @@ def render_access_token_form(env_values: Dict[str, Any]) -> Optional[str]:
     return access_token_value
 
 
+def store_openings(openings: List[Dict[str, Any]]) -> None:
+    """Save the openings payload and rebuild the lookup model only if the payload changed."""
+    st.session_state.openings_raw = openings
+    fingerprint = openings_fingerprint(openings)
+    current = st.session_state.get("openings_model")
+    if current is None or current.fingerprint != fingerprint:
+        st.session_state.openings_model = OpeningsModel.build(openings, fingerprint)
+
+
+def get_openings_model() -> OpeningsModel:
+    model = st.session_state.get("openings_model")
+    if model is None:
+        openings = st.session_state.get("openings_raw") or []
+        if not openings:
+            return EMPTY_OPENINGS
+        model = st.session_state.openings_model = OpeningsModel.build(openings)
+    return model
+
+
 def handle_opening_fetch(access_token: str) -> bool:
     if st.button("🔄 Lấy danh sách Openings", key="fetch_openings_btn"):
         with st.spinner("Đang lấy danh sách openings..."):
-            openings_response = fetch_openings_list(access_token)
+            openings_response = fetch_all_openings(access_token)
             if openings_response.get("success"):
-                st.session_state.openings_raw = openings_response.get("data", [])
+                store_openings(openings_response.get("data", []))
+                if st.session_state.get("use_snapshot"):
+                    _get_snapshot_store().upsert_openings(st.session_state.openings_raw)
                 st.success(f"Đã lấy được {len(st.session_state.openings_raw)} opening(s).")
                 return True
             else:
@@ -149,10 +274,209 @@ def handle_opening_fetch(access_token: str) -> bool:
     return False
 
 
-def render_candidate_filters(access_token: str) -> None:
+def render_cache_controls() -> None:
+    stats = cache_stats()
+    if not stats:
+        return
+    with st.expander("Cache API", expanded=False):
+        col_hits, col_misses, col_entries = st.columns(3)
+        col_hits.metric("Hit", stats.get("hits", 0))
+        col_misses.metric("Miss", stats.get("misses", 0))
+        col_entries.metric("Mục", stats.get("entries", 0))
+        st.caption(f"Dung lượng: {stats.get('bytes', 0) / 1024:.1f} KB · Đã loại bỏ: {stats.get('evictions', 0)}")
+        if st.button("🧹 Xóa cache", key="clear_cache_btn"):
+            removed = invalidate_cache()
+            st.success(f"Đã xóa {removed} mục khỏi cache.")
+
+
+def _results_fingerprint(data: Any) -> str:
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def store_candidate_results(candidate_response: Dict[str, Any], filters: Dict[str, Any]) -> None:
+    """Save a successful search and its content hash (used to memoize processing)."""
+    st.session_state.candidate_results = candidate_response
+    st.session_state.selected_candidate_id = None
+    st.session_state.candidate_results_hash = _results_fingerprint(candidate_response.get("data", {}))
+    st.session_state.latest_candidate_filters = filters
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _process_candidate_results(fingerprint: str, _data: Dict[str, Any]) -> Dict[str, Any]:
+    # `_data` is excluded from Streamlit's argument hashing; `fingerprint` is the cache key.
+    return process_candidate_data(_data)
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _candidate_search_index(fingerprint: str, _data: Dict[str, Any]) -> CandidateSearchIndex:
+    # Shared, read-only after build: cache_resource avoids copying the index on every rerun.
+    return build_search_index(_data)
+
+
+def get_candidate_search_index() -> Optional[CandidateSearchIndex]:
+    """Search index over the stored results, built once per result fingerprint."""
+    results = st.session_state.get("candidate_results")
+    fingerprint = st.session_state.get("candidate_results_hash")
+    if not results or not fingerprint:
+        return None
+    return _candidate_search_index(fingerprint, results.get("data", {}))
+
+
+def get_processed_candidate_results() -> Optional[Dict[str, Any]]:
+    """Processed metrics/DataFrame for the stored results, memoized across reruns."""
+    results = st.session_state.get("candidate_results")
+    if not results:
+        return None
+    if results.get("processed") is not None:
+        return results["processed"]
+    data = results.get("data", {})
+    fingerprint = st.session_state.get("candidate_results_hash")
+    if not fingerprint:
+        fingerprint = _results_fingerprint(data)
+        st.session_state.candidate_results_hash = fingerprint
+    return _process_candidate_results(fingerprint, data)
+
+
+def _analytics_source(opening_id: str) -> Optional[tuple]:
+    """``(source_fingerprint, load_candidates, complete)`` for the analytics of ``opening_id``.
+
+    With the local snapshot the whole opening is read from SQLite, and only
+    again after a sync wrote changes; otherwise the stored results are used
+    (complete only when every page of the opening was loaded).
+    """
+    if st.session_state.get("use_snapshot"):
+        store = _get_snapshot_store()
+        synced_at = store.last_synced_at(opening_id)
+        if synced_at is not None:
+            fingerprint = f"snapshot:{synced_at}"
+            return fingerprint, lambda: store.candidate_page(opening_id, "", "all")["candidates"], True
+
+    results = st.session_state.get("candidate_results") or {}
+    filters = st.session_state.get("latest_candidate_filters") or {}
+    if not results or str(filters.get("opening_id", "")) != opening_id:
+        return None
+    data = results.get("data", {}) or {}
+    complete = filters.get("page") == "all" and not filters.get("stage")
+    fingerprint = st.session_state.get("candidate_results_hash") or _results_fingerprint(data)
+    return fingerprint, lambda: data.get("candidates", []) or [], complete
+
+
+def get_pipeline_analytics(opening_id: str) -> Optional[PipelineAnalytics]:
+    """Per-opening funnel aggregates, updated only with the rows that changed since the last source."""
+    source = _analytics_source(opening_id)
+    per_opening = st.session_state.pipeline_analytics
+    analytics = per_opening.get(opening_id)
+    if source is None:
+        return analytics
+    fingerprint, load_candidates, complete = source
+    if analytics is None:
+        analytics = per_opening[opening_id] = PipelineAnalytics()
+    if analytics.source_fingerprint != fingerprint:
+        analytics.update(load_candidates(), complete=complete)
+        analytics.source_fingerprint = fingerprint
+    return analytics
+
+
+def render_pipeline_analytics_section() -> None:
+    st.subheader("Phân tích pipeline")
+    filters = st.session_state.get("latest_candidate_filters") or {}
+    opening_id = str(filters.get("opening_id") or "")
+    if not opening_id:
+        st.info("Hãy tìm kiếm ứng viên của một opening để xem phân tích.")
+        return
+    openings = get_openings_model()
+    analytics = get_pipeline_analytics(opening_id)
+    if analytics is None:
+        st.info("Chưa có dữ liệu cho opening này.")
+        return
+    st.caption(f"Opening: {openings.opening_name(opening_id) or opening_id} · {len(analytics)} ứng viên đã phân tích")
+    if not st.session_state.get("use_snapshot") and filters.get("page") != "all":
+        st.caption("Chỉ gồm các trang đã tải. Chọn tải tất cả các trang hoặc dùng dữ liệu cục bộ để phân tích toàn bộ opening.")
+    render_pipeline_analytics(analytics, openings.stage_options(opening_id).values())
+
+
+EXPORT_FORMAT_LABELS = {"parquet": "Parquet", "arrow": "Arrow IPC (Feather)", "csv": "CSV"}
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _export_candidate_results(fingerprint: str, fmt: str, _data: Dict[str, Any]) -> bytes:
+    return export_candidates(_data.get("candidates", []) or [], fmt)
+
+
+def render_export_controls() -> None:
+    """Download the stored results as a columnar file, without calling Base.vn again."""
+    results = st.session_state.get("candidate_results") or {}
+    fingerprint = st.session_state.get("candidate_results_hash")
+    if not results or not fingerprint:
+        return
+    filters = st.session_state.get("latest_candidate_filters") or {}
+    col_format, col_download = st.columns([2, 1], vertical_alignment="bottom")
+    fmt = col_format.selectbox(
+        "Xuất dữ liệu",
+        options=available_formats(),
+        format_func=lambda x: EXPORT_FORMAT_LABELS.get(x, x),
+        key="export_format",
+    )
+    file_stem = "_".join(
+        str(part) for part in ("candidates", filters.get("opening_id"), filters.get("stage"), filters.get("page")) if part
+    )
+    col_download.download_button(
+        "💾 Tải xuống",
+        data=_export_candidate_results(fingerprint, fmt, results.get("data", {})),
+        file_name=f"{file_stem}.{EXPORT_EXTENSIONS[fmt]}",
+        mime=EXPORT_MEDIA_TYPES[fmt],
+        key="export_download_btn",
+        width="stretch",
+    )
+
+
+def _same_query(filters: Dict[str, Any], latest: Dict[str, Any]) -> bool:
+    """Whether the filter widgets still describe the stored results ("all" matches any page)."""
+    keys = ("opening_id", "stage", "num_per_page")
+    if latest.get("page") != "all":
+        keys += ("page",)
+    return all(filters.get(key) == latest.get(key) for key in keys)
+
+
+def update_prefetch(access_token: str, filters: Dict[str, Any]) -> None:
+    """Warm the cache for the first candidates of the results and the next page.
+
+    Cancelled as soon as the filter widgets no longer match the stored results.
+    """
+    prefetcher = get_prefetcher()
+    results = st.session_state.get("candidate_results") or {}
+    latest = st.session_state.get("latest_candidate_filters") or {}
+    if not results or not _same_query(filters, latest):
+        prefetcher.cancel()
+        return
+
+    data = results.get("data", {}) or {}
+    candidate_ids = [
+        candidate["id"]
+        for candidate in (data.get("candidates") or [])[:DEFAULT_PREFETCH_CANDIDATES]
+        if isinstance(candidate, dict) and candidate.get("id") is not None
+    ]
+    next_page_filters = None
+    page = latest.get("page")
+    # The snapshot answers pages locally, so only Base.vn pages are worth prefetching
+    if isinstance(page, int) and not results.get("sync"):
+        try:
+            has_next = page * int(latest.get("num_per_page", 10)) < int(data.get("total") or 0)
+        except (TypeError, ValueError):
+            has_next = False
+        if has_next:
+            next_page_filters = {**latest, "page": page + 1}
+
+    key = (st.session_state.get("candidate_results_hash"), json.dumps(latest, sort_keys=True, default=str))
+    if key != prefetcher.key:
+        prefetcher.schedule(key, candidate_prefetch_tasks(access_token, candidate_ids, next_page_filters))
+
+
+def render_candidate_filters(access_token: str, env_values: Dict[str, Any]) -> None:
     st.subheader("Bộ lọc ứng viên")
-    openings = st.session_state.get("openings_raw", [])
-    opening_options = {op["id"]: op.get("name", "No name") for op in openings if isinstance(op, dict) and "id" in op}
+    openings = get_openings_model()
+    opening_options = openings.opening_options
     if not opening_options:
         st.warning("Chưa có dữ liệu opening. Hãy nhấn 'Lấy danh sách Openings' ở trên.")
         return
@@ -167,9 +491,7 @@ def render_candidate_filters(access_token: str) -> None:
         st.info("Vui lòng chọn một opening để tiếp tục.")
         return
 
-    selected_opening = next((op for op in openings if op.get("id") == selected_opening_id), {})
-    stages = selected_opening.get("stages", [])
-    stage_options = {s["id"]: s.get("name", "No name") for s in stages if isinstance(s, dict) and "id" in s}
+    stage_options = openings.stage_options(selected_opening_id)
 
     stage_id_value: Optional[str] = None
     if stage_options:
@@ -184,7 +506,6 @@ def render_candidate_filters(access_token: str) -> None:
         stage_id_value = st.text_input("Nhập Stage ID (nếu có)", key="stage_id_manual")
 
     page = st.number_input("Trang (bắt đầu từ 1)", min_value=1, value=1, key="page_input")
-    env_values = load_env_values()
     num_per_page_filter = st.number_input(
         "Số ứng viên trên trang",
         min_value=1,
@@ -193,81 +514,198 @@ def render_candidate_filters(access_token: str) -> None:
         key="num_per_page_filter",
     )
 
-    if st.button("🔍 Tìm kiếm ứng viên", key="fetch_candidates_btn"):
-        filters = {
-            "opening_id": selected_opening_id,
-            "stage": stage_id_value if stage_id_value else "",
-            "page": page,
-            "num_per_page": num_per_page_filter,
-        }
+    filters = {
+        "opening_id": selected_opening_id,
+        "stage": stage_id_value if stage_id_value else "",
+        "page": page,
+        "num_per_page": num_per_page_filter,
+    }
+    use_snapshot = st.toggle(
+        "🗄️ Dùng dữ liệu cục bộ (đồng bộ tăng dần)",
+        key="use_snapshot",
+        help=(
+            "Truy vấn bản sao SQLite cục bộ; Base.vn chỉ được gọi để kiểm tra/đồng bộ phần thay đổi. "
+            "Lần kiểm tra nhanh chỉ so sánh trang đầu: thay đổi ở các trang sau được cập nhật ở lần "
+            "đồng bộ toàn bộ kế tiếp (BASE_SNAPSHOT_FULL_SYNC_INTERVAL) hoặc khi nhấn 'Đồng bộ lại'."
+        ),
+    )
+
+    col_search, col_load_all = st.columns(2)
+    if col_search.button("🔍 Tìm kiếm ứng viên", key="fetch_candidates_btn"):
         with st.spinner("Đang tìm kiếm ứng viên..."):
-            candidate_response = fetch_candidates(access_token, filters)
+            if use_snapshot:
+                candidate_response = fetch_candidates_from_snapshot(access_token, filters)
+            else:
+                candidate_response = fetch_candidates(access_token, filters)
             if candidate_response.get("success"):
-                st.session_state.candidate_results = candidate_response
-                st.session_state.latest_candidate_filters = filters
+                store_candidate_results(candidate_response, filters)
                 st.success("Tìm kiếm thành công!")
+                render_sync_summary(candidate_response)
             else:
                 error_msg = candidate_response.get("error", "Lỗi không xác định")
                 st.error(f"Lỗi khi tìm kiếm ứng viên: {error_msg}")
 
+    if col_load_all.button("📥 Tải tất cả các trang", key="fetch_all_candidates_btn"):
+        filters = {**filters, "page": "all"}
+        with st.spinner("Đang tải toàn bộ ứng viên..."):
+            if use_snapshot:
+                candidate_response = fetch_candidates_from_snapshot(access_token, filters)
+            else:
+                candidate_response = fetch_all_candidates(access_token, filters)
+            if candidate_response.get("success"):
+                store_candidate_results(candidate_response, filters)
+                render_sync_summary(candidate_response)
+                st.success(f"Đã tải {candidate_response['data'].get('count', 0)} ứng viên.")
+            else:
+                error_msg = candidate_response.get("error", "Lỗi không xác định")
+                st.error(f"Lỗi khi tải ứng viên: {error_msg}")
 
-def fetch_candidates_with_proxy(access_token: str, filters: Dict[str, Any]) -> Dict[str, Any]:
-    proxy_url = "http://127.0.0.1:8000/candidates"
-    headers = {"Content-Type": "application/json"}
-    body = {
-        "access_token": access_token,
-        "opening_id": filters.get("opening_id", ""),
-        "stage_id": filters.get("stage", ""),
-        "page": filters.get("page", 1),
-        "num_per_page": filters.get("num_per_page", 10),
-    }
+
+    if use_snapshot:
+        last_synced = _get_snapshot_store().last_synced_at(selected_opening_id)
+        if last_synced:
+            st.caption(f"Đồng bộ cục bộ lần cuối: {time.strftime('%d/%m/%Y %H:%M', time.localtime(last_synced))}")
+        if st.button("♻️ Đồng bộ lại toàn bộ opening", key="force_snapshot_sync_btn"):
+            with st.spinner("Đang đồng bộ opening..."):
+                candidate_response = fetch_candidates_from_snapshot(access_token, filters, force_sync=True)
+                if candidate_response.get("success"):
+                    store_candidate_results(candidate_response, filters)
+                    render_sync_summary(candidate_response)
+                else:
+                    error_msg = candidate_response.get("error", "Lỗi không xác định")
+                    st.error(f"Lỗi khi đồng bộ: {error_msg}")
+
+    update_prefetch(access_token, filters)
+
+
+def render_sync_summary(candidate_response: Dict[str, Any]) -> None:
+    sync = candidate_response.get("sync")
+    if sync is None:
+        return
+    if sync.fresh:
+        st.caption("Dữ liệu cục bộ đã mới nhất, không cần tải lại từ Base.vn.")
+    else:
+        st.caption(
+            f"Đã đồng bộ {sync.pages} trang: +{sync.inserted} mới · {sync.updated} cập nhật · "
+            f"{sync.deleted} xóa ({sync.duration:.1f}s)"
+        )
+    if not sync.complete:
+        st.warning("Base.vn trả về dữ liệu lỗi cho một số trang; chưa xóa ứng viên cục bộ nào, lần đồng bộ sau sẽ thử lại.")
+
+
+def _response_from_future(future: Future) -> Dict[str, Any]:
     try:
-        response = requests.post(proxy_url, json=body, headers=headers, timeout=30)
-        response.raise_for_status()
-        return response.json()
-    except requests.RequestException as e:
+        return future.result()
+    except Exception as e:
         return {"success": False, "error": str(e)}
 
 
-def render_candidate_modal(candidate_id: str, access_token: str) -> None:
-    candidate_response = fetch_candidate_detail(access_token, candidate_id)
-    messages_response = fetch_candidate_messages(access_token, candidate_id)
+def _render_detail_tab(candidate_response: Dict[str, Any]) -> None:
+    if candidate_response.get("success"):
+        render_candidate_detail_view(candidate_response.get("data", {}), openings=get_openings_model())
+    else:
+        error_msg = candidate_response.get("error", "Lỗi không xác định")
+        st.error(f"Lỗi khi lấy chi tiết ứng viên: {error_msg}")
 
-    # Use dialog if available (Streamlit 1.50+), otherwise use expander
-    try:
-        dialog_ctx = st.dialog(f"Chi tiết ứng viên #{candidate_id}")
-        with _as_context_manager(dialog_ctx):
-            tab_detail, tab_messages = st.tabs(["Thông tin chi tiết", "Tin nhắn"])
-            with tab_detail:
-                if candidate_response.get("success"):
-                    render_candidate_detail_view(candidate_response.get("data", {}))
-                else:
-                    error_msg = candidate_response.get("error", "Lỗi không xác định")
-                    st.error(f"Lỗi khi lấy chi tiết ứng viên: {error_msg}")
 
-            with tab_messages:
-                if messages_response.get("success"):
-                    render_candidate_messages_view(messages_response.get("data", {}))
-                else:
-                    error_msg = messages_response.get("error", "Lỗi không xác định")
-                    st.error(f"Lỗi khi lấy tin nhắn: {error_msg}")
-    except AttributeError:
-        # Fallback to expander if dialog is not available
-        with st.expander(f"Chi tiết ứng viên #{candidate_id}", expanded=True):
-            tab_detail, tab_messages = st.tabs(["Thông tin chi tiết", "Tin nhắn"])
-            with tab_detail:
-                if candidate_response.get("success"):
-                    render_candidate_detail_view(candidate_response.get("data", {}))
-                else:
-                    error_msg = candidate_response.get("error", "Lỗi không xác định")
-                    st.error(f"Lỗi khi lấy chi tiết ứng viên: {error_msg}")
+def store_message_thread(candidate_id: str, thread: MessageThread) -> None:
+    """Keep the compact thread of the most recently opened candidates (oldest evicted first)."""
+    threads = st.session_state.message_threads
+    threads.pop(candidate_id, None)
+    threads[candidate_id] = (time.monotonic(), thread)
+    while len(threads) > MESSAGE_THREADS_PER_SESSION:
+        threads.pop(next(iter(threads)))
+
+
+def get_message_thread(candidate_id: str) -> Optional[MessageThread]:
+    entry = st.session_state.get("message_threads", {}).get(candidate_id)
+    if entry is None or time.monotonic() - entry[0] > MESSAGE_THREAD_MAX_AGE_SECONDS:
+        return None
+    return entry[1]
+
+
+def _render_messages_tab(messages_response: Dict[str, Any]) -> None:
+    if messages_response.get("success"):
+        render_candidate_messages_view(messages_response["data"], openings=get_openings_model())
+    else:
+        error_msg = messages_response.get("error", "Lỗi không xác định")
+        st.error(f"Lỗi khi lấy tin nhắn: {error_msg}")
+
+
+def _render_candidate_tabs(candidate_id: str, access_token: str) -> None:
+    """Fetch detail and messages concurrently and fill each tab as soon as its payload arrives.
+
+    A message thread normalized within the last MESSAGE_THREAD_MAX_AGE_SECONDS
+    is rendered from session state, so reruns of the modal ("load more",
+    expanding a message) do not refetch or re-normalize it.
+    """
+    executor = _get_fetch_executor()
+    thread = get_message_thread(candidate_id)
+    futures: Dict[Future, str] = {executor.submit(fetch_candidate_detail, access_token, candidate_id): "detail"}
+    if thread is None:
+        futures[executor.submit(fetch_message_thread, access_token, candidate_id)] = "messages"
+    renderers = {"detail": _render_detail_tab, "messages": _render_messages_tab}
+
+    tab_detail, tab_messages = st.tabs(["Thông tin chi tiết", "Tin nhắn"])
+    placeholders = {"detail": tab_detail.empty(), "messages": tab_messages.empty()}
+    placeholders["detail"].info("Đang tải dữ liệu...")
+    if thread is None:
+        placeholders["messages"].info("Đang tải dữ liệu...")
+    else:
+        with placeholders["messages"].container():
+            _render_messages_tab({"success": True, "data": thread})
+
+    deadline = time.monotonic() + MODAL_FETCH_DEADLINE_SECONDS
+    pending = set(futures)
+    while pending:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            kind = futures[future]
+            response = _response_from_future(future)
+            if kind == "messages" and response.get("success"):
+                store_message_thread(candidate_id, response["data"])
+            with placeholders[kind].container():
+                renderers[kind](response)
+
+    for future in pending:
+        future.cancel()
+        placeholders[futures[future]].error(
+            f"Hết thời gian chờ ({MODAL_FETCH_DEADLINE_SECONDS:.0f}s) khi tải dữ liệu. Vui lòng thử lại."
+        )
 
-            with tab_messages:
-                if messages_response.get("success"):
-                    render_candidate_messages_view(messages_response.get("data", {}))
-                else:
-                    error_msg = messages_response.get("error", "Lỗi không xác định")
-                    st.error(f"Lỗi khi lấy tin nhắn: {error_msg}")
+
+def close_candidate_modal() -> None:
+    st.session_state.selected_candidate_id = None
+    reset_candidate_selection()
+
+
+def open_selected_candidate(access_token: str, selected_candidate_id: Optional[str]) -> None:
+    """Remember a new selection and keep the modal open across reruns until it is dismissed."""
+    if selected_candidate_id:
+        st.session_state.selected_candidate_id = selected_candidate_id
+    candidate_id = st.session_state.get("selected_candidate_id")
+    if candidate_id:
+        render_candidate_modal(candidate_id, access_token)
+
+
+def render_candidate_modal(candidate_id: str, access_token: str) -> None:
+    title = f"Chi tiết ứng viên #{candidate_id}"
+    if not hasattr(st, "dialog"):
+        # Fallback to expander on Streamlit versions without dialogs
+        with st.expander(title, expanded=True):
+            _render_candidate_tabs(candidate_id, access_token)
+            st.button("Đóng", key="close_candidate_btn", on_click=close_candidate_modal)
+        return
+
+    # st.dialog is a decorator: the decorated function renders inside the modal
+    @st.dialog(title, width="large", on_dismiss=close_candidate_modal)
+    def _candidate_dialog() -> None:
+        _render_candidate_tabs(candidate_id, access_token)
+
+    _candidate_dialog()
 
 
 def render_filter_summary() -> None:
@@ -279,50 +717,60 @@ def render_filter_summary() -> None:
     st.markdown(filter_summary)
 
 
+LIST_MODE_LABELS = {"table": "Bảng", "cards": "Thẻ (từng ứng viên)"}
+
+
+def render_list_mode_selector() -> str:
+    return st.radio(
+        "Kiểu hiển thị",
+        options=list(LIST_MODE_LABELS.keys()),
+        format_func=LIST_MODE_LABELS.get,
+        horizontal=True,
+        key="candidate_list_mode",
+    )
+
+
 def render_candidate_results(access_token: str) -> None:
     st.subheader("Kết quả tìm kiếm")
-    results = st.session_state.get("candidate_results")
-    if not results:
+    processed = get_processed_candidate_results()
+    if not processed:
         st.info("Chưa có kết quả nào. Hãy tìm kiếm ứng viên ở trên.")
         return
 
     render_filter_summary()
-    data = results.get("data", {})
-    processed = process_candidate_data(data)
     metrics = processed["metrics"]
     df = processed["dataframe"]
 
     render_metrics(metrics)
+    render_export_controls()
     st.divider()
 
-    selected_candidate_id = render_candidate_list(df)
-    if selected_candidate_id:
-        st.session_state.selected_candidate_id = selected_candidate_id
-        render_candidate_modal(selected_candidate_id, access_token)
+    selected_candidate_id = render_candidate_list(
+        df, mode=render_list_mode_selector(), search_index=get_candidate_search_index()
+    )
+    open_selected_candidate(access_token, selected_candidate_id)
 
 
 def render_cached_candidate_results(access_token: str) -> None:
     st.subheader("Kết quả đã lưu")
     if st.session_state.candidate_results:
         render_filter_summary()
-        data = st.session_state.candidate_results.get("data", {})
-        processed = process_candidate_data(data)
+        processed = get_processed_candidate_results()
         metrics = processed["metrics"]
         df = processed["dataframe"]
 
         render_metrics(metrics)
         st.divider()
 
-        selected_candidate_id = render_candidate_list(df)
-        if selected_candidate_id:
-            st.session_state.selected_candidate_id = selected_candidate_id
-            render_candidate_modal(selected_candidate_id, access_token)
+        selected_candidate_id = render_candidate_list(df, search_index=get_candidate_search_index())
+        open_selected_candidate(access_token, selected_candidate_id)
     else:
         st.info("Chưa có kết quả nào được lưu.")
 
 
 def main() -> None:
     ensure_session_defaults()
+    inject_styles()
     render_page_header()
 
     with st.sidebar:
@@ -334,14 +782,18 @@ def main() -> None:
 
         st.divider()
         handle_opening_fetch(access_token)
+        render_cache_controls()
 
-    tab_filters, tab_results = st.tabs(["Bộ lọc", "Kết quả"])
+    tab_filters, tab_results, tab_analytics = st.tabs(["Bộ lọc", "Kết quả", "Phân tích"])
     with tab_filters:
-        render_candidate_filters(access_token)
+        render_candidate_filters(access_token, env_values)
 
     with tab_results:
         render_candidate_results(access_token)
 
+    with tab_analytics:
+        render_pipeline_analytics_section()
+
 
 if __name__ == "__main__":
     main()
@@ -2,30 +2,116 @@
 
 from __future__ import annotations
 
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Mapping
+from typing import Dict, Iterator, Mapping, Optional, Tuple
 
-from dotenv import dotenv_values, load_dotenv, set_key
+from dotenv import dotenv_values, set_key
+
+try:  # pragma: no cover - POSIX only
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
 
 
 ENV_PATH = Path(__file__).resolve().parent.parent / ".env"
 
 
+class EnvConfig:
+    """In-memory view of a .env file, re-parsed only when the file changes.
+
+    The file is identified by its ``(mtime_ns, size)`` signature, so an
+    unchanged file costs a single ``stat`` per call. ``os.environ`` is only
+    updated when the parsed values actually change.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._signature: Optional[Tuple[int, int]] = None
+        self._values: Dict[str, str] = {}
+
+    def _stat_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def values(self) -> Dict[str, str]:
+        """Return the current values, reloading the file if it changed on disk."""
+        signature = self._stat_signature()
+        with self._lock:
+            if signature != self._signature:
+                self._apply(signature)
+            return dict(self._values)
+
+    def reload(self) -> Dict[str, str]:
+        """Force a re-read regardless of the file signature."""
+        with self._lock:
+            self._apply(self._stat_signature())
+            return dict(self._values)
+
+    def _apply(self, signature: Optional[Tuple[int, int]]) -> None:
+        values: Dict[str, str] = {}
+        if signature is not None:
+            values = {k: v for k, v in dotenv_values(self.path).items() if v is not None}
+        for key, value in values.items():
+            if self._values.get(key) != value or os.environ.get(key) != value:
+                os.environ[key] = value
+        self._values = values
+        self._signature = signature
+
+
+@contextmanager
+def _file_lock(path: Path) -> Iterator[None]:
+    """Exclusive inter-process lock on ``<path>.lock`` (no-op without fcntl)."""
+    if fcntl is None:
+        yield
+        return
+    lock_path = path.with_name(path.name + ".lock")
+    with open(lock_path, "a") as handle:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+_env_config = EnvConfig(ENV_PATH)
+_write_lock = threading.Lock()
+
+
 def load_env_values() -> Dict[str, str]:
     """Load environment values from .env into both a dict and the process."""
-    if ENV_PATH.exists():
-        load_dotenv(ENV_PATH, override=True)
-        return {k: v for k, v in dotenv_values(ENV_PATH).items() if v is not None}
-    return {}
+    return _env_config.values()
 
 
 def save_env_values(values: Mapping[str, str]) -> Dict[str, str]:
-    """Persist provided key/value pairs into the .env file and reload them."""
-    if not ENV_PATH.exists():
-        ENV_PATH.touch()
-    for key, value in values.items():
-        set_key(str(ENV_PATH), key, value or "")
-    return load_env_values()
+    """Persist provided key/value pairs into the .env file and reload them.
+
+    The update is written to a temporary file next to .env and swapped in
+    with ``os.replace``, under a lock file, so concurrent writers never see
+    or produce a partially written file.
+    """
+    with _write_lock, _file_lock(ENV_PATH):
+        fd, tmp_name = tempfile.mkstemp(prefix=".env.", suffix=".tmp", dir=ENV_PATH.parent)
+        os.close(fd)
+        try:
+            if ENV_PATH.exists():
+                shutil.copymode(ENV_PATH, tmp_name)
+                shutil.copyfile(ENV_PATH, tmp_name)
+            for key, value in values.items():
+                set_key(tmp_name, key, value or "")
+            os.replace(tmp_name, ENV_PATH)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+    return _env_config.reload()
 
 
 def get_default_num_per_page(env_values: Mapping[str, str]) -> int:
@@ -41,6 +127,7 @@ def get_default_num_per_page(env_values: Mapping[str, str]) -> int:
 
 __all__ = [
     "ENV_PATH",
+    "EnvConfig",
     "load_env_values",
     "save_env_values",
     "get_default_num_per_page",
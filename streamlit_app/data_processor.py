@@ -1,48 +1,173 @@
 # data_processor.py
 
+from itertools import islice
+
 import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Tên các cột của DataFrame ứng viên, theo thứ tự hiển thị
+CANDIDATE_COLUMNS = (
+    "ID",
+    "Họ & Tên",
+    "Email",
+    "SĐT",
+    "Vị trí ứng tuyển",
+    "Giai đoạn",
+    "Nguồn",
+    "CV Link",
+)
+
+# Các cột có ít giá trị lặp lại nhiều -> dtype category để tiết kiệm bộ nhớ
+CATEGORICAL_COLUMNS = ("Vị trí ứng tuyển", "Giai đoạn", "Nguồn")
+
+
+def _extract_metrics(json_data):
+    return {
+        "total": json_data.get('total', 'N/A'),
+        "count": json_data.get('count', 'N/A'),
+        "page": json_data.get('page', 'N/A'),
+    }
+
+
+def extract_candidate_columns(candidates_list, columns=None):
+    """
+    Trích xuất các trường của ứng viên thành từng mảng theo cột trong một lượt duyệt.
+    Nếu truyền ``columns`` (dict cột -> list) thì nối thêm vào đó.
+    """
+    if columns is None:
+        columns = {name: [] for name in CANDIDATE_COLUMNS}
+
+    ids = columns["ID"]
+    names = columns["Họ & Tên"]
+    emails = columns["Email"]
+    phones = columns["SĐT"]
+    openings = columns["Vị trí ứng tuyển"]
+    stages = columns["Giai đoạn"]
+    sources = columns["Nguồn"]
+    cv_links = columns["CV Link"]
+
+    for c in candidates_list:
+        get = c.get
+        ids.append(get('id'))
+        names.append(get('name'))
+        emails.append(get('email'))
+        phones.append(get('phone'))
+        openings.append((get('opening_export') or {}).get('name', 'N/A'))
+        stages.append(get('stage_name', 'N/A'))
+        sources.append(get('source', 'N/A'))
+        # Xử lý CV link an toàn
+        cvs = get('cvs')
+        cv_links.append(cvs[0] if cvs else 'Không có')
+
+    return columns
+
+
+def build_candidate_frame(columns):
+    """Tạo DataFrame từ dict cột -> list, với dtype category cho stage/source/opening."""
+    df = pd.DataFrame(columns, columns=list(CANDIDATE_COLUMNS))
+    for name in CATEGORICAL_COLUMNS:
+        df[name] = df[name].astype("category")
+    return df
+
+
+def concat_candidate_frames(frames):
+    """
+    Nối các DataFrame ứng viên theo hàng; cột category được gộp bằng
+    union_categoricals để giữ dtype category (pd.concat sẽ đổi về object
+    khi danh mục của các khúc khác nhau).
+    """
+    if len(frames) == 1:
+        return frames[0]
+    columns = {}
+    for name in CANDIDATE_COLUMNS:
+        parts = [frame[name] for frame in frames]
+        if name in CATEGORICAL_COLUMNS:
+            columns[name] = union_categoricals(parts, ignore_order=True)
+        else:
+            columns[name] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns, columns=list(CANDIDATE_COLUMNS))
+
 
 def process_candidate_data(json_data):
     """
     Xử lý JSON phản hồi từ API Base.vn và trả về một Dict chứa
     DataFrame ứng viên và các chỉ số quan trọng.
     """
-    
+
     candidates_list = json_data.get('candidates', [])
-    
+
     # 1. Trích xuất chỉ số tổng quan
-    metrics = {
-        "total": json_data.get('total', 'N/A'),
-        "count": json_data.get('count', 'N/A'),
-        "page": json_data.get('page', 'N/A'),
-    }
+    metrics = _extract_metrics(json_data)
 
     if not candidates_list:
         return {"metrics": metrics, "dataframe": pd.DataFrame(), "count_candidates": 0}
 
-    # 2. Chuẩn bị dữ liệu cho DataFrame
-    display_data = []
-    for c in candidates_list:
-        # Xử lý CV link an toàn
-        cvs = c.get('cvs', [])
-        cv_link = cvs[0] if cvs and len(cvs) > 0 else 'Không có'
-        
-        display_data.append({
-            "ID": c.get('id'),
-            "Họ & Tên": c.get('name'),
-            "Email": c.get('email'),
-            "SĐT": c.get('phone'),
-            "Vị trí ứng tuyển": c.get('opening_export', {}).get('name', 'N/A'),
-            "Giai đoạn": c.get('stage_name', 'N/A'),
-            "Nguồn": c.get('source', 'N/A'),
-            "CV Link": cv_link
-        })
-        
-    # 3. Tạo DataFrame
-    df = pd.DataFrame(display_data)
-    
+    # 2. Trích xuất dữ liệu theo cột và tạo DataFrame
+    df = build_candidate_frame(extract_candidate_columns(candidates_list))
+
     return {
-        "metrics": metrics, 
-        "dataframe": df, 
+        "metrics": metrics,
+        "dataframe": df,
         "count_candidates": len(candidates_list)
     }
+
+
+class CandidateFrameBuilder:
+    """
+    Phiên bản streaming của process_candidate_data: mỗi trang (hoặc khúc
+    ứng viên) được chuyển thành một DataFrame nhỏ ngay khi tới; khi đọc,
+    các khúc mới được nối vào khung đã gộp thay vì dựng lại từ đầu.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._metrics = {"total": 'N/A', "count": 'N/A', "page": 'N/A'}
+        self._count = 0
+
+    def _add_chunk(self, candidates_list):
+        if candidates_list:
+            self._chunks.append(build_candidate_frame(extract_candidate_columns(candidates_list)))
+            self._count += len(candidates_list)
+
+    def append(self, json_data):
+        """Nối thêm một trang payload candidate/list."""
+        self._add_chunk(json_data.get('candidates', []) or [])
+        self._metrics = _extract_metrics(json_data)
+        self._metrics["count"] = self._count
+        return self
+
+    def extend(self, candidates, chunk_size=1000):
+        """
+        Nối thêm ứng viên từ một iterable (ví dụ ``api_client.stream_candidates``),
+        mỗi ``chunk_size`` ứng viên thành một khúc.
+        """
+        candidates = iter(candidates)
+        while True:
+            chunk = list(islice(candidates, chunk_size))
+            if not chunk:
+                break
+            self._add_chunk(chunk)
+        self._metrics["count"] = self._count
+        return self
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def dataframe(self):
+        if not self._count:
+            return pd.DataFrame()
+        if len(self._chunks) > 1:
+            self._chunks = [concat_candidate_frames(self._chunks)]
+        return self._chunks[0]
+
+    def result(self, json_data=None):
+        """
+        Trả về dict cùng định dạng với process_candidate_data. Nếu truyền
+        ``json_data`` (ví dụ payload đã gộp của mọi trang) thì chỉ số lấy từ đó.
+        """
+        return {
+            "metrics": _extract_metrics(json_data) if json_data is not None else dict(self._metrics),
+            "dataframe": self.dataframe,
+            "count_candidates": self._count,
+        }
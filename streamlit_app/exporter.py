@@ -0,0 +1,250 @@
+"""Columnar export of candidate tables (Parquet, Arrow IPC, CSV).
+
+Rows use the ``process_candidate_data`` column mapping. Pages are appended
+as they arrive and written out in chunks of ``chunk_rows``, so memory stays
+bounded by one chunk regardless of the dataset size. Stage/source/opening
+columns are dictionary-encoded with one growing dictionary per column, so
+codes stay stable across chunks (the Arrow IPC file receives dictionary
+deltas).
+
+Parquet and Arrow require ``pyarrow``; CSV works without it.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional
+
+from data_processor import CANDIDATE_COLUMNS, CATEGORICAL_COLUMNS, extract_candidate_columns
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is only needed for Parquet/Arrow export
+    pa = None
+
+
+EXPORT_FORMATS = ("parquet", "arrow", "csv")
+EXPORT_EXTENSIONS = {"parquet": "parquet", "arrow": "arrow", "csv": "csv"}
+EXPORT_MEDIA_TYPES = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+    "csv": "text/csv",
+}
+DEFAULT_CHUNK_ROWS = 5000
+
+
+def arrow_available() -> bool:
+    return pa is not None
+
+
+def available_formats() -> List[str]:
+    """Formats usable in this environment, preferred first."""
+    return list(EXPORT_FORMATS) if arrow_available() else ["csv"]
+
+
+def candidate_schema() -> "pa.Schema":
+    return pa.schema([
+        (name, pa.dictionary(pa.int32(), pa.string()) if name in CATEGORICAL_COLUMNS else pa.string())
+        for name in CANDIDATE_COLUMNS
+    ])
+
+
+def _as_text(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+class CandidateExportWriter:
+    """Incremental writer of candidate rows to a binary ``sink``.
+
+    Feed it ``candidate/list`` payloads with ``append`` (or raw candidate
+    lists with ``append_candidates``) and call ``close`` to flush the last
+    chunk and write the footer. The sink is never closed by the writer.
+    """
+
+    def __init__(self, sink: BinaryIO, fmt: str = "parquet", chunk_rows: int = DEFAULT_CHUNK_ROWS) -> None:
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        if fmt != "csv" and not arrow_available():
+            raise RuntimeError(f"Export to {fmt} requires 'pyarrow'")
+        self.fmt = fmt
+        self.chunk_rows = max(1, chunk_rows)
+        self.rows = 0
+        self._sink = sink
+        self._columns = self._empty_columns()
+        self._pending = 0
+        self._dictionaries: Dict[str, Dict[str, int]] = {name: {} for name in CATEGORICAL_COLUMNS}
+        self._writer: Any = None
+        self._text: Optional[io.TextIOWrapper] = None
+        self._closed = False
+
+    @staticmethod
+    def _empty_columns() -> Dict[str, List[Any]]:
+        return {name: [] for name in CANDIDATE_COLUMNS}
+
+    def append(self, json_data: Dict[str, Any]) -> "CandidateExportWriter":
+        """Append one ``candidate/list`` page payload."""
+        return self.append_candidates(json_data.get("candidates", []) or [])
+
+    def append_candidates(self, candidates_list: List[Dict[str, Any]]) -> "CandidateExportWriter":
+        extract_candidate_columns(candidates_list, self._columns)
+        self._pending += len(candidates_list)
+        if self._pending >= self.chunk_rows:
+            self.flush()
+        return self
+
+    def flush(self) -> None:
+        """Write the buffered rows as one chunk (Parquet row group / Arrow batch)."""
+        if not self._pending:
+            return
+        if self.fmt == "csv":
+            self._write_csv_chunk()
+        else:
+            self._write_arrow_chunk()
+        self.rows += self._pending
+        self._pending = 0
+        self._columns = self._empty_columns()
+
+    def _encode_dictionary(self, name: str, values: List[Any]) -> "pa.DictionaryArray":
+        codes = self._dictionaries[name]
+        indices = []
+        for value in values:
+            text = _as_text(value)
+            if text is None:
+                indices.append(None)
+                continue
+            code = codes.get(text)
+            if code is None:
+                code = codes[text] = len(codes)
+            indices.append(code)
+        # dict preserves insertion order, so the dictionary only ever grows
+        return pa.DictionaryArray.from_arrays(pa.array(indices, pa.int32()), pa.array(list(codes), pa.string()))
+
+    def _write_arrow_chunk(self) -> None:
+        schema = candidate_schema()
+        arrays = [
+            self._encode_dictionary(name, self._columns[name])
+            if name in CATEGORICAL_COLUMNS
+            else pa.array([_as_text(value) for value in self._columns[name]], pa.string())
+            for name in CANDIDATE_COLUMNS
+        ]
+        batch = pa.record_batch(arrays, schema=schema)
+        if self._writer is None:
+            if self.fmt == "parquet":
+                self._writer = pq.ParquetWriter(self._sink, schema, compression="zstd")
+            else:
+                options = pa_ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+                self._writer = pa_ipc.new_file(self._sink, schema, options=options)
+        self._writer.write_batch(batch)
+
+    def _write_csv_chunk(self) -> None:
+        if self._writer is None:
+            # utf-8-sig so Excel shows Vietnamese names correctly
+            self._text = io.TextIOWrapper(self._sink, encoding="utf-8-sig", newline="", write_through=True)
+            self._writer = csv.writer(self._text)
+            self._writer.writerow(CANDIDATE_COLUMNS)
+        self._writer.writerows(zip(*(self._columns[name] for name in CANDIDATE_COLUMNS)))
+
+    def close(self) -> int:
+        """Flush remaining rows, finish the file and return the number of rows written."""
+        if self._closed:
+            return self.rows
+        self._closed = True
+        self.flush()
+        if self._writer is None:
+            # No rows: still produce a valid, empty file with the header/schema
+            if self.fmt == "csv":
+                self._sink.write(",".join(CANDIDATE_COLUMNS).encode("utf-8-sig") + b"\r\n")
+            else:
+                self._write_arrow_chunk()
+        if self.fmt == "csv":
+            if self._text is not None:
+                self._text.flush()
+                self._text.detach()
+        else:
+            self._writer.close()
+        return self.rows
+
+    def __enter__(self) -> "CandidateExportWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class ChunkSink:
+    """Write-only file object that hands written bytes back through ``drain``.
+
+    Lets a writer feed a streaming HTTP response chunk by chunk.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data: Any) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def writable(self) -> bool:
+        return True
+
+    def readable(self) -> bool:
+        return False
+
+    def seekable(self) -> bool:
+        return False
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def export_pages(
+    pages: Iterable[Dict[str, Any]],
+    sink: BinaryIO,
+    fmt: str = "parquet",
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> int:
+    """Write every candidate of ``pages`` to ``sink``; returns the row count."""
+    with CandidateExportWriter(sink, fmt, chunk_rows) as writer:
+        for page in pages:
+            writer.append(page)
+    return writer.rows
+
+
+def export_candidates(candidates_list: List[Dict[str, Any]], fmt: str = "parquet") -> bytes:
+    """Export an in-memory candidate list (e.g. the stored results payload) to bytes."""
+    buffer = io.BytesIO()
+    with CandidateExportWriter(buffer, fmt) as writer:
+        writer.append_candidates(candidates_list)
+    return buffer.getvalue()
+
+
+__all__ = [
+    "EXPORT_FORMATS",
+    "EXPORT_EXTENSIONS",
+    "EXPORT_MEDIA_TYPES",
+    "CandidateExportWriter",
+    "ChunkSink",
+    "arrow_available",
+    "available_formats",
+    "candidate_schema",
+    "export_candidates",
+    "export_pages",
+]
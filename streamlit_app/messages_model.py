@@ -0,0 +1,173 @@
+"""Compact representation of ``candidate/messages`` payloads.
+
+``normalize_messages`` turns any known response shape into a
+``MessageThread`` once: slotted ``Message`` records, newest first, with
+repeated strings (author names/types, subjects, thread ids, event names)
+interned and long HTML bodies kept zlib-compressed until ``content`` is
+read. Raw payload fields that the UI never shows are dropped, so a thread
+is cheap to keep in session state.
+"""
+
+from __future__ import annotations
+
+import sys
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+MESSAGE_LIST_KEYS = ("messages", "data", "results", "items", "records", "threads")
+META_KEYS = ("candidate_id", "opening_id", "stage_id", "since")
+# Bodies shorter than this are kept as text: compression would not pay off
+COMPRESS_MIN_BYTES = 256
+
+
+def _intern(value: Any) -> Optional[str]:
+    if value in (None, ""):
+        return None
+    return sys.intern(str(value))
+
+
+def _as_int(value: Any) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class Message:
+    """One message; ``content`` decompresses the body on access."""
+
+    __slots__ = ("id", "thread_id", "subject", "author", "author_type", "since", "_body", "attachments", "events")
+
+    def __init__(
+        self,
+        id: Optional[str],
+        thread_id: Optional[str],
+        subject: Optional[str],
+        author: Optional[str],
+        author_type: Optional[str],
+        since: int,
+        body: str,
+        attachments: Tuple[Tuple[str, Optional[str]], ...] = (),
+        events: Tuple[Tuple[str, int], ...] = (),
+    ) -> None:
+        self.id = id
+        self.thread_id = thread_id
+        self.subject = subject
+        self.author = author
+        self.author_type = author_type
+        self.since = since
+        encoded = body.encode("utf-8")
+        self._body: Any = zlib.compress(encoded) if len(encoded) >= COMPRESS_MIN_BYTES else body
+        self.attachments = attachments
+        self.events = events
+
+    @classmethod
+    def from_payload(cls, message: Dict[str, Any]) -> "Message":
+        user = message.get("user") or {}
+        if not isinstance(user, dict):
+            user = {"name": user}
+        body = message.get("content") or message.get("body") or ""
+        body = body.replace("\\r\\n", "\n") if isinstance(body, str) else str(body)
+        attachments = tuple(
+            (
+                str(attachment.get("name") or attachment.get("filename") or "Tệp"),
+                attachment.get("url") or attachment.get("download_url") or None,
+            )
+            for attachment in message.get("attachments") or []
+            if isinstance(attachment, dict)
+        )
+        events = tuple(
+            (_intern(event.get("event")) or "unknown", _as_int(event.get("since")))
+            for event in message.get("tracking_events") or []
+            if isinstance(event, dict)
+        )
+        return cls(
+            id=None if message.get("id") in (None, "") else str(message["id"]),
+            thread_id=_intern(message.get("thread_id")),
+            subject=_intern(message.get("subject")),
+            author=_intern(user.get("name") or user.get("username") or user.get("email")),
+            author_type=_intern(user.get("type")),
+            since=_as_int(message.get("since")),
+            body=body,
+            attachments=attachments,
+            events=events,
+        )
+
+    @property
+    def content(self) -> str:
+        body = self._body
+        return zlib.decompress(body).decode("utf-8") if isinstance(body, bytes) else body
+
+    @property
+    def compressed(self) -> bool:
+        return isinstance(self._body, bytes)
+
+    def __repr__(self) -> str:
+        return f"Message(id={self.id!r}, subject={self.subject!r}, since={self.since})"
+
+
+class MessageThread:
+    """Messages of one candidate, newest first, plus the scalar metadata of the payload."""
+
+    __slots__ = ("messages", "meta")
+
+    def __init__(self, messages: Tuple[Message, ...] = (), meta: Optional[Dict[str, Any]] = None) -> None:
+        self.messages = messages
+        self.meta = meta or {}
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def __iter__(self) -> Iterator[Message]:
+        return iter(self.messages)
+
+
+def _find_message_list(payload: Any, path: List[Dict[str, Any]]) -> Optional[List[Any]]:
+    """Depth-first search for the first non-empty list under MESSAGE_LIST_KEYS; ``path`` collects the dicts walked."""
+    if not isinstance(payload, dict):
+        return None
+    path.append(payload)
+    for key in MESSAGE_LIST_KEYS:
+        value = payload.get(key)
+        if isinstance(value, list):
+            return value
+        if isinstance(value, dict):
+            found = _find_message_list(value, path)
+            if found:
+                return found
+    path.pop()
+    return None
+
+
+def normalize_messages(payload: Any) -> MessageThread:
+    """Build a ``MessageThread`` from a ``candidate/messages`` response of any supported shape."""
+    path: List[Dict[str, Any]] = []
+    if isinstance(payload, list):
+        raw_messages: List[Any] = payload
+    else:
+        raw_messages = _find_message_list(payload, path) or []
+        if not path and isinstance(payload, dict):
+            path.append(payload)
+
+    # Outer levels win over nested ones; only the fields the UI shows are kept
+    meta: Dict[str, Any] = {}
+    for node in path:
+        for key in META_KEYS:
+            value = node.get(key)
+            if key not in meta and value not in (None, "") and not isinstance(value, (dict, list)):
+                meta[key] = value
+
+    messages = [Message.from_payload(message) for message in raw_messages if isinstance(message, dict)]
+    messages.sort(key=lambda message: message.since, reverse=True)
+    return MessageThread(tuple(messages), meta)
+
+
+EMPTY_THREAD = MessageThread()
+
+
+__all__ = [
+    "EMPTY_THREAD",
+    "Message",
+    "MessageThread",
+    "normalize_messages",
+]
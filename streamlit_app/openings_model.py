@@ -0,0 +1,101 @@
+"""Normalized lookup tables over the ``opening/list`` payload.
+
+Built once per openings payload (see ``OpeningsModel.build``) and shared by
+the filters, the candidate detail view and the messages view, instead of
+scanning the raw list on every Streamlit rerun.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def openings_fingerprint(openings: List[Dict[str, Any]]) -> str:
+    payload = json.dumps(openings, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _key(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+@dataclass(frozen=True)
+class OpeningsModel:
+    """Openings keyed by id, stages keyed by id, and a stage -> opening reverse index.
+
+    All ids are normalized to ``str``. Dicts keep the payload order, so
+    ``opening_options``/``stage_options`` can feed a selectbox directly.
+    """
+
+    fingerprint: str
+    openings: Dict[str, Dict[str, Any]]
+    opening_options: Dict[str, str]
+    stages: Dict[str, Dict[str, str]]
+    stage_names: Dict[str, str]
+    stage_openings: Dict[str, Tuple[str, ...]]
+
+    @classmethod
+    def build(cls, openings: List[Dict[str, Any]], fingerprint: Optional[str] = None) -> "OpeningsModel":
+        by_id: Dict[str, Dict[str, Any]] = {}
+        options: Dict[str, str] = {}
+        stages: Dict[str, Dict[str, str]] = {}
+        stage_names: Dict[str, str] = {}
+        stage_openings: Dict[str, List[str]] = {}
+
+        for opening in openings or []:
+            if not isinstance(opening, dict) or "id" not in opening:
+                continue
+            opening_id = _key(opening["id"])
+            by_id[opening_id] = opening
+            options[opening_id] = opening.get("name", "No name")
+            opening_stages: Dict[str, str] = {}
+            for stage in opening.get("stages") or []:
+                if not isinstance(stage, dict) or "id" not in stage:
+                    continue
+                stage_id = _key(stage["id"])
+                name = stage.get("name", "No name")
+                opening_stages[stage_id] = name
+                stage_names.setdefault(stage_id, name)
+                stage_openings.setdefault(stage_id, []).append(opening_id)
+            stages[opening_id] = opening_stages
+
+        return cls(
+            fingerprint=fingerprint or openings_fingerprint(openings or []),
+            openings=by_id,
+            opening_options=options,
+            stages=stages,
+            stage_names=stage_names,
+            stage_openings={stage_id: tuple(ids) for stage_id, ids in stage_openings.items()},
+        )
+
+    def __len__(self) -> int:
+        return len(self.openings)
+
+    def opening(self, opening_id: Any) -> Dict[str, Any]:
+        return self.openings.get(_key(opening_id), {})
+
+    def opening_name(self, opening_id: Any) -> Optional[str]:
+        return self.opening_options.get(_key(opening_id))
+
+    def stage_options(self, opening_id: Any) -> Dict[str, str]:
+        return self.stages.get(_key(opening_id), {})
+
+    def stage_name(self, stage_id: Any, opening_id: Any = None) -> Optional[str]:
+        """Name of a stage, preferring the stage list of ``opening_id`` when given."""
+        if opening_id is not None:
+            name = self.stage_options(opening_id).get(_key(stage_id))
+            if name is not None:
+                return name
+        return self.stage_names.get(_key(stage_id))
+
+    def openings_for_stage(self, stage_id: Any) -> Tuple[str, ...]:
+        return self.stage_openings.get(_key(stage_id), ())
+
+
+EMPTY_OPENINGS = OpeningsModel.build([])
+
+
+__all__ = ["EMPTY_OPENINGS", "OpeningsModel", "openings_fingerprint"]
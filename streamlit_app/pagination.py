@@ -0,0 +1,310 @@
+"""Lazy, prefetching page iterators over Base.vn list endpoints.
+
+Iterators walk pages one at a time by default. With ``concurrency > 1`` the
+first page is fetched alone to learn ``total`` and the remaining pages are
+then fetched through a bounded sliding window, still yielded in page order.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import math
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterator, List, Optional
+
+from api_client import fetch_candidates, fetch_openings_list
+
+
+DEFAULT_CANDIDATES_PER_PAGE = 100
+DEFAULT_OPENINGS_PER_PAGE = 50
+DEFAULT_FANOUT_CONCURRENCY = 4
+
+
+def parse_page(response: Any) -> Dict[str, Any]:
+    """Raise on HTTP errors and return the decoded JSON page payload."""
+    response.raise_for_status()
+    data = response.json()
+    return data if isinstance(data, dict) else {}
+
+
+def page_items(page: Dict[str, Any], items_key: str) -> List[Dict[str, Any]]:
+    items = page.get(items_key) or []
+    return items if isinstance(items, list) else []
+
+
+def _as_int(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return -1
+
+
+def is_last_page(page: Dict[str, Any], items_key: str, page_number: int, num_per_page: int) -> bool:
+    """Decide from the page payload whether another page can follow.
+
+    Uses ``total`` when Base.vn reports it and falls back to a short or
+    empty page otherwise.
+    """
+    items = page_items(page, items_key)
+    if not items or len(items) < num_per_page:
+        return True
+    total = _as_int(page.get("total"))
+    return total >= 0 and page_number * num_per_page >= total
+
+
+def iter_pages(
+    fetch_page: Callable[[int], Any],
+    items_key: str,
+    num_per_page: int,
+    start_page: int = 1,
+    prefetch: bool = True,
+) -> Iterator[Dict[str, Any]]:
+    """Yield decoded pages lazily, starting at ``start_page``.
+
+    With ``prefetch`` enabled page N+1 is requested in a background thread
+    while the caller consumes page N. Closing the generator cancels the
+    pending prefetch.
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="base-prefetch") if prefetch else None
+    page_number = start_page
+    pending: Future | None = executor.submit(fetch_page, page_number) if executor else None
+    try:
+        while True:
+            response = pending.result() if pending is not None else fetch_page(page_number)
+            pending = None
+            page = parse_page(response)
+            if is_last_page(page, items_key, page_number, num_per_page):
+                yield page
+                return
+            if executor is not None:
+                pending = executor.submit(fetch_page, page_number + 1)
+            yield page
+            page_number += 1
+    finally:
+        if pending is not None:
+            pending.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+def iter_pages_concurrent(
+    fetch_page: Callable[[int], Any],
+    items_key: str,
+    num_per_page: int,
+    concurrency: int = DEFAULT_FANOUT_CONCURRENCY,
+    first: Optional[Dict[str, Any]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield every page, fanning out the remaining pages once ``total`` is known.
+
+    The remaining pages are requested through a sliding window of
+    ``concurrency`` in-flight requests and yielded in page order, so at most
+    that many undelivered pages are held at a time (as in ``aiter_pages``).
+    Without a usable ``total`` this falls back to ``iter_pages``.
+    Pass an already decoded page 1 as ``first`` to avoid fetching it again.
+    """
+    if first is None:
+        first = parse_page(fetch_page(1))
+    yield first
+    if is_last_page(first, items_key, 1, num_per_page):
+        return
+
+    total = _as_int(first.get("total"))
+    if total < 0:
+        yield from iter_pages(fetch_page, items_key, num_per_page, start_page=2)
+        return
+
+    concurrency = max(1, concurrency)
+    remaining = iter(range(2, math.ceil(total / num_per_page) + 1))
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="base-fanout")
+    window: Deque[Future] = deque(
+        executor.submit(fetch_page, page_number) for page_number in itertools.islice(remaining, concurrency)
+    )
+    try:
+        while window:
+            response = window.popleft().result()
+            for page_number in itertools.islice(remaining, 1):
+                window.append(executor.submit(fetch_page, page_number))
+            yield parse_page(response)
+    finally:
+        for future in window:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+async def aiter_pages(
+    fetch_page: Callable[[int], Awaitable[Any]],
+    items_key: str,
+    num_per_page: int,
+    concurrency: int = 1,
+    first: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Async counterpart of ``iter_pages``/``iter_pages_concurrent``.
+
+    Pages are yielded in order. With ``concurrency > 1`` and a usable
+    ``total`` the remaining pages are requested through a sliding window of
+    ``concurrency`` in-flight requests, so at most that many pages are held
+    in memory however large the listing is. Otherwise the next page is
+    prefetched while the caller consumes the current one. Pass an already
+    decoded page 1 as ``first`` to avoid fetching it again.
+    """
+    if first is None:
+        first = parse_page(await fetch_page(1))
+    yield first
+    if is_last_page(first, items_key, 1, num_per_page):
+        return
+
+    total = _as_int(first.get("total"))
+    if concurrency > 1 and total >= 0:
+        remaining = iter(range(2, math.ceil(total / num_per_page) + 1))
+        window: Deque[asyncio.Future] = deque(
+            asyncio.ensure_future(fetch_page(n)) for n in itertools.islice(remaining, concurrency)
+        )
+        try:
+            while window:
+                response = await window.popleft()
+                for page_number in itertools.islice(remaining, 1):
+                    window.append(asyncio.ensure_future(fetch_page(page_number)))
+                yield parse_page(response)
+        finally:
+            for task in window:
+                task.cancel()
+        return
+
+    page_number = 2
+    pending = asyncio.ensure_future(fetch_page(page_number))
+    try:
+        while True:
+            page = parse_page(await pending)
+            if is_last_page(page, items_key, page_number, num_per_page):
+                pending = None
+                yield page
+                return
+            pending = asyncio.ensure_future(fetch_page(page_number + 1))
+            yield page
+            page_number += 1
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+def aiter_candidate_pages(
+    client: Any,
+    access_token: str,
+    opening_id: Any,
+    stage: Any = "",
+    num_per_page: int = DEFAULT_CANDIDATES_PER_PAGE,
+    concurrency: int = 1,
+    first: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Yield every ``candidate/list`` page through an ``AsyncBaseClient``."""
+    def fetch_page(page: int) -> Awaitable[Any]:
+        return client.fetch_candidates(access_token, opening_id, page, num_per_page, stage)
+
+    return aiter_pages(fetch_page, "candidates", num_per_page, concurrency, first=first)
+
+
+def iter_candidate_pages(
+    access_token: str,
+    opening_id: Any,
+    stage: Any = "",
+    num_per_page: int = DEFAULT_CANDIDATES_PER_PAGE,
+    start_page: int = 1,
+    prefetch: bool = True,
+    concurrency: int = 1,
+) -> Iterator[Dict[str, Any]]:
+    """Yield every ``candidate/list`` page payload for an opening/stage."""
+    def fetch_page(page: int) -> Any:
+        return fetch_candidates(access_token, opening_id, page, num_per_page, stage)
+
+    if concurrency > 1 and start_page == 1:
+        return iter_pages_concurrent(fetch_page, "candidates", num_per_page, concurrency)
+    return iter_pages(fetch_page, "candidates", num_per_page, start_page=start_page, prefetch=prefetch)
+
+
+def iter_candidates(
+    access_token: str,
+    opening_id: Any,
+    stage: Any = "",
+    num_per_page: int = DEFAULT_CANDIDATES_PER_PAGE,
+    prefetch: bool = True,
+    concurrency: int = 1,
+) -> Iterator[Dict[str, Any]]:
+    """Yield every candidate of an opening/stage, walking all pages lazily."""
+    pages = iter_candidate_pages(
+        access_token, opening_id, stage, num_per_page, prefetch=prefetch, concurrency=concurrency
+    )
+    for page in pages:
+        yield from page_items(page, "candidates")
+
+
+def load_all_candidates(
+    access_token: str,
+    opening_id: Any,
+    stage: Any = "",
+    num_per_page: int = DEFAULT_CANDIDATES_PER_PAGE,
+    concurrency: int = DEFAULT_FANOUT_CONCURRENCY,
+    on_page: Optional[Callable[[Dict[str, Any]], Any]] = None,
+) -> Dict[str, Any]:
+    """Fetch every page concurrently and merge them into one ``candidate/list``-shaped payload.
+
+    ``on_page`` is called with each page payload as it arrives, in page order.
+    """
+    candidates: List[Dict[str, Any]] = []
+    total: Any = None
+    pages = iter_candidate_pages(access_token, opening_id, stage, num_per_page, concurrency=concurrency)
+    for page in pages:
+        if total is None:
+            total = page.get("total")
+        if on_page is not None:
+            on_page(page)
+        candidates.extend(page_items(page, "candidates"))
+    return {
+        "candidates": candidates,
+        "total": total if total is not None else len(candidates),
+        "count": len(candidates),
+        "page": "all",
+    }
+
+
+def iter_opening_pages(
+    access_token: str,
+    num_per_page: int = DEFAULT_OPENINGS_PER_PAGE,
+    order_by: str = "starred",
+    prefetch: bool = True,
+    concurrency: int = 1,
+) -> Iterator[Dict[str, Any]]:
+    """Yield every ``opening/list`` page payload."""
+    def fetch_page(page: int) -> Any:
+        return fetch_openings_list(access_token, page, num_per_page, order_by)
+
+    if concurrency > 1:
+        return iter_pages_concurrent(fetch_page, "openings", num_per_page, concurrency)
+    return iter_pages(fetch_page, "openings", num_per_page, prefetch=prefetch)
+
+
+def iter_openings(
+    access_token: str,
+    num_per_page: int = DEFAULT_OPENINGS_PER_PAGE,
+    order_by: str = "starred",
+    prefetch: bool = True,
+    concurrency: int = 1,
+) -> Iterator[Dict[str, Any]]:
+    """Yield every opening, walking all pages lazily."""
+    pages = iter_opening_pages(access_token, num_per_page, order_by, prefetch=prefetch, concurrency=concurrency)
+    for page in pages:
+        yield from page_items(page, "openings")
+
+
+__all__ = [
+    "iter_pages",
+    "iter_pages_concurrent",
+    "aiter_pages",
+    "aiter_candidate_pages",
+    "iter_candidate_pages",
+    "iter_candidates",
+    "load_all_candidates",
+    "iter_opening_pages",
+    "iter_openings",
+]
@@ -0,0 +1,115 @@
+"""Background prefetch of likely-next Base.vn calls.
+
+Prefetched calls go through the shared ``BaseClient``, so their responses
+land in the response cache: the foreground call that follows (opening the
+candidate modal, going to the next page) is a cache hit, or joins the
+request still in flight through single-flight.
+
+A ``Prefetcher`` holds one batch of tasks for one key (the current results
+and filters). Scheduling a different key or calling ``cancel`` drops the
+previous batch: queued tasks are cancelled and tasks that already started
+are allowed to finish (one HTTP call each).
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Executor, Future
+from functools import partial
+from typing import Any, Callable, Hashable, Iterable, List, Optional
+
+from api_client import fetch_candidate_detail, fetch_candidate_messages, fetch_candidates, get_client
+
+DEFAULT_PREFETCH_CANDIDATES = 5
+DEFAULT_PREFETCH_WORKERS = 2
+
+
+class Prefetcher:
+    """Runs the latest batch of prefetch tasks on a shared ``executor``."""
+
+    def __init__(self, executor: Executor) -> None:
+        self._executor = executor
+        self._lock = threading.Lock()
+        self._key: Optional[Hashable] = None
+        self._generation = 0
+        self._futures: List[Future] = []
+
+    @property
+    def key(self) -> Optional[Hashable]:
+        return self._key
+
+    def schedule(self, key: Hashable, tasks: Iterable[Callable[[], Any]]) -> bool:
+        """Replace the current batch with ``tasks``; no-op if ``key`` is already scheduled."""
+        with self._lock:
+            if key == self._key:
+                return False
+            self._cancel_locked()
+            self._key = key
+            generation = self._generation
+            self._futures = [self._executor.submit(self._run, generation, task) for task in tasks]
+        return True
+
+    def cancel(self) -> int:
+        """Drop the current batch; returns how many queued tasks were cancelled."""
+        with self._lock:
+            self._key = None
+            return self._cancel_locked()
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(1 for future in self._futures if not future.done())
+
+    def _cancel_locked(self) -> int:
+        self._generation += 1
+        cancelled = sum(1 for future in self._futures if future.cancel())
+        self._futures = []
+        return cancelled
+
+    def _run(self, generation: int, task: Callable[[], Any]) -> None:
+        # Superseded while queued (e.g. the executor picked it up during cancel)
+        if generation != self._generation:
+            return
+        try:
+            task()
+        except Exception:
+            # Best effort: the foreground call reports errors if it needs the data
+            pass
+
+
+def candidate_prefetch_tasks(
+    access_token: str,
+    candidate_ids: Iterable[Any],
+    next_page_filters: Optional[dict] = None,
+) -> List[Callable[[], Any]]:
+    """Detail + messages for each candidate (in browsing order), then the next ``candidate/list`` page.
+
+    Returns no tasks when the response cache is disabled, since nothing
+    would keep the prefetched responses.
+    """
+    if get_client().cache is None:
+        return []
+    tasks: List[Callable[[], Any]] = []
+    for candidate_id in candidate_ids:
+        tasks.append(partial(fetch_candidate_detail, access_token, str(candidate_id)))
+        tasks.append(partial(fetch_candidate_messages, access_token, str(candidate_id)))
+    if next_page_filters is not None:
+        # Same positional arguments as the foreground search, so the cache key matches
+        tasks.append(
+            partial(
+                fetch_candidates,
+                access_token,
+                next_page_filters.get("opening_id", ""),
+                next_page_filters.get("page", 1),
+                next_page_filters.get("num_per_page", 10),
+                next_page_filters.get("stage", ""),
+            )
+        )
+    return tasks
+
+
+__all__ = [
+    "DEFAULT_PREFETCH_CANDIDATES",
+    "DEFAULT_PREFETCH_WORKERS",
+    "Prefetcher",
+    "candidate_prefetch_tasks",
+]
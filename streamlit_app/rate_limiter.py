@@ -0,0 +1,165 @@
+"""Client-side throttling and retry policy for Base.vn calls."""
+
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional, Tuple
+
+
+DEFAULT_RATE = 10.0
+DEFAULT_BURST = 20
+DEFAULT_MIN_RATE = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Convert a ``Retry-After`` header (seconds or HTTP date) into seconds to wait."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    current = now if now is not None else time.time()
+    return max(0.0, retry_at.timestamp() - current)
+
+
+class TokenBucket:
+    """Thread-safe token bucket with AIMD rate adaptation.
+
+    ``reserve()`` takes one token and returns how long the caller must wait
+    before sending, so the same bucket serves threads (``acquire``) and
+    coroutines (``await asyncio.sleep(bucket.reserve())``). A 429 halves the
+    refill rate (``penalize``); each success raises it again step by step
+    (``reward``) up to the configured rate.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        capacity: int = DEFAULT_BURST,
+        min_rate: float = DEFAULT_MIN_RATE,
+        decrease_factor: float = 0.5,
+        increase_step: float = 0.1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated_at = clock()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "TokenBucket":
+        """Create a bucket from ``BASE_RATE_LIMIT`` (req/s) and ``BASE_RATE_BURST``."""
+        def _number(name: str, default: float) -> float:
+            try:
+                return float(os.environ.get(name, default))
+            except (TypeError, ValueError):
+                return default
+
+        return cls(
+            rate=_number("BASE_RATE_LIMIT", DEFAULT_RATE),
+            capacity=int(_number("BASE_RATE_BURST", DEFAULT_BURST)),
+        )
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._updated_at)
+        self._tokens = min(float(self.capacity), self._tokens + elapsed * self.rate)
+        self._updated_at = now
+
+    def reserve(self) -> float:
+        """Take one token and return the number of seconds to wait before using it."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens -= 1.0
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            return max(wait, self._blocked_until - now)
+
+    def acquire(self) -> None:
+        """Block the current thread until a token is available."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def penalize(self, retry_after: Optional[float] = None) -> None:
+        """React to a 429: lower the rate and pause everyone for ``retry_after`` seconds."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+
+    def reward(self) -> None:
+        """Additively restore the rate after a successful call."""
+        with self._lock:
+            if self.rate < self.max_rate:
+                now = self._clock()
+                self._refill(now)
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+
+@dataclass
+class RetryPolicy:
+    """Retries with full-jitter exponential backoff that honours ``Retry-After``."""
+
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    retry_statuses: Tuple[int, ...] = RETRY_STATUSES
+
+    def should_retry(self, attempt: int, status_code: Optional[int] = None) -> bool:
+        """``status_code`` is ``None`` for connection errors."""
+        if attempt >= self.max_retries:
+            return False
+        return status_code is None or status_code in self.retry_statuses
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            return min(self.backoff_max, max(retry_after, backoff))
+        return backoff
+
+
+_default_bucket: Optional[TokenBucket] = None
+_default_bucket_lock = threading.Lock()
+
+
+def get_rate_limiter() -> TokenBucket:
+    """Return the process-wide token bucket shared by every Base.vn caller."""
+    global _default_bucket
+    if _default_bucket is None:
+        with _default_bucket_lock:
+            if _default_bucket is None:
+                _default_bucket = TokenBucket.from_env()
+    return _default_bucket
+
+
+__all__ = [
+    "RETRY_STATUSES",
+    "RetryPolicy",
+    "TokenBucket",
+    "get_rate_limiter",
+    "parse_retry_after",
+]
@@ -0,0 +1,313 @@
+"""In-memory TTL + LRU cache for Base.vn API responses.
+
+An optional persistent backend (see ``sqlite_cache``) keeps entries across
+process restarts; expired entries inside the ``stale_ttl`` window are still
+served while the caller revalidates them upstream.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, Mapping, Optional, Tuple
+from urllib.parse import urlencode
+
+if TYPE_CHECKING:
+    from sqlite_cache import SQLiteCacheBackend
+
+
+# Time-to-live (seconds) per Base.vn endpoint. Openings and candidate details
+# change slowly; lists and messages are refreshed more often.
+DEFAULT_TTLS: Dict[str, float] = {
+    "opening/list": 600.0,
+    "opening/get": 600.0,
+    "candidate/list": 120.0,
+    "candidate/get": 300.0,
+    "candidate/messages": 120.0,
+}
+DEFAULT_TTL = 60.0
+DEFAULT_STALE_TTL = 300.0
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Only these response headers are kept alongside the cached body.
+CACHED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Date")
+
+
+def hash_token(access_token: Any) -> str:
+    """Return a short, non-reversible fingerprint of an access token."""
+    return hashlib.sha256(str(access_token or "").encode("utf-8")).hexdigest()[:16]
+
+
+def normalize_params(params: Mapping[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    """Sorted (key, value) pairs of the request params without the access token."""
+    return tuple(sorted((str(k), str(v)) for k, v in params.items() if k != "access_token"))
+
+
+def make_cache_key(endpoint: str, params: Mapping[str, Any]) -> str:
+    """Build a cache key from the endpoint, the params and a hash of the access token."""
+    token_hash = hash_token(params.get("access_token"))
+    return f"{endpoint}|{token_hash}|{urlencode(normalize_params(params))}"
+
+
+@dataclass
+class CacheEntry:
+    endpoint: str
+    token_hash: str
+    params: Tuple[Tuple[str, str], ...]
+    status_code: int
+    content: bytes
+    headers: Dict[str, str]
+    stored_at: float
+    expires_at: float
+
+    @property
+    def size(self) -> int:
+        return len(self.content)
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.time()) < self.expires_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Request headers for revalidating this entry upstream."""
+        headers: Dict[str, str] = {}
+        if self.headers.get("ETag"):
+            headers["If-None-Match"] = self.headers["ETag"]
+        if self.headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = self.headers["Last-Modified"]
+        return headers
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+@dataclass
+class ResponseCache:
+    """Thread-safe response cache with per-endpoint TTL and LRU eviction.
+
+    Entries are evicted least-recently-used first once either ``max_entries``
+    or ``max_bytes`` (sum of cached body sizes) is exceeded. When ``backend``
+    is set, stores are written through to it and memory misses fall back to it.
+    """
+
+    ttls: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_TTLS))
+    max_entries: int = DEFAULT_MAX_ENTRIES
+    max_bytes: int = DEFAULT_MAX_BYTES
+    stale_ttl: float = DEFAULT_STALE_TTL
+    backend: Optional["SQLiteCacheBackend"] = None
+    clock: Callable[[], float] = time.time
+
+    def __post_init__(self) -> None:
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.stats = CacheStats()
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        """Create a cache configured from the ``BASE_CACHE_*`` environment variables.
+
+        ``BASE_CACHE_PATH`` enables the persistent SQLite backend.
+        """
+        def _number(name: str, default: float) -> float:
+            try:
+                return float(os.environ.get(name, default))
+            except (TypeError, ValueError):
+                return default
+
+        stale_ttl = _number("BASE_CACHE_STALE_TTL", DEFAULT_STALE_TTL)
+        backend = None
+        cache_path = os.environ.get("BASE_CACHE_PATH")
+        if cache_path:
+            from sqlite_cache import SQLiteCacheBackend
+
+            backend = SQLiteCacheBackend(cache_path)
+            backend.prune(max(DEFAULT_TTLS.values()) + stale_ttl)
+
+        return cls(
+            max_entries=int(_number("BASE_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+            max_bytes=int(_number("BASE_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+            stale_ttl=stale_ttl,
+            backend=backend,
+        )
+
+    def ttl_for(self, endpoint: str) -> float:
+        return self.ttls.get(endpoint, DEFAULT_TTL)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, endpoint: str, params: Mapping[str, Any]) -> Optional[CacheEntry]:
+        """Return a fresh entry for the request, or ``None`` on a miss."""
+        entry = self.lookup(endpoint, params)
+        if entry is None or not entry.is_fresh(self.clock()):
+            return None
+        return entry
+
+    def lookup(self, endpoint: str, params: Mapping[str, Any]) -> Optional[CacheEntry]:
+        """Return a fresh or stale-but-servable entry, or ``None`` on a miss.
+
+        Callers check ``entry.is_fresh()`` and revalidate stale entries.
+        """
+        key = make_cache_key(endpoint, params)
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self.backend is not None:
+                entry = self.backend.load(key, self.ttl_for(endpoint))
+                if entry is not None:
+                    self._insert(key, entry)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            if now >= entry.expires_at + self.stale_ttl:
+                self._remove(key)
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if entry.is_fresh(now):
+                self.stats.hits += 1
+            else:
+                self.stats.stale_hits += 1
+            return entry
+
+    def touch(self, endpoint: str, params: Mapping[str, Any]) -> None:
+        """Mark an entry as fresh again after a ``304 Not Modified`` revalidation."""
+        key = make_cache_key(endpoint, params)
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.stored_at = now
+                entry.expires_at = now + self.ttl_for(endpoint)
+        if self.backend is not None:
+            self.backend.touch(key, now)
+
+    def set(
+        self,
+        endpoint: str,
+        params: Mapping[str, Any],
+        status_code: int,
+        content: bytes,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> Optional[CacheEntry]:
+        """Store a response body; bodies larger than ``max_bytes`` are not cached."""
+        if len(content) > self.max_bytes:
+            return None
+        now = self.clock()
+        kept_headers = {name: headers[name] for name in CACHED_HEADERS if headers and name in headers}
+        entry = CacheEntry(
+            endpoint=endpoint,
+            token_hash=hash_token(params.get("access_token")),
+            params=normalize_params(params),
+            status_code=status_code,
+            content=content,
+            headers=kept_headers,
+            stored_at=now,
+            expires_at=now + self.ttl_for(endpoint),
+        )
+        key = make_cache_key(endpoint, params)
+        with self._lock:
+            self._insert(key, entry)
+            self.stats.stores += 1
+        if self.backend is not None:
+            self.backend.store(key, entry)
+        return entry
+
+    def invalidate(
+        self,
+        endpoint: Optional[str] = None,
+        access_token: Optional[str] = None,
+        **params: Any,
+    ) -> int:
+        """Drop entries matching the endpoint, token and (subset of) params.
+
+        Calling without arguments clears the whole cache. Returns the number
+        of removed entries.
+        """
+        token_hash = hash_token(access_token) if access_token is not None else None
+        wanted = set(normalize_params(params))
+        with self._lock:
+            keys = [
+                key
+                for key, entry in self._entries.items()
+                if (endpoint is None or entry.endpoint == endpoint)
+                and (token_hash is None or entry.token_hash == token_hash)
+                and wanted.issubset(entry.params)
+            ]
+            for key in keys:
+                self._remove(key)
+            removed = set(keys)
+            if self.backend is not None:
+                persisted = [
+                    key
+                    for key, entry_params in self.backend.matching_keys(endpoint, token_hash)
+                    if wanted.issubset(entry_params)
+                ]
+                self.backend.delete(persisted)
+                removed.update(persisted)
+            self.stats.invalidations += len(removed)
+        return len(removed)
+
+    def clear(self) -> None:
+        self.invalidate()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters plus current size, suitable for display."""
+        with self._lock:
+            data: Dict[str, Any] = self.stats.as_dict()
+            data["entries"] = len(self._entries)
+            data["bytes"] = self._bytes
+        return data
+
+    def _insert(self, key: str, entry: CacheEntry) -> None:
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        self._evict()
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def _evict(self) -> None:
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.stats.evictions += 1
+
+
+__all__ = [
+    "DEFAULT_TTLS",
+    "CacheEntry",
+    "CacheStats",
+    "ResponseCache",
+    "hash_token",
+    "make_cache_key",
+]
@@ -0,0 +1,212 @@
+"""In-memory search index over loaded candidates.
+
+Positions in the index are the row positions of the candidates in the order
+they were appended, which is the row order of ``process_candidate_data``'s
+DataFrame, so results can be applied with ``df.iloc``.
+
+- Name, email, phone, tags, stage, source and opening are tokenized with
+  Vietnamese diacritic folding ("Nguyễn Đức" matches "nguyen duc") into an
+  inverted index.
+- The last query token is matched as a prefix through a trie (type-ahead).
+- Email and phone queries are answered by exact hash lookups first.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+PHONE_STRIP_RE = re.compile(r"[\s().\-]")
+MIN_PHONE_DIGITS = 6
+
+_FOLD_TABLE = str.maketrans({"đ": "d", "Đ": "d"})
+
+
+def fold_text(text: Any) -> str:
+    """Lowercase and strip Vietnamese diacritics (``"Nguyễn Đức"`` -> ``"nguyen duc"``)."""
+    if text is None:
+        return ""
+    decomposed = unicodedata.normalize("NFD", str(text).translate(_FOLD_TABLE))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def tokenize(text: Any) -> List[str]:
+    return TOKEN_RE.findall(fold_text(text))
+
+
+def normalize_email(value: Any) -> str:
+    return str(value).strip().lower() if value else ""
+
+
+def normalize_phone(value: Any) -> str:
+    """Digits only, with the +84/84 country code rewritten to a leading 0."""
+    if not value:
+        return ""
+    digits = PHONE_STRIP_RE.sub("", str(value))
+    if digits.startswith("+"):
+        digits = digits[1:]
+    if not digits.isdigit():
+        return ""
+    if digits.startswith("84") and len(digits) > 9:
+        digits = "0" + digits[2:]
+    return digits
+
+
+class _TrieNode:
+    __slots__ = ("children", "terminal")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.terminal = False
+
+
+class PrefixTrie:
+    """Character trie over indexed tokens, used for prefix (type-ahead) matching."""
+
+    def __init__(self) -> None:
+        self._root = _TrieNode()
+
+    def insert(self, token: str) -> None:
+        node = self._root
+        for ch in token:
+            child = node.children.get(ch)
+            if child is None:
+                child = node.children[ch] = _TrieNode()
+            node = child
+        node.terminal = True
+
+    def complete(self, prefix: str, limit: Optional[int] = None) -> List[str]:
+        """Tokens starting with ``prefix``; shortest first when ``limit`` is set."""
+        node = self._root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        results: List[str] = []
+        # Breadth-first so the closest completions come first
+        frontier = [(prefix, node)]
+        while frontier:
+            next_frontier = []
+            for text, current in frontier:
+                if current.terminal:
+                    results.append(text)
+                    if limit is not None and len(results) >= limit:
+                        return results
+                next_frontier.extend((text + ch, child) for ch, child in current.children.items())
+            frontier = next_frontier
+        return results
+
+
+def _candidate_texts(candidate: Dict[str, Any]) -> Iterable[Any]:
+    get = candidate.get
+    yield get("name")
+    yield get("email")
+    yield get("phone")
+    yield get("stage_name")
+    yield get("source")
+    yield (get("opening_export") or {}).get("name")
+    for tag in get("tags") or []:
+        yield tag.get("name") if isinstance(tag, dict) else tag
+
+
+class CandidateSearchIndex:
+    """Incrementally built candidate index; feed it ``candidate/list`` pages with ``append``."""
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, List[int]] = {}
+        self._trie = PrefixTrie()
+        self._emails: Dict[str, List[int]] = {}
+        self._phones: Dict[str, List[int]] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, json_data: Dict[str, Any]) -> "CandidateSearchIndex":
+        """Index one ``candidate/list`` payload (positions continue after the previous page)."""
+        return self.add_candidates(json_data.get("candidates", []) or [])
+
+    def add_candidates(self, candidates_list: List[Dict[str, Any]]) -> "CandidateSearchIndex":
+        postings = self._postings
+        for candidate in candidates_list:
+            position = self._size
+            self._size += 1
+            if not isinstance(candidate, dict):
+                continue
+            for text in _candidate_texts(candidate):
+                for token in tokenize(text):
+                    rows = postings.get(token)
+                    if rows is None:
+                        postings[token] = [position]
+                        self._trie.insert(token)
+                    elif rows[-1] != position:
+                        rows.append(position)
+            email = normalize_email(candidate.get("email"))
+            if email:
+                self._emails.setdefault(email, []).append(position)
+            phone = normalize_phone(candidate.get("phone"))
+            if phone:
+                self._phones.setdefault(phone, []).append(position)
+        return self
+
+    def _prefix_rows(self, prefix: str) -> Set[int]:
+        rows: Set[int] = set()
+        for token in self._trie.complete(prefix):
+            rows.update(self._postings[token])
+        return rows
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[int]:
+        """Row positions matching every query token (the last one as a prefix), in row order."""
+        query = (query or "").strip()
+        if not query:
+            return []
+
+        if "@" in query:
+            exact = self._emails.get(normalize_email(query))
+            if exact:
+                return exact[:limit]
+        phone = normalize_phone(query)
+        if len(phone) >= MIN_PHONE_DIGITS:
+            exact = self._phones.get(phone)
+            if exact:
+                return exact[:limit]
+
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        matches: Optional[Set[int]] = None
+        # Full tokens first: their posting lists are usually the most selective
+        for token in tokens[:-1]:
+            rows = self._postings.get(token)
+            if not rows:
+                return []
+            matches = set(rows) if matches is None else matches.intersection(rows)
+            if not matches:
+                return []
+        last = self._prefix_rows(tokens[-1])
+        matches = last if matches is None else matches & last
+        return sorted(matches)[:limit]
+
+    def suggest(self, query: str, limit: int = 5) -> List[str]:
+        """Completions for the last (partial) token of ``query``."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        return [token for token in self._trie.complete(tokens[-1], limit + 1) if token != tokens[-1]][:limit]
+
+
+def build_search_index(json_data: Dict[str, Any]) -> CandidateSearchIndex:
+    return CandidateSearchIndex().append(json_data)
+
+
+__all__ = [
+    "CandidateSearchIndex",
+    "PrefixTrie",
+    "build_search_index",
+    "fold_text",
+    "normalize_email",
+    "normalize_phone",
+    "tokenize",
+]
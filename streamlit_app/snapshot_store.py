@@ -0,0 +1,417 @@
+"""Local SQLite mirror of Base.vn openings and candidates with incremental sync.
+
+List views query the local tables. Base.vn is only contacted to sync: a
+cheap freshness probe (first ``candidate/list`` page) decides whether the
+opening changed, and a full walk then upserts only candidates whose
+signature (``updated_at`` derived from ``time_apply``/changelog ``since``
+plus a payload digest) differs from the stored one. Sync always bypasses
+the response cache.
+
+The probe only sees the first page and ``total``: a change to a candidate
+on a later page alone is picked up by the next full walk, which happens at
+least every ``full_sync_interval`` seconds (or on a forced sync).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from api_client import fetch_candidates
+from pagination import (
+    DEFAULT_CANDIDATES_PER_PAGE,
+    DEFAULT_FANOUT_CONCURRENCY,
+    iter_openings,
+    iter_pages_concurrent,
+    page_items,
+    parse_page,
+)
+
+
+DEFAULT_SNAPSHOT_PATH = ".cache/snapshot.sqlite3"
+# Probe Base.vn again at most this often per opening
+DEFAULT_MIN_CHECK_INTERVAL = 60.0
+# Walk every page at least this often, since the probe only covers page 1
+DEFAULT_FULL_SYNC_INTERVAL = 900.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS openings (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    payload BLOB NOT NULL,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS candidates (
+    id TEXT PRIMARY KEY,
+    opening_id TEXT NOT NULL,
+    stage_id TEXT,
+    name TEXT,
+    email TEXT,
+    phone TEXT,
+    updated_at INTEGER NOT NULL,
+    digest INTEGER NOT NULL,
+    payload BLOB NOT NULL,
+    synced_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS candidates_opening_stage ON candidates (opening_id, stage_id, updated_at DESC);
+CREATE INDEX IF NOT EXISTS candidates_opening_updated ON candidates (opening_id, updated_at DESC);
+CREATE TABLE IF NOT EXISTS sync_state (
+    opening_id TEXT PRIMARY KEY,
+    total INTEGER,
+    synced_at REAL,
+    checked_at REAL
+);
+"""
+
+
+def _env_seconds(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _as_int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_timestamp(value: Any) -> int:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def candidate_updated_at(candidate: Dict[str, Any]) -> int:
+    """Latest known change time of a candidate (``time_apply``, ``last_update``, changelog ``since``)."""
+    latest = max(_as_timestamp(candidate.get(name)) for name in ("time_apply", "last_update", "since"))
+    for changelog in candidate.get("changelogs") or []:
+        if isinstance(changelog, dict):
+            latest = max(latest, _as_timestamp(changelog.get("since")))
+    return latest
+
+
+def _is_listing(page: Dict[str, Any]) -> bool:
+    """Whether a ``candidate/list`` payload is a real listing and not a 200 error body."""
+    return isinstance(page.get("candidates"), list) and not page.get("error")
+
+
+def _canonical(payload: Any) -> bytes:
+    return json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _decode(blob: bytes) -> Any:
+    return json.loads(zlib.decompress(blob))
+
+
+@dataclass
+class SyncResult:
+    opening_id: str
+    fresh: bool = False
+    pages: int = 0
+    fetched: int = 0
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    total: Optional[int] = None
+    duration: float = 0.0
+    # False when a page was an error payload: nothing was deleted and the walk is retried
+    complete: bool = True
+
+    @property
+    def changed(self) -> int:
+        return self.inserted + self.updated + self.deleted
+
+
+class SnapshotStore:
+    """SQLite (WAL) mirror of openings and candidates, one connection per thread."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        min_check_interval: float = DEFAULT_MIN_CHECK_INTERVAL,
+        busy_timeout: float = 5.0,
+        full_sync_interval: float = DEFAULT_FULL_SYNC_INTERVAL,
+    ) -> None:
+        self.path = Path(path)
+        self.min_check_interval = min_check_interval
+        self.full_sync_interval = full_sync_interval
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._sync_locks: Dict[str, threading.Lock] = {}
+        self._sync_locks_guard = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        conn.commit()
+
+    @classmethod
+    def from_env(cls) -> "SnapshotStore":
+        """Open the store at ``BASE_SNAPSHOT_PATH`` (default ``.cache/snapshot.sqlite3``)."""
+        return cls(
+            os.environ.get("BASE_SNAPSHOT_PATH") or DEFAULT_SNAPSHOT_PATH,
+            min_check_interval=_env_seconds("BASE_SNAPSHOT_CHECK_INTERVAL", DEFAULT_MIN_CHECK_INTERVAL),
+            full_sync_interval=_env_seconds("BASE_SNAPSHOT_FULL_SYNC_INTERVAL", DEFAULT_FULL_SYNC_INTERVAL),
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=self.busy_timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _sync_lock(self, opening_id: str) -> threading.Lock:
+        with self._sync_locks_guard:
+            return self._sync_locks.setdefault(opening_id, threading.Lock())
+
+    # -- openings ---------------------------------------------------------
+
+    def upsert_openings(self, openings: Iterable[Dict[str, Any]]) -> int:
+        now = time.time()
+        rows = []
+        for opening in openings:
+            if not isinstance(opening, dict) or opening.get("id") is None:
+                continue
+            rows.append((str(opening["id"]), opening.get("name"), zlib.compress(_canonical(opening)), now))
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT INTO openings (id, name, payload, synced_at) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(id) DO UPDATE SET name = excluded.name, payload = excluded.payload,"
+                " synced_at = excluded.synced_at",
+                rows,
+            )
+        return len(rows)
+
+    def sync_openings(self, access_token: str) -> int:
+        """Mirror every opening from ``opening/list``; returns how many were stored."""
+        return self.upsert_openings(iter_openings(access_token))
+
+    def openings(self) -> List[Dict[str, Any]]:
+        rows = self._connection().execute("SELECT payload FROM openings ORDER BY rowid").fetchall()
+        return [_decode(payload) for (payload,) in rows]
+
+    # -- candidates -------------------------------------------------------
+
+    def _signatures(self, opening_id: str) -> Dict[str, Tuple[int, int]]:
+        rows = self._connection().execute(
+            "SELECT id, updated_at, digest FROM candidates WHERE opening_id = ?", (opening_id,)
+        ).fetchall()
+        return {candidate_id: (updated_at, digest) for candidate_id, updated_at, digest in rows}
+
+    def _state(self, opening_id: str) -> Optional[Tuple[Optional[int], Optional[float], Optional[float]]]:
+        return self._connection().execute(
+            "SELECT total, synced_at, checked_at FROM sync_state WHERE opening_id = ?", (opening_id,)
+        ).fetchone()
+
+    def _diff(
+        self,
+        opening_id: str,
+        candidates: List[Dict[str, Any]],
+        signatures: Dict[str, Tuple[int, int]],
+        now: float,
+    ) -> Tuple[List[Tuple[Any, ...]], int, int]:
+        """Rows to upsert for ``candidates`` whose signature changed, plus insert/update counts."""
+        rows = []
+        inserted = updated = 0
+        for candidate in candidates:
+            if not isinstance(candidate, dict) or candidate.get("id") is None:
+                continue
+            candidate_id = str(candidate["id"])
+            raw = _canonical(candidate)
+            digest = zlib.crc32(raw)
+            signature = (candidate_updated_at(candidate), digest)
+            previous = signatures.get(candidate_id)
+            if previous == signature:
+                continue
+            if previous is None:
+                inserted += 1
+            else:
+                updated += 1
+            signatures[candidate_id] = signature
+            stage = candidate.get("stage")
+            rows.append((
+                candidate_id,
+                opening_id,
+                None if stage in (None, "") else str(stage),
+                candidate.get("name"),
+                candidate.get("email"),
+                candidate.get("phone"),
+                signature[0],
+                digest,
+                zlib.compress(raw),
+                now,
+            ))
+        return rows, inserted, updated
+
+    def _write(self, rows: List[Tuple[Any, ...]]) -> None:
+        if not rows:
+            return
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT INTO candidates (id, opening_id, stage_id, name, email, phone, updated_at, digest,"
+                " payload, synced_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(id) DO UPDATE SET opening_id = excluded.opening_id, stage_id = excluded.stage_id,"
+                " name = excluded.name, email = excluded.email, phone = excluded.phone,"
+                " updated_at = excluded.updated_at, digest = excluded.digest, payload = excluded.payload,"
+                " synced_at = excluded.synced_at",
+                rows,
+            )
+
+    def _is_unchanged(self, opening_id: str, first_page: Dict[str, Any], signatures: Dict[str, Tuple[int, int]]) -> bool:
+        if not _is_listing(first_page):
+            return False
+        state = self._state(opening_id)
+        if state is None or state[1] is None:
+            return False
+        if time.time() - state[1] >= self.full_sync_interval:
+            return False
+        total = _as_int(first_page.get("total"))
+        if total is not None and total != state[0]:
+            return False
+        rows, _, _ = self._diff(opening_id, page_items(first_page, "candidates"), dict(signatures), 0.0)
+        return not rows
+
+    def sync_opening(
+        self,
+        access_token: str,
+        opening_id: Any,
+        force: bool = False,
+        num_per_page: int = DEFAULT_CANDIDATES_PER_PAGE,
+        concurrency: int = DEFAULT_FANOUT_CONCURRENCY,
+    ) -> SyncResult:
+        """Bring the local copy of an opening up to date.
+
+        Skips Base.vn entirely if the opening was checked less than
+        ``min_check_interval`` seconds ago. Otherwise fetches the first page;
+        if ``total`` and every signature on it match the local copy the
+        opening is considered fresh. Only when something changed, the last
+        full walk is older than ``full_sync_interval``, or with ``force`` are
+        the remaining pages walked; changed candidates are upserted and
+        candidates no longer listed are deleted. Pages are always fetched
+        from Base.vn, never from the response cache. If any page is not a
+        listing (e.g. a 200 error payload) nothing is deleted and the sync
+        state is left as is, so the next call walks the opening again.
+        """
+        opening_id = str(opening_id)
+        started = time.monotonic()
+        result = SyncResult(opening_id=opening_id)
+
+        with self._sync_lock(opening_id):
+            state = self._state(opening_id)
+            now = time.time()
+            if not force and state is not None and state[2] and now - state[2] < self.min_check_interval:
+                result.fresh = True
+                result.total = state[0]
+                return result
+
+            signatures = self._signatures(opening_id)
+
+            def fetch_page(page: int) -> Any:
+                return fetch_candidates(access_token, opening_id, page, num_per_page, "", use_cache=False)
+
+            first = parse_page(fetch_page(1))
+            result.total = _as_int(first.get("total"))
+            conn = self._connection()
+
+            if not force and self._is_unchanged(opening_id, first, signatures):
+                with conn:
+                    conn.execute("UPDATE sync_state SET checked_at = ? WHERE opening_id = ?", (now, opening_id))
+                result.fresh = True
+                result.pages = 1
+                result.fetched = len(page_items(first, "candidates"))
+                result.duration = time.monotonic() - started
+                return result
+
+            seen = set()
+            for page in iter_pages_concurrent(fetch_page, "candidates", num_per_page, concurrency, first=first):
+                if not _is_listing(page):
+                    result.complete = False
+                items = page_items(page, "candidates")
+                result.pages += 1
+                result.fetched += len(items)
+                seen.update(str(item["id"]) for item in items if isinstance(item, dict) and item.get("id") is not None)
+                rows, inserted, updated = self._diff(opening_id, items, signatures, now)
+                self._write(rows)
+                result.inserted += inserted
+                result.updated += updated
+
+            result.duration = time.monotonic() - started
+            if not result.complete:
+                return result
+
+            stale = [candidate_id for candidate_id in signatures if candidate_id not in seen]
+            with conn:
+                conn.executemany("DELETE FROM candidates WHERE id = ?", ((candidate_id,) for candidate_id in stale))
+                conn.execute(
+                    "INSERT INTO sync_state (opening_id, total, synced_at, checked_at) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT(opening_id) DO UPDATE SET total = excluded.total,"
+                    " synced_at = excluded.synced_at, checked_at = excluded.checked_at",
+                    (opening_id, result.total if result.total is not None else len(seen), now, now),
+                )
+            result.deleted = len(stale)
+            return result
+
+    def count_candidates(self, opening_id: Any, stage: Any = "") -> int:
+        sql, params = _candidate_filter(opening_id, stage)
+        return self._connection().execute(f"SELECT COUNT(*) FROM candidates WHERE {sql}", params).fetchone()[0]
+
+    def candidate_page(
+        self,
+        opening_id: Any,
+        stage: Any = "",
+        page: int = 1,
+        num_per_page: int = DEFAULT_CANDIDATES_PER_PAGE,
+    ) -> Dict[str, Any]:
+        """Local equivalent of a ``candidate/list`` payload (``page="all"`` returns every row)."""
+        sql, params = _candidate_filter(opening_id, stage)
+        query = f"SELECT payload FROM candidates WHERE {sql} ORDER BY updated_at DESC, id"
+        if page != "all":
+            page = max(1, int(page))
+            query += " LIMIT ? OFFSET ?"
+            params = params + (int(num_per_page), (page - 1) * int(num_per_page))
+        rows = self._connection().execute(query, params).fetchall()
+        candidates = [_decode(payload) for (payload,) in rows]
+        return {
+            "candidates": candidates,
+            "total": self.count_candidates(opening_id, stage),
+            "count": len(candidates),
+            "page": page,
+        }
+
+    def last_synced_at(self, opening_id: Any) -> Optional[float]:
+        state = self._state(str(opening_id))
+        return state[1] if state is not None else None
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def _candidate_filter(opening_id: Any, stage: Any) -> Tuple[str, Tuple[Any, ...]]:
+    if stage in (None, ""):
+        return "opening_id = ?", (str(opening_id),)
+    return "opening_id = ? AND stage_id = ?", (str(opening_id), str(stage))
+
+
+__all__ = [
+    "SnapshotStore",
+    "SyncResult",
+    "candidate_updated_at",
+]
@@ -0,0 +1,147 @@
+"""Persistent SQLite backend for the Base.vn response cache."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Union
+
+from response_cache import CacheEntry
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    token_hash TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status_code INTEGER NOT NULL,
+    content BLOB NOT NULL,
+    headers TEXT NOT NULL,
+    stored_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_endpoint_token ON responses (endpoint, token_hash);
+"""
+
+
+class SQLiteCacheBackend:
+    """Store cached responses zlib-compressed in a local SQLite file.
+
+    The database runs in WAL mode so several Streamlit/uvicorn worker
+    processes on the same host can read and write it concurrently. Each
+    thread gets its own connection.
+    """
+
+    def __init__(self, path: Union[str, Path], compress_level: int = 6, busy_timeout: float = 5.0) -> None:
+        self.path = Path(path)
+        self.compress_level = compress_level
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=self.busy_timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, key: str, ttl: float) -> Optional[CacheEntry]:
+        row = self._connection().execute(
+            "SELECT endpoint, token_hash, params, status_code, content, headers, stored_at"
+            " FROM responses WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        endpoint, token_hash, params, status_code, content, headers, stored_at = row
+        try:
+            body = zlib.decompress(content)
+        except zlib.error:
+            self.delete([key])
+            return None
+        return CacheEntry(
+            endpoint=endpoint,
+            token_hash=token_hash,
+            params=tuple(tuple(pair) for pair in json.loads(params)),
+            status_code=status_code,
+            content=body,
+            headers=json.loads(headers),
+            stored_at=stored_at,
+            expires_at=stored_at + ttl,
+        )
+
+    def store(self, key: str, entry: CacheEntry) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses"
+                " (key, endpoint, token_hash, params, status_code, content, headers, stored_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    entry.endpoint,
+                    entry.token_hash,
+                    json.dumps(entry.params),
+                    entry.status_code,
+                    zlib.compress(entry.content, self.compress_level),
+                    json.dumps(entry.headers),
+                    entry.stored_at,
+                ),
+            )
+
+    def touch(self, key: str, stored_at: float) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("UPDATE responses SET stored_at = ? WHERE key = ?", (stored_at, key))
+
+    def delete(self, keys: Iterable[str]) -> int:
+        keys = list(keys)
+        if not keys:
+            return 0
+        conn = self._connection()
+        with conn:
+            conn.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key in keys])
+        return len(keys)
+
+    def matching_keys(
+        self,
+        endpoint: Optional[str],
+        token_hash: Optional[str],
+    ) -> List[Tuple[str, Tuple[Tuple[str, str], ...]]]:
+        """Return (key, params) for rows matching the optional endpoint/token filters."""
+        query = "SELECT key, params FROM responses WHERE 1 = 1"
+        args: List[str] = []
+        if endpoint is not None:
+            query += " AND endpoint = ?"
+            args.append(endpoint)
+        if token_hash is not None:
+            query += " AND token_hash = ?"
+            args.append(token_hash)
+        rows = self._connection().execute(query, args).fetchall()
+        return [(key, tuple(tuple(pair) for pair in json.loads(params))) for key, params in rows]
+
+    def prune(self, max_age: float) -> int:
+        """Delete rows stored more than ``max_age`` seconds ago."""
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute("DELETE FROM responses WHERE stored_at < ?", (time.time() - max_age,))
+        return cursor.rowcount
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+__all__ = ["SQLiteCacheBackend"]
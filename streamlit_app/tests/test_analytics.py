@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from analytics import PipelineAnalytics, changelog_transitions
+
+WEEK = 7 * 86400
+START = 1_704_067_200  # 2024-01-01 (Monday) UTC
+
+
+def _candidate(candidate_id, stage, source="LinkedIn", week=0, history=()):
+    changelogs = [{"since": START + week * WEEK + i * 3600, "stage_name": name} for i, name in enumerate(history)]
+    return {
+        "id": candidate_id,
+        "stage_name": stage,
+        "source": source,
+        "time_apply": START + week * WEEK,
+        "changelogs": changelogs,
+    }
+
+
+def _aggregates(analytics):
+    return {
+        "stage": analytics.stage_counts().sort_index(),
+        "source": analytics.source_mix().sort_index(),
+        "week": analytics.weekly_applications(),
+        "age": analytics.application_age(now=pd.Timestamp("2024-06-01")),
+        "transitions": analytics.stage_transitions().sort_values(["Từ stage", "Sang stage"]).reset_index(drop=True),
+    }
+
+
+def _assert_same(left, right):
+    for name in left:
+        if isinstance(left[name], pd.DataFrame):
+            pdt.assert_frame_equal(left[name], right[name], check_dtype=False, obj=name)
+        else:
+            pdt.assert_series_equal(left[name], right[name], check_dtype=False, check_names=False, obj=name)
+
+
+def _full(candidates):
+    analytics = PipelineAnalytics()
+    analytics.update(candidates, complete=True)
+    return analytics
+
+
+def test_changelog_transitions_use_explicit_and_implied_stages():
+    candidate = {
+        "changelogs": [
+            {"since": 30, "old_stage_name": "Phỏng vấn", "new_stage_name": "Offer"},
+            {"since": 10, "stage_name": "Ứng tuyển"},
+            {"since": 20, "stage": {"name": "Phỏng vấn"}},
+            {"since": 25, "stage_name": "Phỏng vấn"},
+        ]
+    }
+    assert changelog_transitions(candidate) == [("Ứng tuyển", "Phỏng vấn", 20), ("Phỏng vấn", "Offer", 30)]
+
+
+def test_pages_merged_incrementally_match_a_full_recompute():
+    page1 = [_candidate(i, "Ứng tuyển", week=i % 3) for i in range(5)]
+    page2 = [_candidate(i, "Phỏng vấn", "TopCV", week=4, history=("Ứng tuyển", "Phỏng vấn")) for i in range(5, 8)]
+
+    analytics = PipelineAnalytics()
+    assert analytics.update(page1) == 5
+    assert analytics.update(page2) == 3
+    assert len(analytics) == 8
+    _assert_same(_aggregates(analytics), _aggregates(_full(page1 + page2)))
+    # Weeks without applications are filled with zero
+    assert analytics.weekly_applications().tolist() == [2, 2, 1, 0, 3]
+
+
+def test_complete_update_applies_changes_and_removals():
+    initial = [_candidate(i, "Ứng tuyển", week=i % 2, history=("Ứng tuyển",)) for i in range(6)]
+    analytics = PipelineAnalytics()
+    analytics.update(initial, complete=True)
+
+    final = [dict(candidate) for candidate in initial[:4]]
+    final[1] = _candidate(1, "Offer", "Referral", week=1, history=("Ứng tuyển", "Phỏng vấn", "Offer"))
+    final.append(_candidate(9, "Phỏng vấn", week=3))
+
+    # 1 changed, 1 added, 2 removed
+    assert analytics.update(final, complete=True) == 4
+    assert len(analytics) == 5
+    _assert_same(_aggregates(analytics), _aggregates(_full(final)))
+    assert analytics.stage_counts()["Ứng tuyển"] == 3
+    assert set(analytics.stage_transitions()["Sang stage"]) == {"Phỏng vấn", "Offer"}
+
+
+def test_unchanged_candidates_are_not_counted_twice():
+    candidates = [_candidate(i, "Ứng tuyển") for i in range(3)]
+    analytics = PipelineAnalytics()
+    analytics.update(candidates)
+    assert analytics.update(candidates) == 0
+    assert analytics.stage_counts().tolist() == [3]
+
+
+def test_partial_update_keeps_unlisted_rows():
+    analytics = PipelineAnalytics()
+    analytics.update([_candidate(1, "Ứng tuyển"), _candidate(2, "Ứng tuyển")])
+    analytics.update([_candidate(3, "Offer")])
+    assert len(analytics) == 3
+
+
+def test_stage_counts_follow_pipeline_order():
+    analytics = _full([_candidate(1, "Offer"), _candidate(2, "Ứng tuyển"), _candidate(3, "Ứng tuyển"), _candidate(4, "Khác")])
+    assert list(analytics.stage_counts(["Ứng tuyển", "Phỏng vấn", "Offer"]).index) == ["Ứng tuyển", "Offer", "Khác"]
+
+
+def test_empty_analytics():
+    analytics = PipelineAnalytics()
+    assert analytics.update([], complete=True) == 0
+    assert analytics.stage_counts().empty
+    assert analytics.weekly_applications().empty
+    assert analytics.stage_transitions().empty
+    assert analytics.source_mix().empty
+    assert analytics.application_age().sum() == 0
+
+
+@pytest.mark.parametrize("time_apply", [None, "", "abc", 0])
+def test_missing_apply_time_is_ignored_by_weekly_counts(time_apply):
+    candidate = _candidate(1, "Ứng tuyển")
+    candidate["time_apply"] = time_apply
+    analytics = _full([candidate])
+    assert len(analytics) == 1
+    assert analytics.weekly_applications().empty
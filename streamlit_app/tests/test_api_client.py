@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import httpx
+import pytest
+import requests
+
+import api_client
+from api_client import AsyncBaseClient, BaseClient
+from rate_limiter import RetryPolicy, TokenBucket
+from response_cache import ResponseCache
+from single_flight import AsyncSingleFlight, SingleFlight
+
+URL = "https://hiring.base.vn/publicapi/v2/candidate/get"
+PARAMS = {"access_token": "secret", "id": 1}
+
+
+def _response(status_code, content=b"{}", headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    response.headers = requests.structures.CaseInsensitiveDict(headers or {})
+    return response
+
+
+class FakeSession:
+    """Stands in for ``requests.Session``: returns queued responses and records calls."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        self.calls.append(headers or {})
+        return self.responses.pop(0)
+
+    def close(self):
+        pass
+
+
+def _client(session, clock, **kwargs):
+    client = BaseClient(cache=ResponseCache(ttls={"candidate/get": 10.0}, stale_ttl=60.0, clock=clock), **kwargs)
+    client._session = session
+    return client
+
+
+def test_fresh_hit_skips_the_network(clock):
+    session = FakeSession(_response(200, b'{"v": 1}'))
+    client = _client(session, clock)
+    assert client.post(URL, PARAMS, "candidate/get").json() == {"v": 1}
+    assert client.post(URL, PARAMS, "candidate/get").json() == {"v": 1}
+    assert len(session.calls) == 1
+
+
+def test_stale_hit_is_served_and_revalidated_in_background(clock):
+    session = FakeSession(
+        _response(200, b'{"v": 1}', {"ETag": '"v1"'}),
+        _response(200, b'{"v": 2}', {"ETag": '"v2"'}),
+    )
+    client = _client(session, clock)
+    client.post(URL, PARAMS, "candidate/get")
+
+    clock.advance(11)
+    assert client.post(URL, PARAMS, "candidate/get").json() == {"v": 1}
+    client._revalidator.shutdown(wait=True)
+
+    assert session.calls[-1] == {"If-None-Match": '"v1"'}
+    assert client.post(URL, PARAMS, "candidate/get").json() == {"v": 2}
+    assert len(session.calls) == 2
+
+
+def test_not_modified_revalidation_refreshes_the_entry(clock):
+    session = FakeSession(_response(200, b'{"v": 1}', {"ETag": '"v1"'}), _response(304, b""))
+    client = _client(session, clock)
+    client.post(URL, PARAMS, "candidate/get")
+
+    clock.advance(11)
+    client.post(URL, PARAMS, "candidate/get")
+    client._revalidator.shutdown(wait=True)
+    assert client.cache.get("candidate/get", PARAMS).content == b'{"v": 1}'
+
+
+def test_use_cache_false_reads_upstream_and_stores(clock):
+    session = FakeSession(_response(200, b'{"v": 1}'), _response(200, b'{"v": 2}'))
+    client = _client(session, clock)
+    client.post(URL, PARAMS, "candidate/get")
+    assert client.post(URL, PARAMS, "candidate/get", use_cache=False).json() == {"v": 2}
+    assert client.post(URL, PARAMS, "candidate/get").json() == {"v": 2}
+
+
+def test_retries_5xx_and_429_with_backoff(monkeypatch, clock):
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock.advance(seconds)
+
+    # time.sleep is shared with rate_limiter, so the bucket's own waits are recorded too
+    monkeypatch.setattr(api_client.time, "sleep", sleep)
+    bucket = TokenBucket(rate=4.0, capacity=10, clock=clock)
+    session = FakeSession(
+        _response(503),
+        _response(429, headers={"Retry-After": "2"}),
+        _response(200, b'{"ok": true}'),
+    )
+    client = _client(session, clock, rate_limiter=bucket, retry_policy=RetryPolicy(max_retries=3, backoff_max=5.0))
+
+    assert client.post(URL, PARAMS, "candidate/get").status_code == 200
+    assert len(session.calls) == 3
+    # Jittered backoff after the 503, then the Retry-After delay; the bucket's
+    # 429 pause has already elapsed by the time the third attempt acquires
+    assert len(sleeps) == 2
+    assert sleeps[0] <= 0.5
+    assert sleeps[1] == 2.0
+    # The 429 halved the rate, the final success added one step back
+    assert bucket.rate == pytest.approx(2.1)
+
+
+def test_gives_up_after_max_retries(monkeypatch, clock):
+    monkeypatch.setattr(api_client.time, "sleep", lambda seconds: None)
+    session = FakeSession(*(_response(502) for _ in range(3)))
+    client = _client(session, clock, retry_policy=RetryPolicy(max_retries=2))
+    assert client.post(URL, PARAMS, "candidate/get").status_code == 502
+    assert len(session.calls) == 3
+
+
+def test_single_flight_shares_one_call_between_threads():
+    group = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return "result"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(group.do("key", slow))) for _ in range(4)]
+    threads[0].start()
+    while group.in_flight() == 0:
+        pass
+    for thread in threads[1:]:
+        thread.start()
+    while group.coalesced < 3:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == ["result"] * 4
+    assert len(calls) == 1
+    assert group.in_flight() == 0
+
+
+def test_async_single_flight_shares_one_call():
+    group = AsyncSingleFlight()
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*(group.do("key", slow) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["result"] * 5
+    assert len(calls) == 1
+    assert group.coalesced == 4
+
+
+def test_async_stale_hit_returns_immediately_and_revalidates_once(clock):
+    requests_seen = []
+
+    async def handler(request):
+        requests_seen.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match"):
+            return httpx.Response(304)
+        return httpx.Response(200, content=b'{"v": 1}', headers={"ETag": '"v1"'})
+
+    async def main():
+        client = AsyncBaseClient(cache=ResponseCache(ttls={"candidate/get": 10.0}, stale_ttl=60.0, clock=clock))
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        await client.post(URL, PARAMS, "candidate/get")
+
+        clock.advance(11)
+        stale = await asyncio.gather(*(client.post(URL, PARAMS, "candidate/get") for _ in range(3)))
+        assert [response.json() for response in stale] == [{"v": 1}] * 3
+        await asyncio.gather(*client._background)
+        assert client.cache.get("candidate/get", PARAMS) is not None
+        await client.aclose()
+
+    asyncio.run(main())
+    assert requests_seen == [None, '"v1"']
+
+
+def test_http2_cache_hit_has_the_network_response_type(clock):
+    client = BaseClient(http2=True, cache=ResponseCache(clock=clock))
+    client.cache.set("candidate/get", PARAMS, 200, b'{"v": 1}')
+    response = client.post(URL, PARAMS, "candidate/get")
+    assert isinstance(response, httpx.Response)
+    assert response.json() == {"v": 1}
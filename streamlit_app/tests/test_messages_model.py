@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from streamlit.testing.v1 import AppTest
+
+from messages_model import COMPRESS_MIN_BYTES, EMPTY_THREAD, Message, normalize_messages
+
+
+def _message(message_id, since, body="Xin chào", **extra):
+    return {"id": message_id, "since": since, "content": body, "subject": "Lịch phỏng vấn", **extra}
+
+
+def test_normalize_finds_nested_lists_and_sorts_newest_first():
+    payload = {
+        "candidate_id": 7,
+        "data": {"opening_id": 3, "messages": [_message(1, 100), _message(2, 300), _message(3, 200)]},
+    }
+    thread = normalize_messages(payload)
+    assert [message.id for message in thread] == ["2", "3", "1"]
+    assert thread.meta == {"candidate_id": 7, "opening_id": 3}
+
+
+def test_normalize_accepts_a_bare_list_and_skips_junk():
+    thread = normalize_messages([_message(1, 10), "junk", None])
+    assert len(thread) == 1
+    assert normalize_messages({"messages": []}).messages == ()
+    assert len(normalize_messages(None)) == 0
+    assert len(EMPTY_THREAD) == 0
+
+
+def test_message_fields_are_extracted_and_interned():
+    payload = [
+        _message(
+            1,
+            "1700000000",
+            user={"name": "HR Base", "type": "user"},
+            thread_id="t-1",
+            attachments=[{"filename": "cv.pdf", "download_url": "https://example.com/cv.pdf"}, "junk"],
+            tracking_events=[{"event": "open", "since": 1700000100}],
+        ),
+        _message(2, 1700000200, user={"username": "hr2"}, thread_id="t-1"),
+    ]
+    first, second = normalize_messages(payload).messages[::-1]
+    assert (first.author, first.author_type, first.since) == ("HR Base", "user", 1700000000)
+    assert first.attachments == (("cv.pdf", "https://example.com/cv.pdf"),)
+    assert first.events == (("open", 1700000100),)
+    assert second.author == "hr2"
+    assert first.thread_id is second.thread_id
+
+
+def test_long_bodies_are_compressed_until_read():
+    long_body = "<p>" + "Nội dung dài. " * 100 + "</p>"
+    short, long = Message.from_payload(_message(1, 1)), Message.from_payload(_message(2, 2, long_body))
+    assert not short.compressed and short.content == "Xin chào"
+    assert long.compressed and len(long_body.encode("utf-8")) >= COMPRESS_MIN_BYTES
+    assert long.content == long_body
+    # Escaped CRLF from the API become real newlines
+    assert Message.from_payload(_message(3, 3, "a\\r\\nb")).content == "a\nb"
+
+
+def _messages_view(count):
+    from messages_model import normalize_messages
+    from ui.components import render_candidate_messages_view
+
+    payload = {"candidate_id": "c1", "messages": [{"id": i, "since": i, "content": f"m{i}"} for i in range(count)]}
+    render_candidate_messages_view(normalize_messages(payload))
+
+
+def _load_more_buttons(app):
+    return [button for button in app.button if button.key == "messages_limit_c1_more"]
+
+
+def test_messages_view_pages_in_batches():
+    app = AppTest.from_function(_messages_view, args=(25,)).run()
+    assert not app.exception
+    assert len(app.toggle) == 10
+
+    _load_more_buttons(app)[0].click().run()
+    assert len(app.toggle) == 20
+    assert app.session_state["messages_limit_c1"] == 20
+
+    _load_more_buttons(app)[0].click().run()
+    assert len(app.toggle) == 25
+    assert _load_more_buttons(app) == []
+
+
+def test_messages_view_without_messages():
+    app = AppTest.from_function(_messages_view, args=(0,)).run()
+    assert not app.exception
+    assert len(app.toggle) == 0
+    assert app.info
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import pytest
+
+import rate_limiter
+from rate_limiter import RetryPolicy, TokenBucket, parse_retry_after
+
+
+def test_bucket_allows_a_burst_then_paces_at_the_rate(clock):
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=clock)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.5)
+
+    clock.advance(1.5)
+    # 3 tokens refilled, one already owed by the previous reservation
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+
+
+def test_penalize_halves_rate_and_honours_retry_after(clock):
+    bucket = TokenBucket(rate=8.0, capacity=4, min_rate=1.5, clock=clock)
+    bucket.penalize(retry_after=3.0)
+    assert bucket.rate == 4.0
+    assert bucket.reserve() == pytest.approx(3.0)
+
+    bucket.penalize()
+    bucket.penalize()
+    assert bucket.rate == 1.5
+
+    clock.advance(3.0)
+    assert bucket.reserve() == 0.0
+
+
+def test_reward_restores_rate_additively_up_to_max(clock):
+    bucket = TokenBucket(rate=1.0, increase_step=0.25, clock=clock)
+    bucket.penalize()
+    assert bucket.rate == 0.5
+    bucket.reward()
+    assert bucket.rate == 0.75
+    for _ in range(5):
+        bucket.reward()
+    assert bucket.rate == 1.0
+
+
+def test_retry_policy_limits_attempts_and_statuses():
+    policy = RetryPolicy(max_retries=2)
+    assert policy.should_retry(0)
+    assert policy.should_retry(1, 503)
+    assert not policy.should_retry(1, 404)
+    assert not policy.should_retry(2, 503)
+
+
+def test_retry_delay_backs_off_exponentially_with_cap(monkeypatch):
+    # Full jitter: pin the random draw to its upper bound
+    monkeypatch.setattr(rate_limiter.random, "uniform", lambda low, high: high)
+    policy = RetryPolicy(backoff_base=0.5, backoff_max=3.0)
+    assert [policy.delay(attempt) for attempt in range(4)] == [0.5, 1.0, 2.0, 3.0]
+    assert policy.delay(0, retry_after=2.5) == 2.5
+    assert policy.delay(0, retry_after=60.0) == 3.0
+
+
+def test_parse_retry_after_seconds_and_http_date():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("Thu, 01 Jan 1970 00:00:30 GMT", now=10.0) == 20.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from response_cache import ResponseCache
+from sqlite_cache import SQLiteCacheBackend
+
+TOKEN = {"access_token": "secret"}
+
+
+def _params(**params):
+    return {**TOKEN, **params}
+
+
+def test_entry_is_fresh_until_ttl_then_stale_then_miss(clock):
+    cache = ResponseCache(ttls={"candidate/get": 10.0}, stale_ttl=5.0, clock=clock)
+    cache.set("candidate/get", _params(id=1), 200, b"{}")
+
+    clock.advance(9)
+    assert cache.get("candidate/get", _params(id=1)) is not None
+
+    clock.advance(2)
+    assert cache.get("candidate/get", _params(id=1)) is None
+    stale = cache.lookup("candidate/get", _params(id=1))
+    assert stale is not None and not stale.is_fresh(clock())
+
+    clock.advance(5)
+    assert cache.lookup("candidate/get", _params(id=1)) is None
+    assert len(cache) == 0
+    assert cache.stats.stale_hits == 2
+
+
+def test_lru_eviction_by_entries_and_bytes(clock):
+    cache = ResponseCache(max_entries=2, max_bytes=10, clock=clock)
+    cache.set("candidate/get", _params(id=1), 200, b"aaaa")
+    cache.set("candidate/get", _params(id=2), 200, b"bbbb")
+    # Reading id=1 makes id=2 the least recently used
+    assert cache.get("candidate/get", _params(id=1)) is not None
+    cache.set("candidate/get", _params(id=3), 200, b"cc")
+    assert cache.get("candidate/get", _params(id=2)) is None
+    assert cache.get("candidate/get", _params(id=1)) is not None
+
+    cache.set("candidate/get", _params(id=4), 200, b"dddddddd")
+    assert len(cache) == 1
+    assert cache.total_bytes == 8
+    assert cache.stats.evictions == 3
+
+
+def test_oversized_body_is_not_cached(clock):
+    cache = ResponseCache(max_bytes=4, clock=clock)
+    assert cache.set("candidate/get", _params(id=1), 200, b"too large") is None
+    assert len(cache) == 0
+
+
+def test_keys_separate_tokens_and_ignore_param_order(clock):
+    cache = ResponseCache(clock=clock)
+    cache.set("candidate/list", {"access_token": "a", "page": 1, "stage": ""}, 200, b"{}")
+    assert cache.get("candidate/list", {"stage": "", "page": 1, "access_token": "a"}) is not None
+    assert cache.get("candidate/list", {"access_token": "b", "page": 1, "stage": ""}) is None
+
+
+def test_invalidate_by_endpoint_token_and_params(clock):
+    cache = ResponseCache(clock=clock)
+    cache.set("candidate/get", _params(id=1), 200, b"{}")
+    cache.set("candidate/get", _params(id=2), 200, b"{}")
+    cache.set("opening/list", _params(page=1), 200, b"{}")
+
+    assert cache.invalidate("candidate/get", "secret", id=1) == 1
+    assert cache.get("candidate/get", _params(id=2)) is not None
+    assert cache.invalidate() == 2
+    assert len(cache) == 0
+
+
+def test_sqlite_backend_survives_a_new_cache(tmp_path, clock):
+    path = tmp_path / "cache.db"
+    first = ResponseCache(backend=SQLiteCacheBackend(path), clock=clock)
+    first.set("opening/get", _params(id=7), 200, b'{"id": 7}', {"ETag": '"v1"', "X-Other": "dropped"})
+
+    second = ResponseCache(backend=SQLiteCacheBackend(path), clock=clock)
+    entry = second.get("opening/get", _params(id=7))
+    assert entry is not None
+    assert entry.content == b'{"id": 7}'
+    assert entry.headers == {"ETag": '"v1"'}
+
+    second.invalidate("opening/get")
+    third = ResponseCache(backend=SQLiteCacheBackend(path), clock=clock)
+    assert third.lookup("opening/get", _params(id=7)) is None
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import pytest
+
+from search_index import CandidateSearchIndex, PrefixTrie, build_search_index, fold_text, normalize_phone, tokenize
+
+CANDIDATES = [
+    {
+        "id": 1,
+        "name": "Nguyễn Đức Anh",
+        "email": "Anh.Nguyen@Example.com",
+        "phone": "+84 912 345 678",
+        "stage_name": "Phỏng vấn",
+        "source": "LinkedIn",
+        "opening_export": {"name": "Kỹ sư dữ liệu"},
+        "tags": [{"name": "Python"}, "Senior"],
+    },
+    {
+        "id": 2,
+        "name": "Trần Thị Ánh",
+        "email": "anh.tran@example.com",
+        "phone": "0987 654 321",
+        "stage_name": "Ứng tuyển",
+        "source": "TopCV",
+    },
+    {
+        "id": 3,
+        "name": "Lê Văn Đông",
+        "email": None,
+        "phone": None,
+        "stage_name": "Phỏng vấn",
+        "source": "Giới thiệu",
+    },
+]
+
+
+@pytest.fixture
+def index():
+    return build_search_index({"candidates": CANDIDATES})
+
+
+def test_fold_text_strips_vietnamese_diacritics():
+    assert fold_text("Nguyễn Đức Ánh") == "nguyen duc anh"
+    assert fold_text(None) == ""
+    assert tokenize("Lê Văn-Đông") == ["le", "van", "dong"]
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [("+84 912 345 678", "0912345678"), ("(091) 234.5678", "0912345678"), ("abc", ""), (None, "")],
+)
+def test_normalize_phone(raw, expected):
+    assert normalize_phone(raw) == expected
+
+
+def test_trie_completes_shortest_first():
+    trie = PrefixTrie()
+    for token in ("anh", "anhthu", "an", "binh"):
+        trie.insert(token)
+    assert trie.complete("an") == ["an", "anh", "anhthu"]
+    assert trie.complete("an", limit=2) == ["an", "anh"]
+    assert trie.complete("x") == []
+
+
+def test_query_without_diacritics_matches_accented_names(index):
+    assert index.search("nguyen duc") == [0]
+    assert index.search("Dong") == [2]
+    assert index.search("anh") == [0, 1]
+
+
+def test_last_token_is_a_prefix_and_other_tokens_are_exact(index):
+    assert index.search("phong v") == [0, 2]
+    assert index.search("tran th") == [1]
+    # Only the last token is completed
+    assert index.search("ngu duc") == []
+
+
+def test_tags_opening_and_source_are_indexed(index):
+    assert index.search("python") == [0]
+    assert index.search("ky su du lieu") == [0]
+    assert index.search("gioi thieu") == [2]
+
+
+def test_email_and_phone_use_exact_lookups(index):
+    assert index.search("anh.nguyen@example.com") == [0]
+    assert index.search("0912 345 678") == [0]
+    assert index.search("84987654321") == [1]
+
+
+def test_limit_empty_and_unknown_queries(index):
+    assert index.search("phong", limit=1) == [0]
+    assert index.search("   ") == []
+    assert index.search("zzz") == []
+
+
+def test_append_continues_positions_across_pages():
+    index = CandidateSearchIndex()
+    index.append({"candidates": CANDIDATES[:2]})
+    index.append({"candidates": CANDIDATES[2:]})
+    assert len(index) == 3
+    assert index.search("dong") == [2]
+
+
+def test_suggest_excludes_the_typed_token(index):
+    assert index.suggest("ph") == ["phong"]
+    assert index.suggest("anh") == []
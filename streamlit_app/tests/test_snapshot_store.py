@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+import requests
+
+import snapshot_store
+from snapshot_store import SnapshotStore
+
+OPENING = "42"
+
+
+def _candidate(candidate_id, stage="Applied", time_apply=1_700_000_000):
+    return {"id": candidate_id, "name": f"Ứng viên {candidate_id}", "stage": stage, "time_apply": time_apply}
+
+
+def _response(payload):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(payload).encode("utf-8")
+    return response
+
+
+class FakeListing:
+    """Serves ``candidate/list`` pages for ``fetch_candidates``; set ``pages`` or ``candidates``."""
+
+    def __init__(self):
+        self.candidates = []
+        self.pages = None
+        self.calls = []
+
+    def __call__(self, access_token, opening_id, page, num_per_page, stage, use_cache=True):
+        self.calls.append((page, use_cache))
+        if self.pages is not None:
+            return _response(self.pages[page])
+        start = (page - 1) * num_per_page
+        return _response({
+            "candidates": self.candidates[start:start + num_per_page],
+            "total": len(self.candidates),
+        })
+
+
+@pytest.fixture
+def listing(monkeypatch):
+    fake = FakeListing()
+    monkeypatch.setattr(snapshot_store, "fetch_candidates", fake)
+    return fake
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SnapshotStore(tmp_path / "snapshot.sqlite3", min_check_interval=0.0)
+    yield store
+    store.close()
+
+
+def _ids(store):
+    return sorted(candidate["id"] for candidate in store.candidate_page(OPENING, page="all")["candidates"])
+
+
+def test_first_sync_inserts_every_candidate_without_the_cache(store, listing):
+    listing.candidates = [_candidate(i) for i in range(1, 6)]
+    result = store.sync_opening("token", OPENING, num_per_page=2)
+    assert (result.inserted, result.updated, result.deleted, result.pages) == (5, 0, 0, 3)
+    assert _ids(store) == [1, 2, 3, 4, 5]
+    assert all(use_cache is False for _, use_cache in listing.calls)
+
+
+def test_unchanged_opening_is_fresh_after_the_probe(store, listing):
+    listing.candidates = [_candidate(1), _candidate(2)]
+    store.sync_opening("token", OPENING)
+    listing.calls.clear()
+
+    result = store.sync_opening("token", OPENING)
+    assert result.fresh
+    assert result.changed == 0
+    assert len(listing.calls) == 1
+
+
+def test_changed_candidate_is_updated(store, listing):
+    listing.candidates = [_candidate(1), _candidate(2)]
+    store.sync_opening("token", OPENING)
+
+    listing.candidates = [_candidate(1), _candidate(2, stage="Interview")]
+    result = store.sync_opening("token", OPENING)
+    assert (result.inserted, result.updated, result.deleted) == (0, 1, 0)
+    assert store.candidate_page(OPENING, stage="Interview")["count"] == 1
+
+
+def test_removed_candidate_is_deleted(store, listing):
+    listing.candidates = [_candidate(1), _candidate(2), _candidate(3)]
+    store.sync_opening("token", OPENING)
+
+    listing.candidates = [_candidate(1), _candidate(3)]
+    result = store.sync_opening("token", OPENING)
+    assert result.deleted == 1
+    assert _ids(store) == [1, 3]
+
+
+def test_error_payload_deletes_nothing(store, listing):
+    listing.candidates = [_candidate(1), _candidate(2)]
+    store.sync_opening("token", OPENING)
+    synced_at = store.last_synced_at(OPENING)
+
+    listing.pages = {1: {"code": 0, "message": "Access token không hợp lệ"}}
+    result = store.sync_opening("token", OPENING, force=True)
+    assert not result.complete
+    assert result.deleted == 0
+    assert _ids(store) == [1, 2]
+    assert store.last_synced_at(OPENING) == synced_at
+
+
+def test_error_payload_on_a_later_page_deletes_nothing(store, listing):
+    listing.candidates = [_candidate(i) for i in range(1, 5)]
+    store.sync_opening("token", OPENING, num_per_page=2)
+
+    listing.pages = {
+        1: {"candidates": [_candidate(1), _candidate(2)], "total": 4},
+        2: {"error": "rate limited"},
+    }
+    result = store.sync_opening("token", OPENING, force=True, num_per_page=2)
+    assert not result.complete
+    assert result.deleted == 0
+    assert _ids(store) == [1, 2, 3, 4]
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import web_api
+
+LIST_URL = "https://hiring.base.vn/publicapi/v2/candidate/list"
+
+
+def _response(status_code, payload=None, text=None):
+    content = text.encode("utf-8") if text is not None else json.dumps(payload).encode("utf-8")
+    return httpx.Response(status_code, content=content, request=httpx.Request("POST", LIST_URL))
+
+
+class FakeBaseClient:
+    """Stands in for ``AsyncBaseClient``: ``pages`` maps page number to a prepared response."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+
+    async def fetch_candidates(self, access_token, opening_id, page, num_per_page, stage):
+        self.requested.append(page)
+        return self.pages[page]
+
+    async def fetch_candidate_detail(self, access_token, candidate_id):
+        return _response(200, {"id": candidate_id})
+
+    async def fetch_candidate_messages(self, access_token, candidate_id):
+        return _response(200, {"messages": []})
+
+
+@pytest.fixture
+def use_pages(monkeypatch):
+    def _use(pages):
+        fake = FakeBaseClient(pages)
+        monkeypatch.setattr(web_api.app.state, "base_client", fake, raising=False)
+        return fake
+
+    return _use
+
+
+@pytest.fixture
+def api():
+    return TestClient(web_api.app)
+
+
+def test_batch_reports_upstream_status_from_the_listing(api, use_pages):
+    use_pages({1: _response(401, {"message": "invalid token"})})
+    response = api.post("/candidates/batch", json={"access_token": "bad", "opening_id": "1"})
+    assert response.status_code == 401
+    body = response.json()
+    assert body["success"] is False
+    assert body["details"] == {"message": "invalid token"}
+
+
+def test_batch_reports_non_json_listing_as_502(api, use_pages):
+    use_pages({1: _response(200, text="<html>maintenance</html>")})
+    response = api.post("/candidates/batch", json={"access_token": "t", "opening_id": "1"})
+    assert response.status_code == 502
+    assert response.json()["success"] is False
+
+
+def test_batch_rejects_oversized_opening_after_the_first_page(api, use_pages):
+    fake = use_pages({1: _response(200, {"candidates": [{"id": 1}], "total": 5000})})
+    response = api.post("/candidates/batch", json={"access_token": "t", "opening_id": "1"})
+    assert response.status_code == 400
+    assert fake.requested == [1]
+
+
+def test_batch_hydrates_listed_candidates(api, use_pages):
+    use_pages({1: _response(200, {"candidates": [{"id": 1}, {"id": 2}], "total": 2})})
+    response = api.post("/candidates/batch", json={"access_token": "t", "opening_id": "1"})
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["id"] for item in body["candidates"]] == ["1", "2"]
+    assert body["candidates"][0]["detail"] == {"id": "1"}
+    assert body["error_count"] == 0
+
+
+def test_export_reports_upstream_error_before_streaming(api, use_pages):
+    use_pages({1: _response(401, {"message": "invalid token"})})
+    response = api.post("/candidates/export", json={"access_token": "bad", "opening_id": "1", "format": "csv"})
+    assert response.status_code == 401
+    assert "content-disposition" not in response.headers
+    assert response.json()["success"] is False
+
+
+def test_export_reports_non_json_first_page_as_502(api, use_pages):
+    use_pages({1: _response(200, text="<html>maintenance</html>")})
+    response = api.post("/candidates/export", json={"access_token": "t", "opening_id": "1", "format": "csv"})
+    assert response.status_code == 502
+
+
+def test_export_fetches_the_first_page_once(api, use_pages):
+    fake = use_pages({
+        1: _response(200, {"candidates": [{"id": 1, "name": "An"}], "total": 2}),
+        2: _response(200, {"candidates": [{"id": 2, "name": "Bình"}], "total": 2}),
+    })
+    response = api.post(
+        "/candidates/export",
+        json={"access_token": "t", "opening_id": "1", "format": "csv", "num_per_page": 1},
+    )
+    assert response.status_code == 200
+    assert "attachment" in response.headers["content-disposition"]
+    lines = response.content.decode("utf-8-sig").splitlines()
+    assert len(lines) == 3
+    assert sorted(fake.requested) == [1, 2]
@@ -2,12 +2,21 @@
 
 from __future__ import annotations
 
+import time
 from datetime import datetime
-from typing import Any, Dict, Iterable, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional
 
 import pandas as pd
 import streamlit as st
 
+from ui import templates
+
+if TYPE_CHECKING:
+    from analytics import PipelineAnalytics
+    from messages_model import Message, MessageThread
+    from openings_model import OpeningsModel
+    from search_index import CandidateSearchIndex
+
 
 def _format_timestamp(value: Any) -> str:
     """Convert timestamp-like value to human readable string."""
@@ -31,12 +40,16 @@ def _format_text(value: Any, default: str = "-") -> str:
 def _render_badges(items: Iterable[Any]) -> str:
     items = items or []
     if not items:
-        return "<span class='candidate-label muted'>Không có</span>"
-    tags_html = "".join(
-        f"<span class='candidate-badge'>{_format_text(item.get('name') if isinstance(item, dict) else item)}</span>"
+        return templates.MUTED_LABEL.render(text="Không có")
+    return "".join(
+        templates.BADGE.render(text=_format_text(item.get("name") if isinstance(item, dict) else item))
         for item in items
     )
-    return tags_html
+
+
+def inject_styles() -> None:
+    """Emit the shared stylesheet; call once per script run before rendering components."""
+    st.markdown(templates.STYLESHEET, unsafe_allow_html=True)
 
 
 def render_metrics(metrics: Dict[str, Any]) -> None:
@@ -47,78 +60,174 @@ def render_metrics(metrics: Dict[str, Any]) -> None:
     col_page.metric("Trang hiện tại", metrics.get("page"))
 
 
-def render_candidate_list(df: pd.DataFrame) -> Optional[str]:
-    """Render candidate cards with action button per row.
+def render_pipeline_analytics(
+    analytics: "PipelineAnalytics", stage_order: Optional[Iterable[str]] = None, transitions_limit: int = 20
+) -> None:
+    """Render funnel analytics: candidates per stage, source mix, applications over time and stage transitions."""
+    if not len(analytics):
+        st.info("Chưa có dữ liệu để phân tích.")
+        return
+
+    st.markdown("**Ứng viên theo stage**")
+    st.bar_chart(analytics.stage_counts(list(stage_order or [])).rename("Số ứng viên"), horizontal=True)
 
-    Returns the candidate ID selected by the user, if any.
+    col_source, col_age = st.columns(2)
+    with col_source:
+        st.markdown("**Nguồn ứng viên**")
+        st.dataframe(
+            analytics.source_mix(),
+            column_config={"Tỷ lệ": st.column_config.ProgressColumn("Tỷ lệ", format="percent", min_value=0, max_value=1)},
+        )
+    with col_age:
+        st.markdown("**Thời gian kể từ khi ứng tuyển**")
+        st.bar_chart(analytics.application_age().rename("Số ứng viên"))
+
+    weekly = analytics.weekly_applications()
+    if not weekly.empty:
+        st.markdown("**Số lượt ứng tuyển theo tuần**")
+        st.line_chart(weekly.rename("Số ứng viên"))
+
+    transitions = analytics.stage_transitions(transitions_limit)
+    st.markdown("**Chuyển stage**")
+    if transitions.empty:
+        st.caption("Không có lịch sử chuyển stage (changelogs) trong dữ liệu đã tải.")
+    else:
+        st.dataframe(transitions, hide_index=True)
+
+
+CANDIDATE_LIST_MODES = ("table", "cards")
+CARD_PAGE_SIZES = (10, 25, 50, 100)
+
+
+def render_candidate_list(
+    df: pd.DataFrame,
+    mode: str = "table",
+    key: str = "candidate_list",
+    search_index: Optional["CandidateSearchIndex"] = None,
+) -> Optional[str]:
+    """Render the candidate list and return the candidate ID selected by the user, if any.
+
+    ``mode="table"`` renders a single ``st.dataframe`` (the browser virtualizes
+    rows) with row selection; ``mode="cards"`` keeps the per-row card layout
+    but only materializes the current page of cards. With ``search_index``
+    (built over the same rows as ``df``) a search box filters the list locally.
     """
     if df.empty:
         st.warning("Không tìm thấy ứng viên nào.")
         return None
 
-    st.markdown(
-        """
-        <style>
-        .candidate-item {background:#ffffff; border:1px solid #e2e8f0; border-radius:14px; padding:1.1rem; margin-bottom:0.75rem; box-shadow:0 1px 3px rgba(15,23,42,0.08);} 
-        .candidate-item:hover {border-color:#94a3b8; box-shadow:0 2px 6px rgba(15,23,42,0.12);} 
-        .candidate-name {font-size:1.05rem; font-weight:600; color:#0f172a; margin-bottom:0.15rem;} 
-        .candidate-sub {color:#475569; font-size:0.9rem;} 
-        .candidate-meta {color:#334155; font-size:0.85rem; margin-top:0.4rem;} 
-        .candidate-actions {text-align:right;} 
-        .candidate-pill {display:inline-flex; align-items:center; gap:0.3rem; padding:0.2rem 0.65rem; background:#f1f5f9; border-radius:999px; font-size:0.8rem; color:#1e293b;} 
-        </style>
-        """,
-        unsafe_allow_html=True,
+    if search_index is not None:
+        df = _render_candidate_search(df, search_index, key)
+        if df.empty:
+            st.info("Không có ứng viên nào khớp với từ khóa.")
+            return None
+
+    if mode == "cards":
+        window = _render_list_pager(len(df), key)
+        return _render_candidate_cards(df.iloc[window])
+    return _render_candidate_table(df, key)
+
+
+def _render_candidate_search(df: pd.DataFrame, search_index: "CandidateSearchIndex", key: str) -> pd.DataFrame:
+    query = st.text_input(
+        "🔎 Tìm theo tên, email, SĐT hoặc tag",
+        key=f"{key}_search",
+        placeholder="vd. nguyen van a, a@congty.vn, 0901234567, java",
+    )
+    if not query.strip():
+        return df
+
+    started = time.perf_counter()
+    positions = [position for position in search_index.search(query) if position < len(df)]
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    caption = f"Tìm thấy {len(positions)}/{len(df)} ứng viên ({elapsed_ms:.2f} ms)"
+    suggestions = search_index.suggest(query)
+    if suggestions:
+        caption += " · Gợi ý: " + ", ".join(suggestions)
+    st.caption(caption)
+    return df.iloc[positions]
+
+
+def _render_candidate_table(df: pd.DataFrame, key: str) -> Optional[str]:
+    display_df = df
+    if "CV Link" in df.columns:
+        display_df = df.assign(**{"CV Link": df["CV Link"].where(df["CV Link"] != "Không có")})
+    # The widget key carries a version so reset_candidate_selection can clear the selection
+    version = st.session_state.get(f"{key}_table_version", 0)
+    event = st.dataframe(
+        display_df,
+        hide_index=True,
+        width="stretch",
+        on_select="rerun",
+        selection_mode="single-row",
+        key=f"{key}_table_{version}",
+        column_config={"CV Link": st.column_config.LinkColumn("CV Link", display_text="📄 CV")},
     )
+    rows = event.selection.rows if event is not None else []
+    selected_id = _format_text(df.iloc[rows[0]]["ID"]) if rows else None
+
+    # Only report a selection once, when it changes; the caller keeps the open candidate in session state.
+    last_key = f"{key}_last_selected"
+    if selected_id == st.session_state.get(last_key):
+        return None
+    st.session_state[last_key] = selected_id
+    return selected_id
+
+
+def reset_candidate_selection(key: str = "candidate_list") -> None:
+    """Forget the table selection, so the same row can be selected again (e.g. after closing the modal)."""
+    st.session_state[f"{key}_table_version"] = st.session_state.get(f"{key}_table_version", 0) + 1
+    st.session_state.pop(f"{key}_last_selected", None)
+
 
+def _render_list_pager(total_rows: int, key: str) -> slice:
+    """Render paging controls for the card layout and return the visible row window."""
+    size_col, page_col, info_col = st.columns([1, 1, 2])
+    page_size = size_col.selectbox("Số thẻ mỗi trang", CARD_PAGE_SIZES, index=1, key=f"{key}_page_size")
+    page_count = max(1, -(-total_rows // page_size))
+    # The row count shrinks when a search is applied; keep the page in range
+    if st.session_state.get(f"{key}_page", 1) > page_count:
+        st.session_state[f"{key}_page"] = page_count
+    page = page_col.number_input("Trang", min_value=1, max_value=page_count, value=1, key=f"{key}_page")
+    start = (int(page) - 1) * page_size
+    stop = min(total_rows, start + page_size)
+    info_col.caption(f"Hiển thị {start + 1}–{stop} / {total_rows} ứng viên")
+    return slice(start, stop)
+
+
+def _render_candidate_cards(df: pd.DataFrame) -> Optional[str]:
     selected_id: Optional[str] = None
-    for _, row in df.iterrows():
+    for row in df.to_dict("records"):
         candidate_id = _format_text(row.get("ID"))
-        name = _format_text(row.get("Họ & Tên"))
-        stage = _format_text(row.get("Giai đoạn"))
-        source = _format_text(row.get("Nguồn"))
-        opening = _format_text(row.get("Vị trí ứng tuyển"))
-        email = _format_text(row.get("Email"))
-        phone = _format_text(row.get("SĐT"))
         cv_link = row.get("CV Link")
+        card_html = templates.CANDIDATE_CARD.render(
+            name=_format_text(row.get("Họ & Tên")),
+            candidate_id=candidate_id,
+            stage=_format_text(row.get("Giai đoạn")),
+            opening=_format_text(row.get("Vị trí ứng tuyển")),
+            source=_format_text(row.get("Nguồn")),
+            email=_format_text(row.get("Email")),
+            phone=_format_text(row.get("SĐT")),
+            cv_html=templates.CANDIDATE_CV_LINK.render(url=cv_link) if cv_link and cv_link != "Không có" else "",
+        )
 
-        with st.container():
-            st.markdown("<div class='candidate-item'>", unsafe_allow_html=True)
-            info_col, action_col = st.columns([4, 1])
-            with info_col:
-                st.markdown(
-                    f"<div class='candidate-name'>{name}</div>"
-                    f"<div class='candidate-sub'>ID: {candidate_id} · Stage: {stage}</div>",
-                    unsafe_allow_html=True,
-                )
-                st.markdown(
-                    f"<div class='candidate-meta'>Vị trí: {opening}</div>"
-                    f"<div class='candidate-meta'>Nguồn: {source}</div>"
-                    f"<div class='candidate-meta'>Email: {email} · SĐT: {phone}</div>",
-                    unsafe_allow_html=True,
-                )
-                if cv_link and cv_link != "Không có":
-                    st.markdown(f"<div class='candidate-meta'><a href='{cv_link}' target='_blank'>📄 CV</a></div>", unsafe_allow_html=True)
-            with action_col:
-                st.markdown("<div class='candidate-actions'>", unsafe_allow_html=True)
-                if st.button(
-                    f"#{candidate_id}",
-                    key=f"view_{candidate_id}",
-                    use_container_width=True,
-                ):
-                    selected_id = candidate_id
-                st.markdown(
-                    f"<div class='candidate-pill'>{stage}</div>",
-                    unsafe_allow_html=True,
-                )
-                st.markdown("</div>", unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
+        info_col, action_col = st.columns([4, 1])
+        info_col.markdown(card_html, unsafe_allow_html=True)
+        if action_col.button(
+            f"#{candidate_id}",
+            key=f"view_{candidate_id}",
+            width="stretch",
+        ):
+            selected_id = candidate_id
 
     return selected_id
 
 
-def render_candidate_detail_view(json_data: Dict[str, Any]) -> None:
-    """Render detailed view for a single candidate."""
+def render_candidate_detail_view(json_data: Dict[str, Any], openings: Optional["OpeningsModel"] = None) -> None:
+    """Render detailed view for a single candidate.
+
+    ``openings`` resolves opening/stage names when the payload only carries ids.
+    """
     candidate: Dict[str, Any] = {}
     if isinstance(json_data, dict):
         candidate = json_data.get("candidate") or {}
@@ -130,141 +239,109 @@ def render_candidate_detail_view(json_data: Dict[str, Any]) -> None:
         return
 
     opening_info = candidate.get("opening_export", {}) or {}
-    stage_name = candidate.get("stage_name") or opening_info.get("stage_name") or "Chưa xác định"
+    opening_id = candidate.get("opening_id") or opening_info.get("id")
+    stage_id = candidate.get("stage_id") or candidate.get("stage")
+    stage_name = candidate.get("stage_name") or opening_info.get("stage_name")
+    opening_name = opening_info.get("name")
+    if openings is not None:
+        stage_name = stage_name or openings.stage_name(stage_id, opening_id)
+        opening_name = opening_name or openings.opening_name(opening_id)
+    stage_name = stage_name or "Chưa xác định"
     time_apply = _format_timestamp(candidate.get("time_apply"))
 
-    st.markdown(
-        """
-        <style>
-        .candidate-card {background-color:#f8fafc; border:1px solid #e2e8f0; border-radius:16px; padding:1.5rem; margin-bottom:1rem;}
-        .candidate-header {display:flex; flex-wrap:wrap; align-items:center; justify-content:space-between; gap:0.5rem;}
-        .candidate-title {font-size:1.4rem; font-weight:600; color:#0f172a; margin:0;}
-        .candidate-subtitle {font-size:0.95rem; color:#475569;}
-        .candidate-badge {display:inline-block; padding:0.25rem 0.75rem; border-radius:999px; background:#e0f2fe; color:#0369a1; font-size:0.8rem; margin:0.15rem 0.4rem 0.15rem 0;}
-        .candidate-label {font-weight:600; color:#0f172a;}
-        .candidate-label.muted {color:#94a3b8; font-weight:500;}
-        .candidate-section {margin-top:1.35rem;}
-        .candidate-section h4 {margin-bottom:0.6rem; color:#1e293b;}
-        .candidate-divider {margin:1.3rem 0; border-top:1px dashed #cbd5f5;}
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
-
-    with st.container():
-        st.markdown("<div class='candidate-card'>", unsafe_allow_html=True)
-        header_cols = st.columns([3, 2])
-        with header_cols[0]:
-            st.markdown(
-                f"<div class='candidate-header'>"
-                f"<div><p class='candidate-title'>{_format_text(candidate.get('disp_name') or candidate.get('name'))}</p>"
-                f"<p class='candidate-subtitle'>ID: {_format_text(candidate.get('id'))} · Stage: {stage_name}</p></div>"
-                f"</div>",
-                unsafe_allow_html=True,
+    gender_label = candidate.get("gender_text") or {
+        "0": "Nữ",
+        "1": "Nam",
+        "2": "Khác",
+        "-1": "Không xác định",
+    }.get(str(candidate.get("gender")), "Không xác định")
+
+    info_sections = [
+        ("Thông tin liên hệ", [
+            ("Email", candidate.get("email")),
+            ("Điện thoại", candidate.get("phone")),
+            ("Ngày sinh", candidate.get("dob")),
+        ]),
+        ("Thông tin bổ sung", [
+            ("Giới tính", gender_label),
+            ("Địa chỉ", candidate.get("address")),
+            ("Nguồn", candidate.get("source")),
+        ]),
+        ("Thông tin tuyển dụng", [
+            ("Vị trí", opening_name),
+            ("Mã vị trí", opening_info.get("codename")),
+            ("Stage ID", stage_id),
+            ("Thời gian nộp", time_apply),
+        ]),
+    ]
+    sections_html = [
+        templates.DETAIL_HEADER.render(
+            name=_format_text(candidate.get("disp_name") or candidate.get("name")),
+            candidate_id=_format_text(candidate.get("id")),
+            stage=stage_name,
+            score=_format_text(candidate.get("score", "0")),
+            status=_format_text(candidate.get("status", "default")),
+        )
+    ]
+    for title, items in info_sections:
+        items_html = "".join(templates.INFO_ITEM.render(label=label, value=_format_text(value)) for label, value in items)
+        sections_html.append(templates.INFO_SECTION.render(title=title, items_html=items_html))
+        sections_html.append(templates.DIVIDER)
+
+    cvs = candidate.get("cvs") or []
+    if cvs:
+        cv_items = []
+        for idx, cv in enumerate(cvs, start=1):
+            url = cv if isinstance(cv, str) else cv.get("url") if isinstance(cv, dict) else None
+            if url:
+                cv_items.append(templates.LINK_ITEM.render(url=url, label=f"CV {idx}"))
+            else:
+                cv_items.append(templates.TEXT_ITEM.render(text=f"CV {idx}: {_format_text(cv)}"))
+        cvs_html = templates.render_list(cv_items)
+    else:
+        cvs_html = templates.MUTED_LABEL.render(text="Chưa có CV đính kèm")
+    tags_html = f"<p class='candidate-label'>Tags</p>{_render_badges(candidate.get('tags') or [])}"
+    sections_html.append(templates.SECTION.render(title="Hồ sơ & nhãn", body_html=cvs_html + tags_html))
+
+    timelines = candidate.get("timelines") or []
+    changelogs = candidate.get("changelogs") or []
+    if timelines or changelogs:
+        history_items = [
+            templates.HISTORY_ITEM.render(title=_format_text(log.get("name")), time=_format_timestamp(log.get("since")))
+            for log in changelogs
+        ]
+        history_items.extend(
+            templates.TEXT_ITEM.render(
+                text=f"{_format_text(timeline.get('title') or timeline.get('description'))} "
+                f"({_format_timestamp(timeline.get('created_at') or timeline.get('time'))})"
             )
-        with header_cols[1]:
-            metric_cols = st.columns(2)
-            metric_cols[0].metric("Đánh giá", _format_text(candidate.get("score", "0")))
-            metric_cols[1].metric("Trạng thái", _format_text(candidate.get("status", "default")))
-
-        st.markdown("<div class='candidate-divider'></div>", unsafe_allow_html=True)
-
-        st.markdown("<div class='candidate-section'><h4>Thông tin liên hệ</h4></div>", unsafe_allow_html=True)
-        contact_cols = st.columns(3)
-        contact_cols[0].markdown(f"**Email**\n\n{_format_text(candidate.get('email'))}")
-        contact_cols[1].markdown(f"**Điện thoại**\n\n{_format_text(candidate.get('phone'))}")
-        contact_cols[2].markdown(f"**Ngày sinh**\n\n{_format_text(candidate.get('dob'))}")
-
-        st.markdown("<div class='candidate-divider'></div>", unsafe_allow_html=True)
-
-        st.markdown("<div class='candidate-section'><h4>Thông tin bổ sung</h4></div>", unsafe_allow_html=True)
-        extra_cols = st.columns(3)
-        gender_label = candidate.get("gender_text") or {
-            "0": "Nữ",
-            "1": "Nam",
-            "2": "Khác",
-            "-1": "Không xác định",
-        }.get(str(candidate.get("gender")), "Không xác định")
-        extra_cols[0].markdown(f"**Giới tính**\n\n{_format_text(gender_label)}")
-        extra_cols[1].markdown(f"**Địa chỉ**\n\n{_format_text(candidate.get('address'))}")
-        extra_cols[2].markdown(f"**Nguồn**\n\n{_format_text(candidate.get('source'))}")
-
-        st.markdown("<div class='candidate-divider'></div>", unsafe_allow_html=True)
-
-        st.markdown("<div class='candidate-section'><h4>Thông tin tuyển dụng</h4></div>", unsafe_allow_html=True)
-        opening_cols = st.columns(4)
-        opening_cols[0].markdown(f"**Vị trí**\n\n{_format_text(opening_info.get('name'))}")
-        opening_cols[1].markdown(f"**Mã vị trí**\n\n{_format_text(opening_info.get('codename'))}")
-        opening_cols[2].markdown(f"**Stage ID**\n\n{_format_text(candidate.get('stage_id'))}")
-        opening_cols[3].markdown(f"**Thời gian nộp**\n\n{time_apply}")
-
-        st.markdown("<div class='candidate-divider'></div>", unsafe_allow_html=True)
-
-        st.markdown("<div class='candidate-section'><h4>Hồ sơ & nhãn</h4></div>", unsafe_allow_html=True)
-        cvs = candidate.get("cvs") or []
-        if cvs:
-            for idx, cv in enumerate(cvs, start=1):
-                url = cv if isinstance(cv, str) else cv.get("url") if isinstance(cv, dict) else None
-                if url:
-                    st.markdown(f"- [CV {idx}]({url})")
-                else:
-                    st.markdown(f"- CV {idx}: {_format_text(cv)}")
-        else:
-            st.markdown("<span class='candidate-label muted'>Chưa có CV đính kèm</span>", unsafe_allow_html=True)
-
-        tags = candidate.get("tags") or []
-        st.markdown("**Tags**")
-        st.markdown(_render_badges(tags), unsafe_allow_html=True)
-
-        timelines = candidate.get("timelines") or []
-        changelogs = candidate.get("changelogs") or []
-        if timelines or changelogs:
-            st.markdown("<div class='candidate-divider'></div>", unsafe_allow_html=True)
-            st.markdown("<div class='candidate-section'><h4>Lịch sử cập nhật</h4></div>", unsafe_allow_html=True)
-            if changelogs:
-                for log in changelogs:
-                    log_time = _format_timestamp(log.get("since"))
-                    st.markdown(
-                        f"- **{_format_text(log.get('name'))}**\n\n  · Thời gian: {log_time}"
-                    )
-            if timelines:
-                for timeline in timelines:
-                    timeline_time = _format_timestamp(timeline.get("created_at") or timeline.get("time"))
-                    title = timeline.get("title") or timeline.get("description")
-                    st.markdown(f"- {_format_text(title)} ({timeline_time})")
-
-        st.markdown("</div>", unsafe_allow_html=True)
-
-
-def _extract_messages(payload: Any) -> tuple[list[Dict[str, Any]], Dict[str, Any]]:
-    """Best-effort extraction of messages and their metadata from varied payload shapes."""
-    if isinstance(payload, list):
-        return payload, {}
-
-    if not isinstance(payload, dict):
-        return [], {}
-
-    key_priority = ["messages", "data", "results", "items", "records", "threads"]
-    meta: Dict[str, Any] = {}
-
-    for key in key_priority:
-        value = payload.get(key)
-        if isinstance(value, list):
-            meta = {k: v for k, v in payload.items() if k != key}
-            return value, meta
-        if isinstance(value, dict):
-            sub_messages, sub_meta = _extract_messages(value)
-            if sub_messages:
-                meta = {k: v for k, v in payload.items() if k != key}
-                meta.update({k: v for k, v in sub_meta.items() if k not in meta})
-                return sub_messages, meta
-
-    return [], {k: v for k, v in payload.items() if k not in key_priority}
-
-
-def render_candidate_messages_view(json_data: Dict[str, Any]) -> None:
-    """Render structured view for candidate messages."""
-    messages, meta = _extract_messages(json_data)
+            for timeline in timelines
+        )
+        sections_html.append(templates.DIVIDER)
+        sections_html.append(
+            templates.SECTION.render(title="Lịch sử cập nhật", body_html=templates.render_list(history_items))
+        )
+
+    # One markdown element for the whole card instead of one per field.
+    st.markdown("".join(sections_html), unsafe_allow_html=True)
+
+
+MESSAGES_BATCH_SIZE = 10
+
+
+@st.fragment
+def render_candidate_messages_view(thread: "MessageThread", openings: Optional["OpeningsModel"] = None) -> None:
+    """Render structured view for candidate messages.
+
+    ``thread`` comes from ``messages_model.normalize_messages`` (already newest
+    first). Messages are shown in batches of ``MESSAGES_BATCH_SIZE`` with a
+    "load more" button; bodies (decompressed on access), attachments and
+    tracking events are only rendered once the user expands a message.
+    ``openings`` adds opening/stage names next to their ids. Runs as a
+    fragment, so "load more" and expanding a message only rerun this view,
+    not the whole app and the modal around it.
+    """
+    messages, meta = thread.messages, thread.meta
     if not messages:
         st.info("Không có tin nhắn để hiển thị.")
         return
@@ -272,116 +349,110 @@ def render_candidate_messages_view(json_data: Dict[str, Any]) -> None:
     filters = st.session_state.get("latest_candidate_filters", {}) if hasattr(st, "session_state") else {}
     selected_candidate_id = st.session_state.get("selected_candidate_id") if hasattr(st, "session_state") else None
 
-    opening_id_value = (meta.get("opening_id") if isinstance(meta, dict) else None) or filters.get("opening_id")
-    stage_id_value = (meta.get("stage_id") if isinstance(meta, dict) else None) or filters.get("stage_id") or filters.get("stage")
-    candidate_id_value = (meta.get("candidate_id") if isinstance(meta, dict) else None) or selected_candidate_id
+    opening_id_value = meta.get("opening_id") or filters.get("opening_id")
+    stage_id_value = meta.get("stage_id") or filters.get("stage_id") or filters.get("stage")
+    candidate_id_value = meta.get("candidate_id") or selected_candidate_id
 
     st.markdown(
-        """
-        <style>
-        .message-card {background:#ffffff; border:1px solid #e2e8f0; border-radius:14px; padding:1.2rem; margin-bottom:1rem; box-shadow:0 1px 2px rgba(15,23,42,0.05);} 
-        .message-title {font-size:1.05rem; font-weight:600; color:#0f172a; margin-bottom:0.35rem;} 
-        .message-meta {font-size:0.9rem; color:#475569; margin-bottom:0.2rem;} 
-        .message-meta.align-right {text-align:right;} 
-        .message-body {font-family:'Segoe UI',sans-serif; color:#0f172a; line-height:1.55;} 
-        .message-body img {max-width:100%; border-radius:10px; margin:0.3rem 0;} 
-        .message-body ul {padding-left:1.2rem;} 
-        .message-section-header {display:flex; align-items:center; justify-content:space-between; margin-bottom:0.5rem;} 
-        .badge-pill {display:inline-flex; align-items:center; padding:0.25rem 0.75rem; background:#e0f2fe; color:#0369a1; border-radius:999px; font-size:0.8rem; margin-left:0.4rem;} 
-        </style>
-        """,
+        templates.MESSAGES_HEADER.render(title="Danh sách tin nhắn", count=len(messages)),
         unsafe_allow_html=True,
     )
 
-    header_text = "Danh sách tin nhắn"
-    count_badge = f"<span class='badge-pill'>Tổng {len(messages)}</span>"
-    st.markdown(
-        f"<div class='message-section-header'><h4>{header_text}</h4>{count_badge}</div>",
-        unsafe_allow_html=True,
-    )
+    opening_name = openings.opening_name(opening_id_value) if openings is not None and opening_id_value else None
+    stage_name = openings.stage_name(stage_id_value, opening_id_value) if openings is not None and stage_id_value else None
 
     summary_parts = []
     if opening_id_value:
-        summary_parts.append(f"**Opening ID:** `{_format_text(opening_id_value)}`")
+        summary_parts.append(
+            f"**Opening ID:** `{_format_text(opening_id_value)}`" + (f" ({_format_text(opening_name)})" if opening_name else "")
+        )
     if stage_id_value:
-        summary_parts.append(f"**Stage ID:** `{_format_text(stage_id_value)}`")
+        summary_parts.append(
+            f"**Stage ID:** `{_format_text(stage_id_value)}`" + (f" ({_format_text(stage_name)})" if stage_name else "")
+        )
     if candidate_id_value:
         summary_parts.append(f"**Candidate ID:** `{_format_text(candidate_id_value)}`")
     if summary_parts:
         st.markdown(" • ".join(summary_parts))
 
     if meta:
-        meta_cols = st.columns(4)
-        meta_cols[0].markdown(f"**Candidate ID**\n\n{_format_text(meta.get('candidate_id') or candidate_id_value)}")
-        meta_cols[1].markdown(f"**Opening ID**\n\n{_format_text(meta.get('opening_id') or opening_id_value)}")
-        meta_cols[2].markdown(f"**Stage ID**\n\n{_format_text(meta.get('stage_id') or stage_id_value)}")
-        meta_cols[3].markdown(f"**Thời gian cập nhật**\n\n{_format_timestamp(meta.get('since'))}")
-
-    for idx, message in enumerate(messages, start=1):
-        user = message.get("user") or {}
-        author_name = user.get("name") or user.get("username") or user.get("email") or "Không rõ"
-        author_type = user.get("type") or ""
-        subject = message.get("subject") or "Không có tiêu đề"
-        time_sent = _format_timestamp(message.get("since"))
-        thread_id = message.get("thread_id") or "-"
-        message_id = message.get("id") or "-"
-
-        st.markdown("<div class='message-card'>", unsafe_allow_html=True)
-        header_cols = st.columns([3, 1])
-        with header_cols[0]:
-            st.markdown(
-                f"<div class='message-title'>{idx}. {_format_text(subject)}</div>",
-                unsafe_allow_html=True,
-            )
-            st.markdown(
-                f"<div class='message-meta'>Từ: {_format_text(author_name)} · Loại: {_format_text(author_type)}</div>",
-                unsafe_allow_html=True,
-            )
-            st.markdown(
-                f"<div class='message-meta'>Message ID: {_format_text(message_id)} · Thread: {_format_text(thread_id)}</div>",
-                unsafe_allow_html=True,
-            )
-        with header_cols[1]:
-            st.markdown(
-                f"<div class='message-meta align-right'>Thời gian: {time_sent}</div>",
-                unsafe_allow_html=True,
-            )
-
-        content_html = message.get("content") or message.get("body") or ""
-        if isinstance(content_html, str):
-            content_html = content_html.replace("\\r\\n", "\n")
-        content_html = content_html or "<p>Không có nội dung.</p>"
-
+        meta_items = [
+            ("Candidate ID", _format_text(meta.get("candidate_id") or candidate_id_value)),
+            ("Opening ID", _format_text(meta.get("opening_id") or opening_id_value)),
+            ("Stage ID", _format_text(meta.get("stage_id") or stage_id_value)),
+            ("Thời gian cập nhật", _format_timestamp(meta.get("since"))),
+        ]
         st.markdown(
-            f"<div class='message-body'>{content_html}</div>",
+            f"<div class='info-grid'>{''.join(templates.INFO_ITEM.render(label=l, value=v) for l, v in meta_items)}</div>",
             unsafe_allow_html=True,
         )
 
-        attachments = message.get("attachments") or []
-        if attachments:
-            st.markdown("**Tệp đính kèm**")
-            for attachment in attachments:
-                name = attachment.get("name") or attachment.get("filename") or "Tệp"
-                url = attachment.get("url") or attachment.get("download_url")
-                if url:
-                    st.markdown(f"- [{_format_text(name)}]({url})")
-                else:
-                    st.markdown(f"- {_format_text(name)}")
-
-        tracking_events = message.get("tracking_events") or []
-        if tracking_events:
-            with st.expander("Lịch sử gửi/đọc"):
-                for event in tracking_events:
-                    event_name = event.get("event") or "unknown"
-                    event_time = _format_timestamp(event.get("since"))
-                    st.markdown(f"- **{_format_text(event_name)}** · {event_time}")
+    limit_key = f"messages_limit_{_format_text(candidate_id_value, 'unknown')}"
+    limit = st.session_state.get(limit_key, MESSAGES_BATCH_SIZE)
+    for idx, message in enumerate(messages[:limit], start=1):
+        _render_message_card(idx, message, key_prefix=f"{limit_key}_{idx}")
+
+    remaining = len(messages) - limit
+    if remaining > 0:
+        # The callback runs before the (fragment) rerun the click triggers, so no extra rerun is needed
+        st.button(
+            f"Tải thêm {min(remaining, MESSAGES_BATCH_SIZE)} tin nhắn (còn {remaining})",
+            key=f"{limit_key}_more",
+            on_click=_show_more_messages,
+            args=(limit_key, limit),
+        )
+
+
+def _show_more_messages(limit_key: str, limit: int) -> None:
+    st.session_state[limit_key] = limit + MESSAGES_BATCH_SIZE
+
 
-        st.markdown("</div>", unsafe_allow_html=True)
+def _render_message_card(idx: int, message: "Message", key_prefix: str) -> None:
+    st.markdown(
+        templates.MESSAGE_CARD.render(
+            idx=idx,
+            subject=_format_text(message.subject, "Không có tiêu đề"),
+            author=_format_text(message.author, "Không rõ"),
+            author_type=_format_text(message.author_type),
+            message_id=_format_text(message.id),
+            thread_id=_format_text(message.thread_id),
+            time_sent=_format_timestamp(message.since),
+        ),
+        unsafe_allow_html=True,
+    )
+
+    # The body is only decompressed and sent to the browser once the user asks for it.
+    if st.toggle("Xem nội dung", key=f"{key_prefix}_body"):
+        content_html = message.content or "<p>Không có nội dung.</p>"
+        st.markdown(templates.MESSAGE_BODY.render(content_html=content_html), unsafe_allow_html=True)
+
+        if message.attachments:
+            attachment_items = [
+                templates.LINK_ITEM.render(url=url, label=_format_text(name))
+                if url
+                else templates.TEXT_ITEM.render(text=_format_text(name))
+                for name, url in message.attachments
+            ]
+            st.markdown(
+                f"<p class='candidate-label'>Tệp đính kèm</p>{templates.render_list(attachment_items)}",
+                unsafe_allow_html=True,
+            )
+
+        if message.events:
+            with st.expander("Lịch sử gửi/đọc"):
+                event_items = [
+                    templates.HISTORY_ITEM.render(title=_format_text(event), time=_format_timestamp(since))
+                    for event, since in message.events
+                ]
+                st.markdown(templates.render_list(event_items), unsafe_allow_html=True)
 
 
 __all__ = [
+    "inject_styles",
     "render_metrics",
+    "render_pipeline_analytics",
     "render_candidate_list",
+    "reset_candidate_selection",
     "render_candidate_detail_view",
     "render_candidate_messages_view",
 ]
@@ -0,0 +1,142 @@
+"""Precompiled HTML templates and the shared stylesheet for the Streamlit UI."""
+
+from __future__ import annotations
+
+from html import escape
+from string import Formatter
+from typing import Any, List, Optional, Tuple
+
+
+class HtmlTemplate:
+    """A ``str.format``-style template parsed once at import time.
+
+    Every value is HTML-escaped on render, except fields whose name ends in
+    ``_html`` which are trusted, pre-rendered fragments.
+    """
+
+    __slots__ = ("_parts",)
+
+    def __init__(self, source: str) -> None:
+        self._parts: List[Tuple[str, Optional[str]]] = [
+            (literal, field_name) for literal, field_name, _, _ in Formatter().parse(source)
+        ]
+
+    def render(self, **values: Any) -> str:
+        chunks: List[str] = []
+        for literal, field_name in self._parts:
+            chunks.append(literal)
+            if field_name is None:
+                continue
+            value = values.get(field_name, "")
+            text = "" if value is None else str(value)
+            chunks.append(text if field_name.endswith("_html") else escape(text, quote=True))
+        return "".join(chunks)
+
+
+STYLESHEET = """
+<style>
+.candidate-item {background:#ffffff; border:1px solid #e2e8f0; border-radius:14px; padding:1.1rem; margin-bottom:0.75rem; box-shadow:0 1px 3px rgba(15,23,42,0.08);}
+.candidate-item:hover {border-color:#94a3b8; box-shadow:0 2px 6px rgba(15,23,42,0.12);}
+.candidate-name {font-size:1.05rem; font-weight:600; color:#0f172a; margin-bottom:0.15rem;}
+.candidate-sub {color:#475569; font-size:0.9rem;}
+.candidate-meta {color:#334155; font-size:0.85rem; margin-top:0.4rem;}
+.candidate-pill {display:inline-flex; align-items:center; gap:0.3rem; padding:0.2rem 0.65rem; background:#f1f5f9; border-radius:999px; font-size:0.8rem; color:#1e293b; margin-left:0.4rem;}
+.candidate-card {background-color:#f8fafc; border:1px solid #e2e8f0; border-radius:16px; padding:1.5rem; margin-bottom:1rem;}
+.candidate-header {display:flex; flex-wrap:wrap; align-items:center; justify-content:space-between; gap:0.5rem;}
+.candidate-title {font-size:1.4rem; font-weight:600; color:#0f172a; margin:0;}
+.candidate-subtitle {font-size:0.95rem; color:#475569;}
+.candidate-stats {display:flex; gap:1.5rem;}
+.candidate-stat span {display:block; font-size:0.85rem; color:#475569;}
+.candidate-stat strong {font-size:1.3rem; color:#0f172a;}
+.candidate-badge {display:inline-block; padding:0.25rem 0.75rem; border-radius:999px; background:#e0f2fe; color:#0369a1; font-size:0.8rem; margin:0.15rem 0.4rem 0.15rem 0;}
+.candidate-label {font-weight:600; color:#0f172a;}
+.candidate-label.muted {color:#94a3b8; font-weight:500;}
+.candidate-section {margin-top:1.35rem;}
+.candidate-section h4 {margin-bottom:0.6rem; color:#1e293b;}
+.candidate-divider {margin:1.3rem 0; border-top:1px dashed #cbd5f5;}
+.info-grid {display:grid; grid-template-columns:repeat(auto-fit, minmax(160px, 1fr)); gap:0.75rem;}
+.message-card {background:#ffffff; border:1px solid #e2e8f0; border-radius:14px; padding:1.2rem; margin-bottom:0.5rem; box-shadow:0 1px 2px rgba(15,23,42,0.05);}
+.message-header {display:flex; flex-wrap:wrap; justify-content:space-between; gap:0.5rem;}
+.message-title {font-size:1.05rem; font-weight:600; color:#0f172a; margin-bottom:0.35rem;}
+.message-meta {font-size:0.9rem; color:#475569; margin-bottom:0.2rem;}
+.message-meta.align-right {text-align:right;}
+.message-body {font-family:'Segoe UI',sans-serif; color:#0f172a; line-height:1.55;}
+.message-body img {max-width:100%; border-radius:10px; margin:0.3rem 0;}
+.message-body ul {padding-left:1.2rem;}
+.message-section-header {display:flex; align-items:center; justify-content:space-between; margin-bottom:0.5rem;}
+.badge-pill {display:inline-flex; align-items:center; padding:0.25rem 0.75rem; background:#e0f2fe; color:#0369a1; border-radius:999px; font-size:0.8rem; margin-left:0.4rem;}
+</style>
+"""
+
+CANDIDATE_CARD = HtmlTemplate(
+    "<div class='candidate-item'>"
+    "<div class='candidate-name'>{name}<span class='candidate-pill'>{stage}</span></div>"
+    "<div class='candidate-sub'>ID: {candidate_id} · Stage: {stage}</div>"
+    "<div class='candidate-meta'>Vị trí: {opening}</div>"
+    "<div class='candidate-meta'>Nguồn: {source}</div>"
+    "<div class='candidate-meta'>Email: {email} · SĐT: {phone}</div>"
+    "{cv_html}"
+    "</div>"
+)
+CANDIDATE_CV_LINK = HtmlTemplate(
+    "<div class='candidate-meta'><a href='{url}' target='_blank'>📄 CV</a></div>"
+)
+
+DETAIL_HEADER = HtmlTemplate(
+    "<div class='candidate-card'><div class='candidate-header'>"
+    "<div><p class='candidate-title'>{name}</p>"
+    "<p class='candidate-subtitle'>ID: {candidate_id} · Stage: {stage}</p></div>"
+    "<div class='candidate-stats'>"
+    "<div class='candidate-stat'><span>Đánh giá</span><strong>{score}</strong></div>"
+    "<div class='candidate-stat'><span>Trạng thái</span><strong>{status}</strong></div>"
+    "</div></div></div>"
+)
+INFO_SECTION = HtmlTemplate(
+    "<div class='candidate-section'><h4>{title}</h4><div class='info-grid'>{items_html}</div></div>"
+)
+INFO_ITEM = HtmlTemplate("<div><div class='candidate-label'>{label}</div><div>{value}</div></div>")
+SECTION = HtmlTemplate("<div class='candidate-section'><h4>{title}</h4>{body_html}</div>")
+DIVIDER = "<div class='candidate-divider'></div>"
+LINK_ITEM = HtmlTemplate("<li><a href='{url}' target='_blank'>{label}</a></li>")
+TEXT_ITEM = HtmlTemplate("<li>{text}</li>")
+HISTORY_ITEM = HtmlTemplate("<li><strong>{title}</strong> · {time}</li>")
+BADGE = HtmlTemplate("<span class='candidate-badge'>{text}</span>")
+MUTED_LABEL = HtmlTemplate("<span class='candidate-label muted'>{text}</span>")
+
+MESSAGES_HEADER = HtmlTemplate(
+    "<div class='message-section-header'><h4>{title}</h4><span class='badge-pill'>Tổng {count}</span></div>"
+)
+MESSAGE_CARD = HtmlTemplate(
+    "<div class='message-card'><div class='message-header'><div>"
+    "<div class='message-title'>{idx}. {subject}</div>"
+    "<div class='message-meta'>Từ: {author} · Loại: {author_type}</div>"
+    "<div class='message-meta'>Message ID: {message_id} · Thread: {thread_id}</div>"
+    "</div><div class='message-meta align-right'>Thời gian: {time_sent}</div></div></div>"
+)
+MESSAGE_BODY = HtmlTemplate("<div class='message-body'>{content_html}</div>")
+
+
+def render_list(items_html: List[str]) -> str:
+    return f"<ul>{''.join(items_html)}</ul>"
+
+
+__all__ = [
+    "HtmlTemplate",
+    "STYLESHEET",
+    "CANDIDATE_CARD",
+    "CANDIDATE_CV_LINK",
+    "DETAIL_HEADER",
+    "INFO_SECTION",
+    "INFO_ITEM",
+    "SECTION",
+    "DIVIDER",
+    "LINK_ITEM",
+    "TEXT_ITEM",
+    "HISTORY_ITEM",
+    "BADGE",
+    "MUTED_LABEL",
+    "MESSAGES_HEADER",
+    "MESSAGE_CARD",
+    "MESSAGE_BODY",
+    "render_list",
+]
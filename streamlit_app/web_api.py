@@ -1,10 +1,538 @@
-from typing import Optional
+"""
+FastAPI proxy bất đồng bộ cho Base.vn Candidate API.
+
+Mọi request của dashboard (nhiều phiên Streamlit, web_vue, script báo cáo)
+đi qua một AsyncBaseClient duy nhất của tiến trình: dùng chung connection
+pool, response cache, rate limiter và single-flight, nên N người dùng chỉ là
+một consumer đối với Base.vn. Chạy một worker uvicorn để giữ được điều đó.
+"""
+
+import asyncio
+import json
 import os
-from fastapi import FastAPI, HTTPException, Query
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Tuple, Union
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
-from pydantic import BaseModel
-from api_client import fetch_openings_list, fetch_opening, fetch_candidates
-from data_processor import process_candidate_data
-from api_client import fetch_candidate_detail, fetch_candidate_messages
-# ...existing code...
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
+
+from api_client import STREAM_ERROR_KEY, AsyncBaseClient, cache_stats
+from config_manager import load_env_values
+from exporter import (
+    EXPORT_EXTENSIONS,
+    EXPORT_FORMATS,
+    EXPORT_MEDIA_TYPES,
+    CandidateExportWriter,
+    ChunkSink,
+    available_formats,
+)
+from pagination import DEFAULT_CANDIDATES_PER_PAGE, DEFAULT_FANOUT_CONCURRENCY, aiter_candidate_pages, page_items
+
+
+BATCH_MAX_CANDIDATES = 500
+BATCH_MAX_CONCURRENCY = 32
+
+
+class ProxyRequest(BaseModel):
+    # web_vue gửi id/stage dạng số, Streamlit gửi dạng chuỗi
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+    access_token: str
+
+
+class OpeningsRequest(ProxyRequest):
+    page: int = 1
+    num_per_page: int = 50
+    order_by: str = "starred"
+
+
+class CandidatesRequest(ProxyRequest):
+    opening_id: str
+    stage: str = ""
+    # Tên cũ của ``stage``, giữ để tương thích với các client cũ
+    stage_id: Optional[str] = None
+    page: int = 1
+    num_per_page: int = 50
+
+    @property
+    def stage_filter(self) -> str:
+        return self.stage_id or self.stage or ""
+
+
+class CandidateBatchRequest(ProxyRequest):
+    """Danh sách ``candidate_ids`` hoặc bộ lọc ``opening_id``/``stage`` (lấy mọi trang)."""
+
+    candidate_ids: List[str] = Field(default_factory=list)
+    opening_id: Optional[str] = None
+    stage: str = ""
+    include_detail: bool = True
+    include_messages: bool = True
+    concurrency: int = Field(default=8, ge=1, le=BATCH_MAX_CONCURRENCY)
+
+
+class CandidateStreamRequest(ProxyRequest):
+    opening_id: str
+    stage: str = ""
+    num_per_page: int = Field(default=DEFAULT_CANDIDATES_PER_PAGE, ge=1, le=100)
+    concurrency: int = Field(default=2, ge=1, le=DEFAULT_FANOUT_CONCURRENCY)
+    format: Literal["ndjson", "sse"] = "ndjson"
+
+
+class CandidateExportRequest(ProxyRequest):
+    opening_id: str
+    stage: str = ""
+    format: Literal[EXPORT_FORMATS] = "parquet"
+    num_per_page: int = Field(default=DEFAULT_CANDIDATES_PER_PAGE, ge=1, le=100)
+    concurrency: int = Field(default=2, ge=1, le=DEFAULT_FANOUT_CONCURRENCY)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    load_env_values()
+    app.state.base_client = AsyncBaseClient.from_env()
+    try:
+        yield
+    finally:
+        await app.state.base_client.aclose()
+
+
+app = FastAPI(title="Base.vn Candidate Proxy", lifespan=lifespan)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=[origin for origin in os.environ.get("API_CORS_ORIGINS", "*").split(",") if origin],
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+
+def get_base_client(request: Request) -> AsyncBaseClient:
+    return request.app.state.base_client
+
+
+def error_response(status_code: int, error: str, details: Any = None) -> JSONResponse:
+    body: Dict[str, Any] = {"success": False, "error": error}
+    if details is not None:
+        body["details"] = details
+    return JSONResponse(body, status_code=status_code)
+
+
+@app.exception_handler(RequestValidationError)
+async def validation_error_handler(request: Request, exc: RequestValidationError) -> JSONResponse:
+    missing = [".".join(str(part) for part in err["loc"][1:]) for err in exc.errors()]
+    return error_response(400, f"Tham số không hợp lệ: {', '.join(missing)}", exc.errors())
+
+
+@app.exception_handler(ConnectionError)
+async def connection_error_handler(request: Request, exc: ConnectionError) -> JSONResponse:
+    return error_response(502, str(exc))
+
+
+def upstream_error(response: Any, description: str) -> Optional[JSONResponse]:
+    """Trả về JSONResponse lỗi nếu Base.vn trả mã HTTP lỗi, ngược lại ``None``."""
+    if response.status_code < 400:
+        return None
+    try:
+        details = response.json()
+    except ValueError:
+        details = response.text[:500]
+    return error_response(response.status_code, f"Base.vn lỗi {response.status_code} ({description})", details)
+
+
+def non_json_error(response: Any, description: str) -> JSONResponse:
+    return error_response(502, f"Base.vn trả về dữ liệu không phải JSON ({description})", response.text[:500])
+
+
+def upstream_json(response: Any, description: str) -> Tuple[Any, Optional[JSONResponse]]:
+    """Giải mã JSON của Base.vn; trả về ``(data, None)`` hoặc ``(None, response lỗi)`` (502 nếu không phải JSON)."""
+    error = upstream_error(response, description)
+    if error is not None:
+        return None, error
+    try:
+        return response.json(), None
+    except ValueError:
+        return None, non_json_error(response, description)
+
+
+def page_error(exc: Exception, description: str) -> JSONResponse:
+    """
+    Chuyển lỗi khi đọc một trang qua ``parse_page`` thành JSONResponse như
+    ``upstream_json``: mã HTTP của Base.vn nếu có, ngược lại 502.
+    """
+    if isinstance(exc, httpx.HTTPStatusError):
+        return upstream_error(exc.response, description)
+    if isinstance(exc, httpx.HTTPError):
+        return error_response(502, f"Lỗi kết nối API ({description}): {exc}")
+    return error_response(502, f"Base.vn trả về dữ liệu không phải JSON ({description})", str(exc)[:500])
+
+
+def passthrough(response: Any, description: str) -> Response:
+    """
+    Bọc payload Base.vn thành ``{"success": true, "data": ...}`` bằng cách ghép
+    bytes, không giải mã rồi mã hóa lại JSON.
+    """
+    error = upstream_error(response, description)
+    if error is not None:
+        return error
+    content = response.content.strip()
+    if not content.startswith((b"{", b"[")):
+        return non_json_error(response, description)
+    return Response(b'{"success":true,"data":' + content + b"}", media_type="application/json")
+
+
+def build_candidate_table(candidates: Any) -> List[Dict[str, Any]]:
+    """Rút gọn ứng viên thành các dòng phẳng (cùng định dạng với node_backend)."""
+    if not isinstance(candidates, list):
+        return []
+    rows = []
+    for candidate in candidates:
+        if not isinstance(candidate, dict):
+            continue
+        get = candidate.get
+        cvs = get("cvs")
+        rows.append({
+            "id": get("id"),
+            "full_name": get("name") or "",
+            "email": get("email") or "",
+            "phone": get("phone") or "",
+            "stage_id": get("stage"),
+            "stage_name": get("stage_name") or "",
+            "opening_id": get("opening_id"),
+            "opening_name": (get("opening_export") or {}).get("name") or "",
+            "source": get("source") or "",
+            "cv_link": cvs[0] if isinstance(cvs, list) and cvs else None,
+        })
+    return rows
+
+
+def page_metrics(data: Dict[str, Any], page: int, num_per_page: int) -> Dict[str, Any]:
+    return {
+        "total": data.get("total"),
+        "count": data.get("count"),
+        "page": data.get("page", page),
+        "num_per_page": data.get("num_per_page", num_per_page),
+    }
+
+
+@app.get("/health")
+async def health(request: Request) -> Dict[str, Any]:
+    client = get_base_client(request)
+    return {
+        "status": "ok",
+        "cache": cache_stats(),
+        "single_flight": {
+            "in_flight": client.single_flight.in_flight(),
+            "coalesced": client.single_flight.coalesced,
+        },
+    }
+
+
+@app.post("/openings")
+async def list_openings(body: OpeningsRequest, request: Request) -> JSONResponse:
+    response = await get_base_client(request).fetch_openings_list(
+        body.access_token, body.page, body.num_per_page, body.order_by
+    )
+    data, error = upstream_json(response, "opening/list")
+    if error is not None:
+        return error
+    openings = data.get("openings") if isinstance(data, dict) else None
+    return JSONResponse({
+        "success": True,
+        "openings": openings if isinstance(openings, list) else [],
+        "pagination": page_metrics(data if isinstance(data, dict) else {}, body.page, body.num_per_page),
+    })
+
+
+@app.post("/opening/{opening_id}")
+async def get_opening(opening_id: str, body: ProxyRequest, request: Request) -> Response:
+    response = await get_base_client(request).fetch_opening(body.access_token, opening_id)
+    return passthrough(response, "opening/get")
+
+
+@app.post("/candidates")
+async def list_candidates(body: CandidatesRequest, request: Request) -> JSONResponse:
+    response = await get_base_client(request).fetch_candidates(
+        body.access_token, body.opening_id, body.page, body.num_per_page, body.stage_filter
+    )
+    data, error = upstream_json(response, "candidate/list")
+    if error is not None:
+        return error
+    if not isinstance(data, dict):
+        data = {}
+    # JSONResponse trực tiếp: bỏ qua bước jsonable_encoder trên payload lớn
+    return JSONResponse({
+        "success": True,
+        "metrics": page_metrics(data, body.page, body.num_per_page),
+        "candidates_table": build_candidate_table(data.get("candidates")),
+        "data": data,
+    })
+
+
+def _json_or_error(result: Any) -> Dict[str, Any]:
+    """Chuyển kết quả một request con thành ``{"data": ...}`` hoặc ``{"error": ...}``."""
+    if isinstance(result, BaseException):
+        return {"error": str(result) or type(result).__name__}
+    if result.status_code >= 400:
+        return {"error": f"Base.vn lỗi {result.status_code}"}
+    try:
+        return {"data": result.json()}
+    except ValueError:
+        return {"error": "Base.vn trả về dữ liệu không phải JSON"}
+
+
+async def hydrate_candidates(
+    client: AsyncBaseClient,
+    access_token: str,
+    candidate_ids: List[str],
+    include_detail: bool,
+    include_messages: bool,
+    concurrency: int,
+) -> List[Dict[str, Any]]:
+    """
+    Lấy detail/messages cho từng ứng viên song song; một semaphore chung giới
+    hạn tổng số request đồng thời. Lỗi của một ứng viên không làm hỏng cả lô.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _call(fetch: Any, candidate_id: str) -> Any:
+        async with semaphore:
+            try:
+                return await fetch(access_token, candidate_id)
+            except Exception as e:
+                return e
+
+    fetchers = []
+    if include_detail:
+        fetchers.append(("detail", client.fetch_candidate_detail))
+    if include_messages:
+        fetchers.append(("messages", client.fetch_candidate_messages))
+
+    results = await asyncio.gather(
+        *(_call(fetch, candidate_id) for candidate_id in candidate_ids for _, fetch in fetchers)
+    )
+
+    hydrated = []
+    for index, candidate_id in enumerate(candidate_ids):
+        item: Dict[str, Any] = {"id": candidate_id}
+        errors = {}
+        for offset, (name, _) in enumerate(fetchers):
+            outcome = _json_or_error(results[index * len(fetchers) + offset])
+            if "error" in outcome:
+                item[name] = None
+                errors[name] = outcome["error"]
+            else:
+                item[name] = outcome["data"]
+        if errors:
+            item["errors"] = errors
+        hydrated.append(item)
+    return hydrated
+
+
+def _exceeds_batch_limit(total: Any) -> bool:
+    try:
+        return int(total) > BATCH_MAX_CANDIDATES
+    except (TypeError, ValueError):
+        return False
+
+
+@app.post("/candidates/batch")
+async def batch_candidates(body: CandidateBatchRequest, request: Request) -> JSONResponse:
+    """
+    Gộp 1 + 2N lời gọi thành một: nhận ``candidate_ids`` hoặc bộ lọc opening/stage,
+    rồi hydrate detail và/hoặc messages với số request đồng thời giới hạn.
+    """
+    client = get_base_client(request)
+    listed: Dict[str, Dict[str, Any]] = {}
+    candidate_ids = [candidate_id for candidate_id in body.candidate_ids if candidate_id]
+
+    if not candidate_ids and body.opening_id:
+        pages = aiter_candidate_pages(
+            client,
+            body.access_token,
+            body.opening_id,
+            body.stage,
+            DEFAULT_CANDIDATES_PER_PAGE,
+            # concurrency của request dành cho hydrate; việc liệt kê trang giới hạn ở mức fan-out
+            concurrency=min(body.concurrency, DEFAULT_FANOUT_CONCURRENCY),
+        )
+        try:
+            async for page in pages:
+                if not listed and _exceeds_batch_limit(page.get("total")):
+                    # Biết ``total`` từ trang đầu: từ chối ngay, không tải các trang còn lại
+                    return error_response(400, f"Tối đa {BATCH_MAX_CANDIDATES} ứng viên mỗi lần gọi batch")
+                for candidate in page_items(page, "candidates"):
+                    candidate_id = candidate.get("id") if isinstance(candidate, dict) else None
+                    if candidate_id is not None and str(candidate_id) not in listed:
+                        listed[str(candidate_id)] = candidate
+                if len(listed) > BATCH_MAX_CANDIDATES:
+                    break
+        except (httpx.HTTPError, ValueError) as e:
+            return page_error(e, "candidate/list")
+        finally:
+            await pages.aclose()
+        candidate_ids = list(listed)
+    elif not candidate_ids:
+        return error_response(400, "Cần truyền candidate_ids hoặc opening_id")
+
+    # Bỏ trùng, giữ thứ tự
+    candidate_ids = list(dict.fromkeys(candidate_ids))
+    if len(candidate_ids) > BATCH_MAX_CANDIDATES:
+        return error_response(400, f"Tối đa {BATCH_MAX_CANDIDATES} ứng viên mỗi lần gọi batch")
+
+    items = await hydrate_candidates(
+        client,
+        body.access_token,
+        candidate_ids,
+        body.include_detail,
+        body.include_messages,
+        body.concurrency,
+    )
+    if listed:
+        for item in items:
+            item["candidate"] = listed.get(item["id"])
+
+    return JSONResponse({
+        "success": True,
+        "count": len(items),
+        "error_count": sum(1 for item in items if "errors" in item),
+        "candidates": items,
+    })
+
+
+def _encode_line(item: Any) -> str:
+    return json.dumps(item, ensure_ascii=False, separators=(",", ":"))
+
+
+async def stream_candidate_lines(
+    client: AsyncBaseClient, body: CandidateStreamRequest
+) -> AsyncIterator[bytes]:
+    """
+    Phát ứng viên theo từng trang ngay khi trang đó về từ Base.vn. Mỗi lần chỉ
+    giữ tối đa ``concurrency`` trang trong bộ nhớ. Lỗi giữa chừng được gửi
+    thành dòng ``{"stream_error": ...}`` (NDJSON) hoặc sự kiện ``error`` (SSE)
+    cuối cùng, vì HTTP status đã được gửi đi.
+    """
+    sse = body.format == "sse"
+    pages = aiter_candidate_pages(
+        client, body.access_token, body.opening_id, body.stage, body.num_per_page, concurrency=body.concurrency
+    )
+    count = 0
+    try:
+        async for page in pages:
+            items = page_items(page, "candidates")
+            if not items:
+                continue
+            count += len(items)
+            if sse:
+                chunk = "".join(f"event: candidate\ndata: {_encode_line(item)}\n\n" for item in items)
+            else:
+                chunk = "".join(f"{_encode_line(item)}\n" for item in items)
+            yield chunk.encode("utf-8")
+    except Exception as e:
+        message = str(e) or type(e).__name__
+        if sse:
+            yield f"event: error\ndata: {_encode_line({'error': message, 'count': count})}\n\n".encode("utf-8")
+        else:
+            yield f"{_encode_line({STREAM_ERROR_KEY: message, 'count': count})}\n".encode("utf-8")
+        return
+    finally:
+        await pages.aclose()
+    if sse:
+        yield f"event: end\ndata: {_encode_line({'count': count})}\n\n".encode("utf-8")
+
+
+@app.post("/candidates/stream")
+async def stream_candidates(body: CandidateStreamRequest, request: Request) -> StreamingResponse:
+    """Xuất toàn bộ ứng viên của opening/stage dạng NDJSON (mặc định) hoặc Server-Sent Events."""
+    media_type = "text/event-stream" if body.format == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_candidate_lines(get_base_client(request), body),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def export_candidate_chunks(
+    client: AsyncBaseClient, body: CandidateExportRequest, first: Dict[str, Any]
+) -> AsyncIterator[bytes]:
+    """
+    Ghi từng trang vào CandidateExportWriter (trong thread pool) và gửi ngay các
+    bytes đã ghi. ``first`` là trang 1 đã tải và kiểm tra trước khi gửi header.
+    Nếu Base.vn lỗi giữa chừng, luồng dừng lại không có footer nên file nhận
+    được sẽ không đọc được thay vì thiếu dữ liệu mà không biết.
+    """
+    sink = ChunkSink()
+    writer = CandidateExportWriter(sink, body.format)
+    pages = aiter_candidate_pages(
+        client,
+        body.access_token,
+        body.opening_id,
+        body.stage,
+        body.num_per_page,
+        concurrency=body.concurrency,
+        first=first,
+    )
+    try:
+        async for page in pages:
+            await asyncio.to_thread(writer.append, page)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        await pages.aclose()
+    await asyncio.to_thread(writer.close)
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
+
+
+@app.post("/candidates/export")
+async def export_candidates_file(body: CandidateExportRequest, request: Request) -> Response:
+    """Xuất toàn bộ ứng viên của opening/stage ra Parquet, Arrow IPC hoặc CSV (stream theo từng khối)."""
+    if body.format not in available_formats():
+        return error_response(400, f"Định dạng {body.format} cần cài đặt 'pyarrow'")
+    client = get_base_client(request)
+    # Tải trang 1 trước khi trả StreamingResponse: token sai hoặc lỗi Base.vn
+    # trả về lỗi JSON thay vì HTTP 200 kèm một file rỗng
+    response = await client.fetch_candidates(body.access_token, body.opening_id, 1, body.num_per_page, body.stage)
+    first, error = upstream_json(response, "candidate/list")
+    if error is not None:
+        return error
+    parts = ("candidates", body.opening_id, body.stage)
+    file_name = "_".join("".join(c for c in part if c.isalnum() or c in "-_") for part in parts if part)
+    return StreamingResponse(
+        export_candidate_chunks(client, body, first if isinstance(first, dict) else {}),
+        media_type=EXPORT_MEDIA_TYPES[body.format],
+        headers={"Content-Disposition": f'attachment; filename="{file_name}.{EXPORT_EXTENSIONS[body.format]}"'},
+    )
+
+
+@app.post("/candidate/{candidate_id}")
+async def get_candidate(candidate_id: str, body: ProxyRequest, request: Request) -> Response:
+    response = await get_base_client(request).fetch_candidate_detail(body.access_token, candidate_id)
+    return passthrough(response, "candidate/get")
+
+
+@app.post("/candidate/{candidate_id}/messages")
+async def get_candidate_messages(candidate_id: str, body: ProxyRequest, request: Request) -> Response:
+    response = await get_base_client(request).fetch_candidate_messages(body.access_token, candidate_id)
+    return passthrough(response, "candidate/messages")
+
+
+def run(host: Optional[str] = None, port: Optional[Union[int, str]] = None) -> None:
+    import uvicorn
+
+    uvicorn.run(
+        app,
+        host=host or os.environ.get("API_HOST", "127.0.0.1"),
+        port=int(port or os.environ.get("API_PORT", 8000)),
+        # Một worker: cache/pool/single-flight chỉ được chia sẻ trong một tiến trình
+        workers=1,
+    )
+
+
+if __name__ == "__main__":
+    run()